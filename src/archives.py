@@ -0,0 +1,57 @@
+"""Python files inside wheels, sdists and zip archives
+
+Members are read one by one straight from the archive, nothing is
+extracted to the disk. A member is reported as `archive!member`.
+"""
+
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+
+from src import constants
+
+ZIP_SUFFIXES = (".whl", ".zip")
+TAR_SUFFIXES = (".tar.gz", ".tgz")
+
+# Errors of archives, which can not be read
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError)
+
+
+def is_archive(path: Path) -> bool:
+    return path.name.endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+def member_path(archive: Path, member: str) -> str:
+    return f"{archive}!{member}"
+
+
+def iter_members(
+    archive: Path,
+    excluded: tuple[str, ...] = constants.EXCLUDED_FOLDERS,
+) -> Iterator[tuple[str, bytes]]:
+    """Yield `(path, content)` of python files of the archive
+
+    The archive is open until the generator is exhausted or closed, and
+    `ARCHIVE_ERRORS` are raised for broken ones.
+    """
+    if archive.name.endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as f:
+            for info in f.infolist():
+                if not info.is_dir() and _is_checked(info.filename, excluded):
+                    yield member_path(archive, info.filename), f.read(info)
+        return
+
+    # Read as a stream, without seeking back
+    with tarfile.open(archive, "r|*") as f:
+        for member in f:
+            if not member.isfile() or not _is_checked(member.name, excluded):
+                continue
+            content = f.extractfile(member)
+            if content is not None:
+                yield member_path(archive, member.name), content.read()
+
+
+def _is_checked(name: str, excluded: tuple[str, ...]) -> bool:
+    member = PurePosixPath(name)
+    return member.suffix == ".py" and not set(member.parts) & set(excluded)
@@ -0,0 +1,157 @@
+"""Baseline of known violations, which are not reported again
+
+Every violation is kept as a fingerprint of its class, its file path
+relative to the project root and the content of its line with
+whitespace normalized, so it still matches when lines above are added
+or removed. A baseline file has one hex fingerprint per line, the same
+fingerprint is repeated for every violation it stands for.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from pathlib import Path
+from types import TracebackType
+
+from src.models import FileResult, ScanSummary, Violation
+
+HEADER = "# little-lint baseline v1\n"
+
+
+def fingerprints(result: FileResult, root: Path | None = None) -> list[str]:
+    """Fingerprints of violations of the result, in the same order
+
+    Lines are taken from `result.line_texts`, which has them as they
+    were scanned, or read from the file, if it is not set.
+    """
+    if not result.violations:
+        return []
+
+    path = Path(result.path)
+    line_texts = result.line_texts
+    if line_texts is None:
+        try:
+            with open(path, "r") as f:
+                line_texts = dict(enumerate(f.read().split("\n"), 1))
+        except (OSError, UnicodeDecodeError):
+            line_texts = {}
+
+    if root is not None:
+        try:
+            path = path.relative_to(root)
+        except ValueError:
+            pass
+
+    prints = []
+    for v in result.violations:
+        line = line_texts.get(v.line, "")
+        key = "\0".join(
+            (type(v).__name__, path.as_posix(), " ".join(line.split()))
+        )
+        digest = hashlib.blake2b(key.encode(), digest_size=12)
+        prints.append(digest.hexdigest())
+
+    return prints
+
+
+class Baseline:
+    def __init__(self, counts: Counter[str] | None = None) -> None:
+        # Fingerprint -> violations left to match
+        self.counts = counts if counts is not None else Counter()
+
+    def __len__(self) -> int:
+        return self.counts.total()
+
+    @classmethod
+    def load(cls, path: Path) -> "Baseline":
+        """Read a baseline, a missing file is an empty baseline"""
+        counts: Counter[str] = Counter()
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    if not line.startswith("#"):
+                        counts[line.strip()] += 1
+        except FileNotFoundError:
+            pass
+
+        counts.pop("", None)
+        return cls(counts)
+
+    def filter(
+        self,
+        results: Iterable[FileResult],
+        root: Path | None = None,
+        summary: ScanSummary | None = None,
+    ) -> Iterator[FileResult]:
+        """Drop violations of the baseline from results
+
+        Every fingerprint drops as many violations as it was recorded
+        for. `summary`, already updated with the results, counts only
+        the violations left. Results themselves are not changed, as a
+        result is shared with copies of its file.
+        """
+        for result in results:
+            if not self.counts or not result.violations:
+                yield result
+                continue
+
+            kept: list[Violation] = []
+            for v, fingerprint in zip(
+                result.violations, fingerprints(result, root)
+            ):
+                if fingerprint in self.counts:
+                    self.counts[fingerprint] -= 1
+                    if not self.counts[fingerprint]:
+                        del self.counts[fingerprint]
+                    if summary is not None:
+                        summary.by_type[v.type] -= 1
+                        summary.baselined += 1
+                else:
+                    kept.append(v)
+
+            if summary is not None and not kept:
+                summary.files_with_violations -= 1
+
+            yield replace(result, violations=kept)
+
+
+class BaselineWriter:
+    """Write fingerprints of results to a new baseline as they come
+
+    The baseline is replaced only when all results are written.
+    """
+
+    def __init__(self, path: Path, root: Path | None = None) -> None:
+        self.path = path
+        self.root = root
+        self.written = 0
+
+    def __enter__(self) -> "BaselineWriter":
+        fd, self._temp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "w")
+        self._file.write(HEADER)
+        return self
+
+    def __exit__(
+        self,
+        error_type: type[BaseException] | None,
+        error: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._file.close()
+        if error is None:
+            os.replace(self._temp_path, self.path)
+        else:
+            os.unlink(self._temp_path)
+
+    def write(self, results: Iterable[FileResult]) -> Iterator[FileResult]:
+        for result in results:
+            for fingerprint in fingerprints(result, self.root):
+                self._file.write(fingerprint + "\n")
+                self.written += 1
+            yield result
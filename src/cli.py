@@ -0,0 +1,547 @@
+import argparse
+import itertools
+import os
+import sys
+from collections.abc import Generator, Iterable, Iterator
+from pathlib import Path
+
+from colorama import Fore, init
+
+from src import parallel, scheduler, sharding, timings
+from src.archives import is_archive
+from src.baseline import Baseline, BaselineWriter
+from src.config import load_config
+from src.models import (
+    FileResult,
+    FileTimings,
+    ScanSummary,
+    Violation,
+    ViolationType,
+)
+from src.rules import scanner
+from src.runner import read_file_list, scan_paths
+from src.utils import memory_utils
+
+colors = {
+    ViolationType.WARNING: Fore.YELLOW,
+    ViolationType.NOT_RECOMMENDER: Fore.CYAN,
+    ViolationType.ERROR: Fore.RED,
+}
+
+
+def format_violation(file_path: Path | str, v: Violation) -> str:
+    color = colors[v.type]
+    return (
+        f"{color}File '{Fore.MAGENTA + str(file_path) + color}',"
+        f" line {Fore.MAGENTA + str(v.line) + color}\n"
+        f"{v.__class__.__name__}: {v.text}{Fore.RESET}"
+    )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="little-lint")
+    parser.add_argument("files", nargs="*", help="Files or folders to check")
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
+        help=(
+            "Check files listed in FILE, '-' for stdin, one per line or"
+            " separated by NUL as `git ls-files -z` does"
+        ),
+    )
+    parser.add_argument(
+        "--stdin-filename",
+        metavar="NAME",
+        help="Check code from stdin as the file NAME",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel workers, 0 means one per CPU",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=("auto", "thread", "process"),
+        default="auto",
+        help=(
+            "Parallel backend. 'auto' uses threads when the GIL"
+            " is disabled and processes otherwise"
+        ),
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        help="pyproject.toml to read, the nearest one by default",
+    )
+    parser.add_argument(
+        "--max-bytes", type=int, help="Per-file size limit in bytes"
+    )
+    parser.add_argument(
+        "--max-lines", type=int, help="Per-file size limit in lines"
+    )
+    parser.add_argument(
+        "--max-seconds", type=float, help="Per-file scan time limit"
+    )
+    parser.add_argument(
+        "--oversize",
+        choices=("lines", "skip"),
+        help=(
+            "Files over the size limit are checked only with line rules"
+            " or skipped"
+        ),
+    )
+    parser.add_argument(
+        "--stream-bytes",
+        type=int,
+        help=(
+            "Files over this size are read line by line for file and line"
+            " rules, only the AST is built from the whole source"
+        ),
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Fix violations, which have mechanical fixes, in place",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Scan files with the same content separately",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help=(
+            "Scan the slowest files first, by their scan time in previous"
+            " runs, and print results as they are ready"
+        ),
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=Path,
+        help=(
+            "Where scan times are kept for --schedule, "
+            f"{scheduler.STATS_FILE} near the config by default"
+        ),
+    )
+    parser.add_argument(
+        "--memory-bounded",
+        action="store_true",
+        help=(
+            "Bound memory of the run: queue one file per worker, spill"
+            " results over --max-buffered to a temporary file, do not keep"
+            " results for identical files and report peak memory"
+        ),
+    )
+    parser.add_argument(
+        "--max-buffered",
+        type=int,
+        default=10_000,
+        help="Violations kept in memory in the memory-bounded mode",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help=(
+            "Check only the I-th of N parts of the files and write"
+            " the results for `little-lint merge`"
+        ),
+    )
+    parser.add_argument(
+        "--shard-by-size",
+        action="store_true",
+        help="Split files between shards by their size",
+    )
+    parser.add_argument(
+        "--shard-output",
+        type=Path,
+        help="Result file of the shard, little-lint-shard-I-of-N.json"
+        " by default",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        nargs="?",
+        const="not_recommender",
+        choices=[t.name.lower() for t in ViolationType],
+        metavar="SEVERITY",
+        help=(
+            "Stop at the first violation of this severity or a more severe"
+            " one, of any severity by default"
+        ),
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Report only violations, which are not in this baseline file",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write all found violations to the --baseline file",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Measure time of every scan phase, print the slowest files",
+    )
+    parser.add_argument(
+        "--memory-peaks",
+        action="store_true",
+        help=(
+            "With --timings, measure the memory peak of every file in a"
+            " second scan. Files are scanned in processes instead of"
+            " threads"
+        ),
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="Number of the slowest files printed with --timings",
+    )
+    parser.add_argument(
+        "--timings-file",
+        type=Path,
+        help="Write timings of all files to a .json or .csv file",
+    )
+    return parser
+
+
+def _build_merge_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="little-lint merge",
+        description="Report results of all shards of a run",
+    )
+    parser.add_argument(
+        "files", nargs="+", type=Path, help="Result files of the shards"
+    )
+    return parser
+
+
+def _build_lsp_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="little-lint lsp",
+        description="Run the language server over stdin and stdout",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        help="pyproject.toml to read, the nearest one by default",
+    )
+    return parser
+
+
+def lsp_main(argv: list[str]) -> None:
+    from src import lsp
+
+    args = _build_lsp_parser().parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Invalid config: {e}", file=sys.stderr)
+        exit(1)
+
+    config.apply()
+    exit(lsp.serve(config))
+
+
+def merge_main(argv: list[str]) -> None:
+    init()  # Init colorama
+    args = _build_merge_parser().parse_args(argv)
+
+    summary = ScanSummary()
+    try:
+        results = sharding.merge_partials(args.files, summary)
+    except (OSError, ValueError, KeyError) as e:
+        print(Fore.RED + f"Invalid result files: {e}")
+        exit(1)
+
+    print_report(results, summary)
+    if summary.total:
+        exit(1)
+
+
+def print_report(results: Iterable[FileResult], summary: ScanSummary):
+    """Print results as they come and then the totals of `summary`"""
+    for result in results:
+        for v in result.violations:
+            print(format_violation(result.path, v))
+
+    print(
+        f"\n{Fore.LIGHTRED_EX}Total {summary.total}"
+        f" violations in {summary.files_with_violations} files"
+    )
+    if summary.fixed:
+        print(f"{Fore.RESET}Fixed {summary.fixed} violations")
+    if summary.dedup_hits:
+        print(
+            f"{Fore.RESET}{summary.dedup_hits} files were identical"
+            f" to already checked ones"
+        )
+    if summary.baselined:
+        print(
+            f"{Fore.RESET}{summary.baselined} violations are in the baseline"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv[:1] == ["lsp"]:
+        lsp_main(argv[1:])
+        return
+
+    if argv[:1] == ["merge"]:
+        merge_main(argv[1:])
+        return
+
+    init()  # Init colorama
+    args = _build_parser().parse_args(argv)
+
+    if args.stdin_filename is not None:
+        if args.files or args.files_from is not None:
+            print(Fore.RED + "Please, check files or stdin, not both!")
+            exit(1)
+        if args.fix:
+            print(Fore.RED + "--fix can not be used with --stdin-filename!")
+            exit(1)
+
+    elif not args.files and args.files_from is None:
+        print(Fore.RED + "Please, specify files to be checked!")
+        exit(1)
+
+    if args.files_from not in (None, "-") and not os.path.exists(
+        args.files_from
+    ):
+        print(Fore.RED + f"File '{args.files_from}' not exist!")
+        exit(1)
+
+    paths = []
+    for file_name in args.files:
+        file_path = Path(file_name).resolve()
+
+        if not os.path.exists(file_path):
+            print(Fore.RED + f"File '{file_name}' not exist!")
+            exit(1)
+
+        _check_fixable(file_path, args.fix)
+        paths.append(file_path)
+
+    files: Iterable[Path] = paths
+    if args.files_from is not None:
+        files = itertools.chain(
+            paths, _listed_paths(args.files_from, args.fix)
+        )
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(Fore.RED + f"Invalid config: {e}")
+        exit(1)
+
+    if args.fail_fast is not None and args.fix:
+        print(Fore.RED + "--fail-fast can not be used with --fix!")
+        exit(1)
+
+    # Violations of this severity or more severe ones fail the run
+    severity = ViolationType.NOT_RECOMMENDER
+    if args.fail_fast is not None:
+        severity = ViolationType[args.fail_fast.upper()]
+
+    if args.memory_peaks and not args.timings:
+        print(Fore.RED + "--memory-peaks can be used only with --timings!")
+        exit(1)
+
+    if args.update_baseline and args.baseline is None:
+        print(Fore.RED + "Please, specify the --baseline file to update!")
+        exit(1)
+
+    shard = None
+    if args.shard is not None:
+        try:
+            shard = sharding.Shard.parse(
+                args.shard, root=config.root, by_size=args.shard_by_size
+            )
+        except ValueError as e:
+            print(Fore.RED + str(e))
+            exit(1)
+
+    config.apply()
+    config.override_limits(
+        max_bytes=args.max_bytes,
+        max_lines=args.max_lines,
+        max_seconds=args.max_seconds,
+        oversize=args.oversize,
+        stream_bytes=args.stream_bytes,
+    )
+
+    jobs = args.jobs if args.jobs > 0 else parallel.default_jobs()
+
+    max_buffered = args.max_buffered if args.memory_bounded else None
+
+    stats = None
+    if args.schedule:
+        stats = args.stats_file or config.root / scheduler.STATS_FILE
+
+    # A violation in the baseline must not hide others in its file
+    fail_fast = None
+    if args.fail_fast is not None and args.baseline is None:
+        fail_fast = severity
+
+    summary = ScanSummary()
+    if args.stdin_filename is not None:
+        # Nothing is read from the disk, the file may be unsaved
+        results = scanner.scan_many(
+            [(Path(args.stdin_filename), sys.stdin.buffer.read())],
+            summary=summary,
+            plan_for=config.plan_for,
+            timings=args.timings,
+            memory=args.memory_peaks,
+            fail_fast=fail_fast,
+            # The baseline is matched by lines as they were scanned
+            line_texts=args.baseline is not None,
+        )
+    else:
+        results = scan_paths(
+            files,
+            jobs,
+            args.executor,
+            excluded=config.exclude,
+            # Every copy of a file is fixed on its own, and with timings
+            # files are read by workers, so reading is measured too
+            dedup=not (args.no_dedup or args.fix or args.timings),
+            fix=args.fix,
+            summary=summary,
+            stats=stats,
+            max_buffered=max_buffered,
+            plan_for=config.plan_for,
+            worker_init=config.apply,
+            shard=shard,
+            timings=args.timings,
+            memory=args.memory_peaks,
+            fail_fast=fail_fast,
+            line_texts=args.baseline is not None,
+        )
+
+    baseline_writer = None
+    if args.update_baseline:
+        baseline_writer = BaselineWriter(args.baseline, config.root)
+        results = baseline_writer.write(results)
+    elif args.baseline is not None:
+        baseline = Baseline.load(args.baseline)
+        results = baseline.filter(results, config.root, summary)
+
+    timing_rows: list[tuple[str, FileTimings]] = []
+    if args.timings:
+        results = timings.collect(results, timing_rows)
+
+    stopped: list[FileResult] = []
+    if args.fail_fast is not None:
+        results = _stop_at(results, severity, stopped)
+
+    if shard is not None:
+        # Only results with violations are kept for the result file
+        reported: list[FileResult] = []
+        results = _keep_reported(results, reported)
+
+    if baseline_writer is not None:
+        with baseline_writer:
+            print_report(results, summary)
+        print(
+            f"{Fore.RESET}Baseline {args.baseline} is updated with"
+            f" {baseline_writer.written} violations"
+        )
+    else:
+        print_report(results, summary)
+
+    if shard is not None:
+        output = args.shard_output or Path(
+            f"little-lint-shard-{shard.index}-of-{shard.count}.json"
+        )
+        sharding.write_partial(output, shard, reported, summary)
+
+    if args.timings:
+        print(f"{Fore.RESET}\nSlowest files, ms:")
+        print(timings.format_table(timings.slowest(timing_rows, args.slowest)))
+        if args.timings_file is not None:
+            timings.dump(timing_rows, args.timings_file)
+
+    if stopped:
+        print(f"{Fore.RESET}Stopped at the first failure in {stopped[0].path}")
+
+    if args.memory_bounded:
+        peak_rss = memory_utils.peak_rss_mb()
+        if peak_rss is not None:
+            print(
+                f"{Fore.RESET}Peak RSS: {peak_rss[0]:.1f} MB,"
+                f" workers: {peak_rss[1]:.1f} MB"
+            )
+
+    failed = any(
+        count and violation_type.is_at_least(severity)
+        for violation_type, count in summary.by_type.items()
+    )
+    if failed and not args.update_baseline:
+        exit(1)
+
+
+def _check_fixable(path: Path, fix: bool) -> None:
+    # Archives are never rewritten, so their violations would be hidden
+    if fix and is_archive(path):
+        print(Fore.RED + f"Archive '{path}' can not be fixed!")
+        exit(1)
+
+
+def _listed_paths(files_from: str, fix: bool = False) -> Iterator[Path]:
+    """Paths of the list, which are read as they come
+
+    Files, which no longer exist, are skipped.
+    """
+    if files_from == "-":
+        yield from _existing_paths(read_file_list(sys.stdin.buffer), fix)
+        return
+
+    with open(files_from, "rb") as f:
+        yield from _existing_paths(read_file_list(f), fix)
+
+
+def _existing_paths(names: Iterable[str], fix: bool) -> Iterator[Path]:
+    for file_name in names:
+        file_path = Path(file_name).resolve()
+        if os.path.exists(file_path):
+            _check_fixable(file_path, fix)
+            yield file_path
+        else:
+            print(Fore.YELLOW + f"File '{file_name}' not exist!")
+
+
+def _keep_reported(
+    results: Iterable[FileResult], reported: list[FileResult]
+) -> Iterator[FileResult]:
+    for result in results:
+        if result.violations:
+            reported.append(result)
+        yield result
+
+
+def _stop_at(
+    results: Generator[FileResult],
+    severity: ViolationType,
+    stopped: list[FileResult],
+) -> Iterator[FileResult]:
+    """Stop the run after the first result with a violation of `severity`
+
+    Closing `results` stops the file discovery and cancels pending work.
+    """
+    try:
+        for result in results:
+            yield result
+            if any(v.type.is_at_least(severity) for v in result.violations):
+                stopped.append(result)
+                return
+    finally:
+        results.close()
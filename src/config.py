@@ -0,0 +1,255 @@
+"""Configuration from the `[tool.little-lint]` table of pyproject.toml
+
+    [tool.little-lint]
+    max-line-length = 99
+    exclude = [".venv", "build"]
+    disable = ["MaxLineLength"]
+    max-seconds = 5
+    packs = ["my-pack"]
+
+    [tool.little-lint.per-path."tests/"]
+    disable = ["right_order", "import_not_at_top_of_file"]
+
+    [tool.little-lint.per-path."*/migrations/"]
+    disable = ["right_order"]
+
+Names in `disable` and `enable` are rule names, which are never invoked
+when disabled, or violation names, which are dropped from the results.
+Top-level `enable` turns off every rule, which is not listed. Per-path
+tables match directories relative to the pyproject.toml folder by prefix
+or by glob, they are applied in order and may also set limits. Rules
+of third-party `packs` are named like the built-in ones.
+"""
+
+import dataclasses
+import fnmatch
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src import constants
+from src.models import MaxLineLength, Violation, get_violation_class
+from src.rules import scanner
+from src.rules.packs import RulePackInfo, discover_packs
+from src.types import RulePlan, ScanLimits
+
+CONFIG_FILE = "pyproject.toml"
+
+LIMIT_OPTIONS = {
+    "max-bytes": "max_bytes",
+    "max-lines": "max_lines",
+    "max-seconds": "max_seconds",
+    "oversize": "oversize",
+    "stream-bytes": "stream_bytes",
+}
+RULE_OPTIONS = ("disable", "enable")
+OPTIONS = (
+    "max-line-length",
+    "top-level-defs-tab",
+    "exclude",
+    "per-path",
+    "packs",
+    *RULE_OPTIONS,
+    *LIMIT_OPTIONS,
+)
+
+
+@dataclass(frozen=True)
+class PathOverride:
+    pattern: str
+    disable: tuple[str, ...] = ()
+    enable: tuple[str, ...] = ()
+    limits: dict[str, Any] = field(default_factory=dict)
+
+    def matches(self, directory: str) -> bool:
+        return fnmatch.fnmatchcase(directory, self.pattern + "*")
+
+
+@dataclass
+class Config:
+    root: Path = field(default_factory=Path.cwd)
+    max_line_length: int = 79
+    top_level_defs_tab: int = 2
+    exclude: tuple[str, ...] = constants.EXCLUDED_FOLDERS
+    disable: tuple[str, ...] = ()
+    enable: tuple[str, ...] = ()
+    limits: ScanLimits = ScanLimits()
+    per_path: tuple[PathOverride, ...] = ()
+    packs: tuple[RulePackInfo, ...] = ()
+
+    # Limits given in the command line win over the per-path ones
+    cli_limits: dict[str, Any] = field(default_factory=dict)
+
+    _plans: dict[Path, RulePlan] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def apply(self) -> None:
+        """Set the options read by rules, in this process"""
+        constants.MAX_LINE_LENGTH = self.max_line_length
+        constants.TOP_LEVEL_DEFS_TAB = self.top_level_defs_tab
+        MaxLineLength.text = f"Max length should be {self.max_line_length}"
+        for pack in self.packs:
+            scanner.add_lazy_pack(pack)
+
+    def override_limits(self, **limits: Any) -> None:
+        for name, value in limits.items():
+            if value is not None:
+                self.cli_limits[name] = value
+        self._plans.clear()
+
+    def plan_for(self, path: Path | str) -> RulePlan:
+        """Return the rule plan of a file, compiled once per directory"""
+        directory = Path(path).parent
+        plan = self._plans.get(directory)
+        if plan is None:
+            plan = self._plans[directory] = self._compile(directory)
+        return plan
+
+    def _compile(self, directory: Path) -> RulePlan:
+        names = set(self.disable)
+        if self.enable:
+            names |= _get_rule_names(self.packs) - set(self.enable)
+
+        limits = {}
+        relative = _relative_dir(directory.resolve(), self.root)
+        for override in self.per_path:
+            if relative is not None and override.matches(relative):
+                names |= set(override.disable)
+                names -= set(override.enable)
+                limits.update(override.limits)
+
+        limits.update(self.cli_limits)
+
+        disabled_rules = set()
+        exclude: list[type[Violation]] = []
+        for name in sorted(names):
+            violation = get_violation_class(name)
+            if violation is None:
+                # A violation of a pack is known after the import
+                for pack in self.packs:
+                    if name in pack.violations:
+                        scanner.add_lazy_pack(pack)
+                        scanner.load_pack(pack.name)
+                        violation = get_violation_class(name)
+            if violation is None:
+                disabled_rules.add(name)
+            else:
+                exclude.append(violation)
+
+        return RulePlan(
+            frozenset(disabled_rules),
+            tuple(exclude),
+            dataclasses.replace(self.limits, **limits),
+        )
+
+
+def find_config(start: Path) -> Path | None:
+    for folder in (start, *start.parents):
+        path = folder / CONFIG_FILE
+        if path.is_file():
+            return path
+
+    return None
+
+
+def load_config(path: Path | None = None) -> Config:
+    """Load the config from `path` or the nearest pyproject.toml"""
+    if path is None:
+        path = find_config(Path.cwd())
+        if path is None:
+            return Config()
+
+    with open(path, "rb") as f:
+        options = tomllib.load(f).get("tool", {}).get("little-lint", {})
+
+    return parse_config(options, path.resolve().parent)
+
+
+def parse_config(options: dict[str, Any], root: Path) -> Config:
+    _check_options(options, OPTIONS)
+
+    packs = tuple(discover_packs(options.get("packs", ())))
+
+    config = Config(
+        root=root,
+        max_line_length=options.get(
+            "max-line-length", Config.max_line_length
+        ),
+        top_level_defs_tab=options.get(
+            "top-level-defs-tab", Config.top_level_defs_tab
+        ),
+        exclude=tuple(options.get("exclude", constants.EXCLUDED_FOLDERS)),
+        disable=_get_names(options, "disable", packs),
+        enable=_get_names(options, "enable", packs),
+        limits=ScanLimits(**_get_limits(options)),
+        packs=packs,
+    )
+
+    for pattern, path_options in options.get("per-path", {}).items():
+        _check_options(path_options, (*RULE_OPTIONS, *LIMIT_OPTIONS))
+        config.per_path += (
+            PathOverride(
+                pattern.strip("/") + "/",
+                _get_names(path_options, "disable", packs),
+                _get_names(path_options, "enable", packs),
+                _get_limits(path_options),
+            ),
+        )
+
+    pack_violations = {v for pack in packs for v in pack.violations}
+    for name in config.enable:
+        if get_violation_class(name) is not None or name in pack_violations:
+            raise ValueError(
+                f"Only rules can be enabled at the top level, not {name}!"
+            )
+
+    return config
+
+
+def _check_options(options: dict[str, Any], allowed: tuple[str, ...]):
+    for key in options:
+        if key not in allowed:
+            raise ValueError(f"Option {key} not exist!")
+
+
+def _get_names(
+    options: dict[str, Any], key: str, packs: tuple[RulePackInfo, ...]
+) -> tuple[str, ...]:
+    names = tuple(options.get(key, ()))
+
+    known = _get_rule_names(packs)
+    for pack in packs:
+        known |= pack.violations
+
+    for name in names:
+        if name not in known and get_violation_class(name) is None:
+            raise ValueError(f"Rule or violation {name} not exist!")
+
+    return names
+
+
+def _get_rule_names(packs: tuple[RulePackInfo, ...]) -> set[str]:
+    names = scanner.get_rule_names()
+    for pack in packs:
+        names |= {rule.name for rule in pack.rules}
+    return names
+
+
+def _get_limits(options: dict[str, Any]) -> dict[str, Any]:
+    return {
+        field_name: options[key]
+        for key, field_name in LIMIT_OPTIONS.items()
+        if key in options
+    }
+
+
+def _relative_dir(directory: Path, root: Path) -> str | None:
+    try:
+        relative = directory.relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+    return "" if relative == "." else relative + "/"
+
@@ -1,4 +1,12 @@
 from typing import Final
 
-MAX_LINE_LENGTH: Final[int] = 79
-TOP_LEVEL_DEFS_TAB: Final[int] = 2
+# Can be changed by `src.config`
+MAX_LINE_LENGTH: int = 79
+TOP_LEVEL_DEFS_TAB: int = 2
+
+EXCLUDED_FOLDERS: Final[tuple[str, ...]] = (
+    ".idea",
+    ".venv",
+    "venv",
+    "__pycache__",
+)
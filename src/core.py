@@ -1,22 +1,349 @@
 import ast
+import functools
 import inspect
-from collections import defaultdict
-from typing import Type, Iterable, Final
+import itertools
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Type, Iterable
 
-from src.models import Violation
+from src import parallel, transport
+from src.archives import is_archive
+from src.models import (
+    FileResult,
+    FileTimings,
+    FileTooLarge,
+    InvalidArchive,
+    InvalidSyntax,
+    ScanFailed,
+    ScanSummary,
+    ScanTimeout,
+    Violation,
+    ViolationType,
+    WorkerCrashed,
+    get_violation_class,
+)
+from src.parallel import ExecutorKind
+from src.rules.packs import RulePackInfo
 from src.rules.rules_container import Rule
-from src.types import FileRule, AstRule, AnyAstType, LineRule, AstChecker
-from src.utils import ast_utils
+from src.types import (
+    FileRule,
+    AstRule,
+    AnyAstType,
+    LineRule,
+    AstChecker,
+    Deadline,
+    DeadlineExceeded,
+    RulePlan,
+    ScanLimits,
+    TextEdit,
+    check_deadline,
+)
+from src.utils import ast_utils, tokens_utils
+from src.utils.ast_utils import NodeIndex
+from src.utils.line_metrics import LineMetrics
+from src.utils.memory_utils import SpillBuffer
+from src.utils.text_utils import (
+    LineIndex,
+    SourceText,
+    apply_edits,
+    iter_lines,
+    read_source,
+)
+from src.utils.tokens_utils import (
+    SuppressionIndex,
+    build_suppression_index,
+    read_suppression_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ast(source: str) -> ast.Module:
+    """Parse `source` keeping it in the tree for `reparse_ast`"""
+    tree = ast.parse(source)
+    tree.source = source
+    tree.changed = None
+
+    return tree
 
 
 def reparse_ast(source: str, tree: ast.AST) -> ast.AST:
-    pass
+    """Return the tree of edited `source`, reusing the previous `tree`
 
+    Only top-level statements, whose lines were changed, are parsed again.
+    Statements after the change are shifted and kept together with their
+    cached violations. The reparsed region is stored in `tree.changed`,
+    None means the whole tree was parsed from scratch.
+    The previous tree is updated in place.
+    """
+    old_source = getattr(tree, "source", None)
+    if old_source is None or not isinstance(tree, ast.Module):
+        return parse_ast(source)
 
-class Scaner:
+    if old_source == source:
+        tree.changed = LinesChange(1, 0, 0)
+        return tree
+
+    old_lines = old_source.split("\n")
+    new_lines = source.split("\n")
+
+    # Find changed lines
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while (
+        suffix < limit - prefix
+        and old_lines[-1 - suffix] == new_lines[-1 - suffix]
+    ):
+        suffix += 1
+
+    first_changed = prefix + 1
+    last_changed = len(old_lines) - suffix
+    delta = len(new_lines) - len(old_lines)
+
+    # Statements around the change are kept as is
+    before = 0
+    while (
+        before < len(tree.body)
+        and tree.body[before].end_lineno < first_changed
+    ):
+        before += 1
+
+    after = len(tree.body)
+    while (
+        after > before
+        and ast_utils.get_block_start_lineno(tree.body[after - 1])
+        > last_changed
+    ):
+        after -= 1
+
+    # A region, which does not parse on its own (e.g. decorator or
+    # indented line), belongs to one of its neighbours
+    for _ in range(2):
+        try:
+            start, end, region = _parse_region(
+                new_lines, delta, tree, before, after
+            )
+            break
+        except SyntaxError:
+            before, after = max(before - 1, 0), min(after + 1, len(tree.body))
+    else:
+        return parse_ast(source)
+
+    ast.increment_lineno(region, start - 1)
+
+    for node in tree.body[after:]:
+        ast.increment_lineno(node, delta)
+        for v in getattr(node, "violations", ()):
+            v.line += delta
+            if v.end_line is not None:
+                v.end_line += delta
+
+    tree.body = [*tree.body[:before], *region.body, *tree.body[after:]]
+    tree.source = source
+    tree.changed = LinesChange(start, end, end + delta)
+
+    return tree
+
+
+def _parse_region(
+    new_lines: list[str],
+    delta: int,
+    tree: ast.Module,
+    before: int,
+    after: int,
+) -> tuple[int, int, ast.Module]:
+    """Parse new lines between `tree.body[before - 1]` and `tree.body[after]`
+
+    Return first and last replaced lines of the old source and new tree.
+    """
+    start = 1
+    if before > 0:
+        start = tree.body[before - 1].end_lineno + 1
+
+    end = len(new_lines) - delta
+    if after < len(tree.body):
+        end = ast_utils.get_block_start_lineno(tree.body[after]) - 1
+
+    region = ast.parse("\n".join(new_lines[start - 1 : end + delta]))
+
+    return start, end, region
+
+
+@dataclass(frozen=True)
+class LinesChange:
+    """Lines `start`..`old_end` were replaced by `start`..`new_end`"""
+
+    start: int
+    old_end: int
+    new_end: int
+
+
+@functools.cache
+def get_args_count(checker: Any) -> int:
+    return len(inspect.getfullargspec(checker).args)
+
+
+def _scan_in_process(
+    task: tuple[tuple[Path | str, str | bytes | Path], dict[str, Any]],
+) -> FileResult:
+    # Rules can not be pickled, so processes use their own default scanner
+    from src.rules import scanner
+
+    item, kwargs = task
+    return scanner.scan_item(item, **kwargs)
+
+
+def _filter(
+    violations: list[Violation],
+    include_only: type[Violation] | tuple[type[Violation], ...] | None,
+    exclude: type[Violation] | tuple[type[Violation], ...] | None,
+) -> list[Violation]:
+    if include_only:
+        if not isinstance(include_only, tuple):  # Convert to tuple
+            include_only = (include_only,)
+        violations = [v for v in violations if type(v) in include_only]
+
+    if exclude:
+        if not isinstance(exclude, tuple):
+            exclude = (exclude,)
+        violations = [v for v in violations if type(v) not in exclude]
+
+    return violations
+
+
+def _get_line_texts(
+    source: str | bytes | Path, lines: set[int]
+) -> dict[int, str]:
+    """Texts of `lines` of the scanned source, which are found"""
+    if not lines:
+        return {}
+
+    try:
+        if isinstance(source, Path):
+            # Huge files are not read whole
+            with open(source, "r") as f:
+                return {
+                    number: line.rstrip("\n")
+                    for number, line in enumerate(f, 1)
+                    if number in lines
+                }
+        if isinstance(source, bytes):
+            source = read_source(source)
+    except (OSError, UnicodeDecodeError):
+        return {}
+
+    index = LineIndex(source)
+    return {
+        number: index.line_text(number)
+        for number in lines
+        if 0 < number <= len(index.starts)
+    }
+
+
+def _reaches(violations: list[Violation], severity: ViolationType) -> bool:
+    return any(v.type.is_at_least(severity) for v in violations)
+
+
+def _scan_packed_in_process(
+    task: tuple[tuple[Path | str, str | bytes | Path], dict[str, Any]],
+) -> bytes:
+    # Results are sent to the parent process packed
+    return transport.pack_results([_scan_in_process(task)])
+
+
+def _scan_batch_in_process(
+    batch: list[tuple[tuple[Path | str, str | bytes | Path], dict[str, Any]]],
+) -> bytes:
+    return transport.pack_results(_scan_in_process(task) for task in batch)
+
+
+class RuleSet:
+    """Rules of a scanner, which are enabled for some files,
+    compiled once and shared by all of them
+    """
+
+    def __init__(
+        self,
+        file_rules: list[Rule],
+        line_rules: list[Rule],
+        ast_rules: dict[Type[ast.AST], list[Rule]],
+    ) -> None:
+        self.file_rules = file_rules
+        self.line_rules = line_rules
+        self._ast_rules = ast_rules
+
+        # Rules of every node type, including rules of parent classes
+        self._rules_by_type: dict[Type[ast.AST], list[Rule]] = {}
+
+        # Line rules, which are not suppressed with the names
+        self._line_rules_by_names: dict[frozenset[str], list[Rule]] = {}
+
+    @functools.cached_property
+    def walk_plan(self) -> ast_utils.WalkPlan | None:
+        """Walk only subtrees, which can contain nodes with rules"""
+        return ast_utils.get_walk_plan(
+            frozenset(t for t, rules in self._ast_rules.items() if rules)
+        )
+
+    @functools.cached_property
+    def rule_violations(self) -> dict[str, frozenset[str]]:
+        """Names of violations of every rule by its name"""
+        rules = [*self.file_rules, *self.line_rules]
+        for ast_rules in self._ast_rules.values():
+            rules.extend(ast_rules)
+
+        return {rule.name: rule.violations for rule in rules}
+
+    def get_suppressed_rules(self, names: frozenset[str]) -> set[str]:
+        return {
+            rule_name
+            for rule_name, violations in self.rule_violations.items()
+            if tokens_utils.covers(names, rule_name, violations)
+        }
+
+    def get_line_rules(self, names: frozenset[str] | None) -> list[Rule]:
+        """Line rules, which are not suppressed with `names`"""
+        if names is None:
+            return self.line_rules
 
-    AST_ALLOW_KWARGS: Final[list[str]] = ["ignore_comments_and_decorators"]
+        rules = self._line_rules_by_names.get(names)
+        if rules is None:
+            rules = [
+                rule
+                for rule in self.line_rules
+                if not tokens_utils.covers(names, rule.name, rule.violations)
+            ]
+            self._line_rules_by_names[names] = rules
 
+        return rules
+
+    def get_ast_rules(self, node_type: Type[ast.AST]) -> list[Rule]:
+        """Rules of node type and of its parent classes"""
+        rules = self._rules_by_type.get(node_type)
+
+        if rules is None:
+            rules = [
+                rule
+                for parent_type in node_type.__mro__
+                for rule in self._ast_rules.get(parent_type, ())
+            ]
+            self._rules_by_type[node_type] = rules
+
+        return rules
+
+
+class Scaner:
     def __init__(self):
         self._file_rules: list[Rule] = []
         self._ast_rules: defaultdict[Type[ast.AST], list[Rule]] = defaultdict(
@@ -24,6 +351,20 @@ class Scaner:
         )
         self._line_rules: list[Rule] = []
 
+        # Compiled rules by names of disabled rules
+        self._rule_sets: dict[frozenset[str], RuleSet] = {}
+        self._fixers: dict[type[Violation], Rule] = {}
+        # Versions of file rules for files read line by line, by names
+        self._stream_rules: dict[str, Rule] = {}
+
+        # Rule packs, which are imported when one of their rules is enabled
+        self._lazy_packs: dict[str, RulePackInfo] = {}
+        self._loaded_packs: set[str] = set()
+        self._packs_lock = threading.Lock()
+
+        # Rules may be registered while other threads are scanning
+        self._lock = threading.Lock()
+
     def scan(
         self,
         code: str,
@@ -32,39 +373,570 @@ class Scaner:
         ) = None,
         *,
         exclude: type[Violation] | tuple[type[Violation], ...] | None = None,
+        limits: ScanLimits | None = None,
+        disabled_rules: Iterable[str] = (),
+        timings: FileTimings | None = None,
+        fail_fast: ViolationType | None = None,
+    ) -> list[Violation]:
+        """Scan code, rules with names from `disabled_rules` are not run
+
+        Rules suppressed in the whole file with comments are not run too,
+        suppressed lines are not passed to line rules. Time of every phase
+        is added to `timings`. With `fail_fast` the next phases are not
+        run after a violation of that severity or a more severe one.
+        """
+        violations: list[Violation] = []
+        disabled_rules = frozenset(disabled_rules)
+        rules = self.get_rule_set(disabled_rules)
+
+        start = time.perf_counter()
+        suppressions = build_suppression_index(code, rules.rule_violations)
+        if timings is not None:
+            timings.tokenize += time.perf_counter() - start
+
+        if suppressions.file:
+            suppressed = rules.get_suppressed_rules(suppressions.file)
+            if suppressed:
+                rules = self.get_rule_set({*disabled_rules, *suppressed})
+
+        deadline = None
+        if limits is not None and limits.max_seconds is not None:
+            deadline = time.monotonic() + limits.max_seconds
+
+        scan_lines = functools.partial(
+            self._scan_lines, suppressions=suppressions
+        )
+        scan_ast = functools.partial(self._scan_ast, timings=timings)
+        if limits is not None and limits.is_oversized(code):
+            phases = []
+            if limits.oversize == "lines":
+                phases.append(("line_rules", scan_lines))
+            violations.append(FileTooLarge(1))
+        else:
+            phases = [
+                ("file_rules", self._scan_raw_file),
+                ("ast_rules", scan_ast),
+                ("line_rules", scan_lines),
+            ]
+
+        # The deadline is checked between rules, so it holds the same way
+        # in serial, thread and process runs
+        for name, phase in phases:
+            start = time.perf_counter()
+            try:
+                phase_violations = phase(code, rules, deadline)
+            except DeadlineExceeded:
+                violations.append(ScanTimeout(1))
+                break
+            finally:
+                if timings is not None:
+                    elapsed = time.perf_counter() - start
+                    setattr(timings, name, getattr(timings, name) + elapsed)
+
+            if phase_violations:
+                violations.extend(phase_violations)
+                if fail_fast is not None and _reaches(
+                    suppressions.drop(
+                        _filter(phase_violations, include_only, exclude)
+                    ),
+                    fail_fast,
+                ):
+                    break
+
+        violations = _filter(violations, include_only, exclude)
+        return suppressions.drop(violations)
+
+    def scan_stream(
+        self,
+        path: Path,
+        include_only: (
+            type[Violation] | tuple[type[Violation], ...] | None
+        ) = None,
+        *,
+        exclude: type[Violation] | tuple[type[Violation], ...] | None = None,
+        limits: ScanLimits | None = None,
+        disabled_rules: Iterable[str] = (),
+        timings: FileTimings | None = None,
+        fail_fast: ViolationType | None = None,
     ) -> list[Violation]:
+        """Scan a huge file like `scan`, reading it line by line
+
+        File rules with stream versions and line rules read the file
+        again for every rule, so they keep only one line in memory. Only
+        the AST phase, with file rules without stream versions, reads the
+        whole source and frees it before the other phases.
+        """
         violations: list[Violation] = []
+        disabled_rules = frozenset(disabled_rules)
+        rules = self.get_rule_set(disabled_rules)
+
+        with open(path, "r") as f:
+            suppressions = read_suppression_index(f, rules.rule_violations)
+        if suppressions.file:
+            suppressed = rules.get_suppressed_rules(suppressions.file)
+            if suppressed:
+                rules = self.get_rule_set({*disabled_rules, *suppressed})
+
+        deadline = None
+        if limits is not None and limits.max_seconds is not None:
+            deadline = time.monotonic() + limits.max_seconds
+
+        stream_rules = []
+        whole_rules = []
+        for rule in rules.file_rules:
+            if rule.name in self._stream_rules:
+                stream_rules.append(self._stream_rules[rule.name])
+            else:
+                whole_rules.append(rule)
+
+        def scan_whole() -> list[Violation]:
+            with open(path, "r") as f:
+                code = f.read()
+            return [
+                *self._run_file_rules(code, whole_rules, deadline),
+                *self._scan_ast(code, rules, deadline, timings),
+            ]
+
+        def scan_stream_rules() -> list[Violation]:
+            found = []
+            for rule in stream_rules:
+                check_deadline(deadline)
+                with open(path, "r") as f:
+                    if get_args_count(rule.checker) == 2:
+                        rule_violations = rule.checker(iter_lines(f), deadline)
+                    else:
+                        rule_violations = rule.checker(iter_lines(f))
+                if isinstance(rule_violations, Violation):
+                    found.append(rule_violations)
+                elif rule_violations:
+                    found.extend(rule_violations)
+            return found
+
+        def scan_lines() -> list[Violation]:
+            with open(path, "r") as f:
+                return self._check_lines(
+                    iter_lines(f), rules, deadline, suppressions
+                )
+
+        with open(path, "rb") as f:
+            oversized = limits is not None and limits.is_oversized_file(f)
+        if oversized:
+            phases = []
+            if limits.oversize == "lines":
+                phases.append(("line_rules", scan_lines))
+            violations.append(FileTooLarge(1))
+        else:
+            phases = [
+                ("ast_rules", scan_whole),
+                ("file_rules", scan_stream_rules),
+                ("line_rules", scan_lines),
+            ]
+
+        for name, phase in phases:
+            start = time.perf_counter()
+            try:
+                phase_violations = phase()
+            except DeadlineExceeded:
+                violations.append(ScanTimeout(1))
+                break
+            finally:
+                if timings is not None:
+                    elapsed = time.perf_counter() - start
+                    setattr(timings, name, getattr(timings, name) + elapsed)
+
+            violations.extend(phase_violations)
+            if fail_fast is not None and _reaches(
+                suppressions.drop(
+                    _filter(phase_violations, include_only, exclude)
+                ),
+                fail_fast,
+            ):
+                break
+
+        violations = _filter(violations, include_only, exclude)
+        return suppressions.drop(violations)
+
+    def fix(
+        self,
+        code: str,
+        include_only: (
+            type[Violation] | tuple[type[Violation], ...] | None
+        ) = None,
+        *,
+        exclude: type[Violation] | tuple[type[Violation], ...] | None = None,
+        limits: ScanLimits | None = None,
+        disabled_rules: Iterable[str] = (),
+    ) -> tuple[str, list[Violation], int]:
+        """Fix violations, which have fixers, in one rewrite of `code`
+
+        Return the new code, its violations and the number of fixed ones.
+        The fixed code is checked with `scan_incremental`, so only
+        statements changed by the fixes are checked again. Valid code,
+        which would not parse after the fixes, is left as it is.
+        """
+        if limits is not None and limits.is_oversized(code):
+            violations = self.scan(
+                code,
+                include_only,
+                exclude=exclude,
+                limits=limits,
+                disabled_rules=disabled_rules,
+            )
+            return code, violations, 0
+
+        violations, tree = self.scan_incremental(code, None, disabled_rules)
+        violations = _filter(violations, include_only, exclude)
+
+        source = SourceText(code, tree)
+        fixes: list[tuple[Violation, list[TextEdit]]] = []
+        for v in violations:
+            fixer = self._fixers.get(type(v))
+            if fixer is None:
+                continue
+
+            edits = fixer.checker(v, source)
+            if edits:
+                if isinstance(edits, TextEdit):
+                    edits = [edits]
+                fixes.append((v, edits))
+
+        if not fixes:
+            return code, violations, 0
+
+        new_code, _ = apply_edits(
+            code, (edit for _, edits in fixes for edit in edits)
+        )
+
+        # Fixes, which break the code together, are not applied at all
+        if tree is not None:
+            try:
+                ast.parse(new_code)
+            except SyntaxError:
+                logger.warning("Fixes break the code, it is not fixed")
+                return code, violations, 0
+
+        violations, _ = self.scan_incremental(new_code, tree, disabled_rules)
+        violations = _filter(violations, include_only, exclude)
 
-        file_violations = self._scan_raw_file(code)
-        line_violations = self._scan_lines(code)
-        ast_violations = self._scan_ast(code)
+        # One edit may fix several violations, and some edits overlap,
+        # so fixed ones are those, which are not found again
+        left = Counter(type(v) for v in violations)
+        fixed = sum(
+            (Counter(type(v) for v, _ in fixes) - left).values()
+        )
+        return new_code, violations, fixed
+
+    def scan_item(
+        self,
+        item: tuple[Path | str, str | bytes | Path],
+        timings: bool = False,
+        memory: bool = False,
+        line_texts: bool = False,
+        **kwargs,
+    ) -> FileResult:
+        """Scan one `(path, source)` item of `scan_many`
+
+        Any error is reported as `ScanFailed`, so one file never stops
+        the whole batch. With `timings` the result has time of every
+        phase, with `memory` also the peak of memory allocated by the
+        scan. The peak is measured in a second scan, as tracing of
+        allocations slows down the timed one. With `line_texts` the
+        result has texts of lines with violations.
+        """
+        path, source = item
+        file_timings = None
+        if timings:
+            file_timings = kwargs["timings"] = FileTimings()
+
+        start = time.perf_counter()
+
+        try:
+            result = self._scan_item(path, source, **kwargs)
+        except Exception as e:
+            logger.warning("Failed to check %s: %s", path, e)
+            result = FileResult(path, [ScanFailed(1)])
+
+        result.elapsed = time.perf_counter() - start
+        if file_timings is not None:
+            if memory:
+                file_timings.peak_memory = self._measure_memory(
+                    path, source, **kwargs
+                )
+            result.timings = file_timings
+        if line_texts:
+            result.line_texts = _get_line_texts(
+                source, {v.line for v in result.violations}
+            )
+        return result
+
+    def _measure_memory(
+        self, path: Path | str, source: str | bytes | Path, **kwargs
+    ) -> int:
+        """Peak of memory allocated by a scan of the item, in bytes"""
+        # The file is already fixed, if it is fixed
+        kwargs.update(fix=False, timings=None)
+
+        # Scans of the next files are timed without tracing
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        try:
+            self._scan_item(path, source, **kwargs)
+        except Exception:
+            # Already reported by the timed scan
+            pass
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+
+        return max(peak - memory_before, 0)
+
+    def _scan_item(
+        self,
+        path: Path | str,
+        source: str | bytes | Path,
+        fix=False,
+        timings: FileTimings | None = None,
+        **kwargs,
+    ) -> FileResult:
+        if isinstance(source, bytes):
+            source = read_source(source)
+
+        if isinstance(source, Path) and is_archive(source):
+            # Python files of archives are read by the runner, an archive
+            # itself is left only when it can not be read
+            return FileResult(path, [InvalidArchive(1)])
 
-        if file_violations:
-            violations.extend(file_violations)
+        if fix:
+            # Every violation is fixed
+            kwargs.pop("fail_fast", None)
+            return self._fix_item(path, source, **kwargs)
 
-        if ast_violations:
-            violations.extend(ast_violations)
+        if isinstance(source, Path):
+            # Do not even read files, which are skipped by size
+            limits: ScanLimits | None = kwargs.get("limits")
+            if (
+                limits is not None
+                and limits.oversize == "skip"
+                and limits.max_bytes is not None
+                and os.path.getsize(source) > limits.max_bytes
+            ):
+                return FileResult(path, [FileTooLarge(1)])
 
-        if line_violations:
-            violations.extend(line_violations)
+            if (
+                limits is not None
+                and limits.stream_bytes is not None
+                and os.path.getsize(source) > limits.stream_bytes
+            ):
+                return FileResult(
+                    path, self.scan_stream(source, timings=timings, **kwargs)
+                )
 
+            start = time.perf_counter()
+            with open(source, "r") as f:
+                source = f.read()
+            if timings is not None:
+                timings.read = time.perf_counter() - start
+
+        return FileResult(path, self.scan(source, timings=timings, **kwargs))
+
+    def _fix_item(
+        self, path: Path | str, source: str | Path, **kwargs
+    ) -> FileResult:
+        """Fix the item, a file given by `Path` is rewritten in place"""
+        if not isinstance(source, Path):
+            _, violations, fixed = self.fix(source, **kwargs)
+            return FileResult(path, violations, fixed=fixed)
+
+        with open(source, "r") as f:
+            code = f.read()
+            newline = f.newlines if isinstance(f.newlines, str) else None
+
+        new_code, violations, fixed = self.fix(code, **kwargs)
+        if new_code != code:
+            # Keep line endings of the file
+            with open(source, "w", newline=newline) as f:
+                f.write(new_code)
+
+        return FileResult(path, violations, fixed=fixed)
+
+    def scan_many(
+        self,
+        items: Iterable[tuple[Path | str, str | bytes | Path]],
+        include_only: (
+            type[Violation] | tuple[type[Violation], ...] | None
+        ) = None,
+        *,
+        exclude: type[Violation] | tuple[type[Violation], ...] | None = None,
+        limits: ScanLimits | None = None,
+        jobs: int = 1,
+        executor: ExecutorKind = "auto",
+        summary: ScanSummary | None = None,
+        max_buffered: int | None = None,
+        plan_for: Callable[[Path | str], RulePlan] | None = None,
+        worker_init: Callable[[], None] | None = None,
+        batched: bool = False,
+        fix: bool = False,
+        timings: bool = False,
+        memory: bool = False,
+        fail_fast: ViolationType | None = None,
+        line_texts: bool = False,
+    ) -> Iterator[FileResult]:
+        """Scan `(path, source)` items, yielding results in the same order
+
+        Source is the code, its bytes or a `Path` to read it from (bytes
+        and files are decoded by the worker). Items are consumed lazily,
+        with `jobs` > 1 they are scanned in a thread or process pool. Rule
+        plans and import caches are shared by all files. If `summary` is
+        given, it is updated with every yielded result. `max_buffered`
+        bounds memory of a parallel run: results finished out of order,
+        over that many violations, wait in a temporary file, and only one
+        task per worker is queued. `plan_for` returns rules and limits for
+        the path of every item, `worker_init` is run in every worker
+        process. If `batched`, items are lists of items, each list is one
+        task of a worker and results are yielded as soon as their list is
+        done. With `fix` violations are fixed and files given by `Path`
+        are rewritten. With `timings` results have the time of every scan
+        phase, with `memory` also the peak of memory of every file, and
+        then files are scanned in processes or one by one instead of
+        threads. `fail_fast` is passed to `scan`, pending items are
+        cancelled, when the caller stops.
+        With `line_texts` results have texts of lines with violations.
+        """
+        kwargs = {"exclude": exclude, "limits": limits}
         if include_only:
-            if not isinstance(include_only, tuple):  # Convert to tuple
-                include_only = (include_only,)
-            violations = [v for v in violations if type(v) in include_only]
+            kwargs["include_only"] = include_only
+        if fix:
+            kwargs["fix"] = True
+        if timings:
+            kwargs["timings"] = True
+            if memory:
+                kwargs["memory"] = True
+        if line_texts:
+            kwargs["line_texts"] = True
+        if fail_fast is not None:
+            kwargs["fail_fast"] = fail_fast
 
-        if exclude:
-            if not isinstance(exclude, tuple):
-                exclude = (exclude,)
-            violations = [v for v in violations if type(v) not in exclude]
+        def to_task(item):
+            if plan_for is None:
+                return item, kwargs
+            return item, plan_for(item[0]).apply(kwargs)
 
-        return violations
+        if batched:
+            tasks = ([to_task(item) for item in batch] for batch in items)
+        else:
+            tasks = (to_task(item) for item in items)
 
-    def _scan_raw_file(self, code: str) -> list[Violation]:
+        if jobs <= 0:
+            jobs = parallel.default_jobs()
+
+        kind = parallel.resolve_kind(executor, jobs)
+        if kind == "process" and not self._is_default():
+            kind = "thread"
+        if timings and memory and kind == "thread":
+            # Memory is traced for the whole process, so a peak measured
+            # in one thread would include allocations of the others
+            kind = "process" if self._is_default() else "serial"
+
+        # Processes send packed lists of results, which are unpacked here
+        packed = kind == "process"
+        if packed:
+            scan_task = (
+                _scan_batch_in_process if batched else _scan_packed_in_process
+            )
+            size = transport.violation_count
+        else:
+            scan_task = self._scan_batch if batched else self._scan_task
+            size = lambda r: len(r.violations)
+
+        window = buffer = None
+        if max_buffered is not None:
+            window = jobs + 1
+            buffer = SpillBuffer(max_buffered, size)
+
+        def crashed(work):
+            batch = work if batched else [work]
+            results = [FileResult(t[0][0], [WorkerCrashed(1)]) for t in batch]
+            if packed:
+                return transport.pack_results(results)
+            return results if batched else results[0]
+
+        results = parallel.imap(
+            scan_task,
+            tasks,
+            jobs,
+            kind,
+            window,
+            buffer,
+            on_crash=crashed,
+            initializer=worker_init,
+            ordered=not batched,
+        )
+        if packed:
+            results = (
+                transport.unpack_results(data, self.find_violation_class)
+                for data in results
+            )
+        if packed or batched:
+            results = itertools.chain.from_iterable(results)
+
+        for result in results:
+            if summary is not None:
+                summary.add(result)
+            yield result
+
+    def _scan_task(
+        self,
+        task: tuple[tuple[Path | str, str | bytes | Path], dict[str, Any]],
+    ) -> FileResult:
+        item, kwargs = task
+        return self.scan_item(item, **kwargs)
+
+    def _scan_batch(
+        self,
+        batch: list[
+            tuple[tuple[Path | str, str | bytes | Path], dict[str, Any]]
+        ],
+    ) -> list[FileResult]:
+        return [self._scan_task(task) for task in batch]
+
+    def _is_default(self) -> bool:
+        from src.rules import scanner
+
+        return self is scanner
+
+    def _scan_raw_file(
+        self, code: str, rules: RuleSet, deadline: Deadline | None = None
+    ) -> list[Violation]:
+        return self._run_file_rules(code, rules.file_rules, deadline)
+
+    def _run_file_rules(
+        self,
+        code: str,
+        file_rules: list[Rule],
+        deadline: Deadline | None = None,
+    ) -> list[Violation]:
         violations: list[Violation] = []
+        # Shared by rules, which take it
+        metrics = None
+
+        for file_rule in file_rules:
+            check_deadline(deadline)
+            args_count = get_args_count(file_rule.checker)
+            if args_count >= 2 and metrics is None:
+                metrics = LineMetrics(code)
 
-        for file_rule in self._file_rules:
-            rule_violations = file_rule.checker(code)
+            if args_count == 3:
+                # Slow rules check the deadline themselves
+                rule_violations = file_rule.checker(code, metrics, deadline)
+            elif args_count == 2:
+                rule_violations = file_rule.checker(code, metrics)
+            else:
+                rule_violations = file_rule.checker(code)
             if rule_violations:
                 if not isinstance(rule_violations, Iterable):
                     violations.append(rule_violations)
@@ -74,14 +946,37 @@ class Scaner:
 
         return violations
 
-    def _scan_lines(self, code: str) -> list[Violation]:
-        violations: list[Violation] = []
+    def _scan_lines(
+        self,
+        code: str,
+        rules: RuleSet,
+        deadline: Deadline | None = None,
+        suppressions: SuppressionIndex | None = None,
+    ) -> list[Violation]:
+        return self._check_lines(
+            code.split("\n"), rules, deadline, suppressions
+        )
 
-        lines = code.split("\n")
+    def _check_lines(
+        self,
+        lines: Iterable[str],
+        rules: RuleSet,
+        deadline: Deadline | None = None,
+        suppressions: SuppressionIndex | None = None,
+    ) -> list[Violation]:
+        violations: list[Violation] = []
+        suppressed_lines = suppressions.lines if suppressions else {}
 
         for number, line in enumerate(lines):
+            if number % 1024 == 0:
+                check_deadline(deadline)
+
+            line_rules = rules.get_line_rules(
+                suppressed_lines.get(number + 1)
+            )
+
             line_violations = []
-            for rule in self._line_rules:
+            for rule in line_rules:
                 v = rule.checker(line, number + 1)
                 if v:
                     line_violations.append(v)
@@ -89,50 +984,183 @@ class Scaner:
                 violations.extend(line_violations)
         return violations
 
-    def _scan_ast(self, code: str) -> list[Violation]:
-        violations: list[Violation] = []
+    def scan_incremental(
+        self,
+        code: str,
+        tree: ast.Module | None = None,
+        disabled_rules: Iterable[str] = (),
+        cancel: threading.Event | None = None,
+    ) -> tuple[list[Violation], ast.Module]:
+        """Scan `code`, reusing the tree returned by the previous call
 
-        tree = ast.parse(code)
+        Only rules of the module and of the changed top-level statements
+        are run again. Return violations and the tree for the next call,
+        which must use the same `disabled_rules`. When `cancel` is set,
+        `DeadlineExceeded` is raised and the tree must not be reused.
+        """
+        rules = self.get_rule_set(disabled_rules)
+        suppressions = build_suppression_index(code, rules.rule_violations)
 
-        violations = self._scan_node(tree, code)
+        try:
+            if tree is None:
+                tree = parse_ast(code)
+            else:
+                tree = reparse_ast(code, tree)
+        except SyntaxError as e:
+            # Keep the last valid tree for the next edit
+            violations = self._scan_raw_file(code, rules, cancel)
+            violations.append(InvalidSyntax(e.lineno or 1))
+            violations.extend(
+                self._scan_lines(code, rules, cancel, suppressions)
+            )
+            return suppressions.drop(violations), tree
 
-        return violations
+        # Only new statements are walked, index of module is merged
+        tree.depth = 0
+        tree.index = NodeIndex()
+        tree.index.add(tree)
+        for statement in tree.body:
+            if not hasattr(statement, "index"):
+                statement.parent = tree
+                statement.index, statement.checks = self._walk(
+                    statement, rules, 1
+                )
 
-    def _scan_node(self, node: ast.AST, source: str) -> list[Violation]:
-        node_violations = []
+            tree.index.extend(statement.index)
+
+        violations = self._scan_raw_file(code, rules, cancel)
+        line_index = LineIndex(code)
+
+        # Rules of module see all of it, so they are always run
+        module_checks = [(tree, rules.get_ast_rules(tree.__class__))]
+        violations.extend(
+            self._run_checks(
+                module_checks, code, tree.index, cancel, line_index
+            )
+        )
+
+        for statement in tree.body:
+            if not hasattr(statement, "violations"):
+                statement.violations = self._run_checks(
+                    statement.checks, code, tree.index, cancel, line_index
+                )
+                del statement.checks
+
+            violations.extend(statement.violations)
+
+        violations.extend(self._scan_lines(code, rules, cancel, suppressions))
+
+        return suppressions.drop(violations), tree
+
+    def _scan_ast(
+        self,
+        code: str,
+        rules: RuleSet,
+        deadline: Deadline | None = None,
+        timings: FileTimings | None = None,
+    ) -> list[Violation]:
+        start = time.perf_counter()
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return [InvalidSyntax(e.lineno or 1)]
+        finally:
+            if timings is not None:
+                # The whole phase is counted as AST rules by `scan`
+                elapsed = time.perf_counter() - start
+                timings.parse += elapsed
+                timings.ast_rules -= elapsed
+
+        tree.index, checks = self._walk(tree, rules)
+        try:
+            return self._run_checks(checks, code, tree.index, deadline)
+        finally:
+            # Break parent links, so the tree is freed right away
+            # and not by the garbage collector
+            tree.index.release()
+
+    def _walk(
+        self, root: ast.AST, rules: RuleSet, depth: int = 0
+    ) -> tuple[NodeIndex, list[tuple[ast.AST, list[Rule]]]]:
+        """The only walk over the tree: index nodes and find their rules
+
+        Rules are run after the walk, so they can use the complete index.
+        Subtrees, which can not contain nodes with rules, are skipped.
+        """
+        plan = rules.walk_plan
+        if plan is None:
+            index = NodeIndex()
+            get_children = ast.iter_child_nodes
+        else:
+            index = NodeIndex(plan.visit)
+            get_children = plan.children
+        index.roots.append(root)
+        checks: list[tuple[ast.AST, list[Rule]]] = []
+
+        root.depth = depth
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            index.add(node)
+
+            node_rules = rules.get_ast_rules(node.__class__)
+            if node_rules:
+                checks.append((node, node_rules))
+
+            children = list(get_children(node))
+            for children_node in children:
+                children_node.parent = node
+                children_node.depth = node.depth + 1
+
+            # Reversed, so nodes are visited in source order
+            stack.extend(reversed(children))
+
+        return index, checks
+
+    def _run_checks(
+        self,
+        checks: list[tuple[ast.AST, list[Rule]]],
+        source: str,
+        index: NodeIndex,
+        deadline: Deadline | None = None,
+        line_index: LineIndex | None = None,
+    ) -> list[Violation]:
+        """Run rules of nodes, columns of violations are in characters"""
+        violations: list[Violation] = []
 
-        node_type = node.__class__
-        rule_list = self._ast_rules[node_type]
+        for node, rules in checks:
+            violations.extend(
+                self._check_node(node, rules, source, index, deadline)
+            )
 
-        # Add parent classes
-        for p in node.__class__.__bases__:
+        if violations:
+            if line_index is None:
+                line_index = LineIndex(source)
+            line_index.to_char_columns(violations)
+        return violations
 
-            rule_list.extend(self._ast_rules[p])
+    def _check_node(
+        self,
+        node: ast.AST,
+        rule_list: list[Rule],
+        source: str,
+        index: NodeIndex,
+        deadline: Deadline | None = None,
+    ) -> list[Violation]:
+        node_violations = []
 
         # Get current node violations
         if rule_list:
-            node_to_scan = node
             for rule in rule_list:
-                args = inspect.getfullargspec(rule.checker).args
-
-                # If rule has some options (kwargs)
-                for option_name, option_value in rule.kwargs.items():
-                    if option_name not in self.AST_ALLOW_KWARGS:
-                        raise ValueError(
-                            f"Option (kwarg) {option_name} not exist!"
-                        )
-                    if (
-                        option_name == "ignore_comments_and_decorators"
-                        and option_value == True
-                    ):
-                        node_to_scan = ast_utils.remove_comments_from_ast(
-                            source
-                        )
-
-                if len(args) == 2:
-                    violations = rule.checker(node_to_scan, source)
+                check_deadline(deadline)
+                args_count = get_args_count(rule.checker)
+
+                if args_count == 3:
+                    violations = rule.checker(node, source, index)
+                elif args_count == 2:
+                    violations = rule.checker(node, source)
                 else:
-                    violations = rule.checker(node_to_scan)
+                    violations = rule.checker(node)
 
                 if (
                     not isinstance(violations, Iterable)
@@ -143,18 +1171,115 @@ class Scaner:
                 if violations:
                     node_violations.extend(violations)
 
-        # Get children node violations
-        for children in ast.iter_child_nodes(node):
-            children.parent = node
-            node_violations.extend(self._scan_node(children, source))
-
         return node_violations
 
+    def get_rule_set(self, disabled_rules: Iterable[str] = ()) -> RuleSet:
+        """Compiled rules without `disabled_rules`, cached per scanner"""
+        disabled_rules = frozenset(disabled_rules)
+
+        rule_set = self._rule_sets.get(disabled_rules)
+        if rule_set is None:
+            for pack in list(self._lazy_packs.values()):
+                if any(r.name not in disabled_rules for r in pack.rules):
+                    self.load_pack(pack.name)
+
+            def enabled(rules: list[Rule]) -> list[Rule]:
+                return [r for r in rules if r.name not in disabled_rules]
+
+            rule_set = RuleSet(
+                enabled(self._file_rules),
+                enabled(self._line_rules),
+                {t: enabled(rules) for t, rules in self._ast_rules.items()},
+            )
+            self._rule_sets[disabled_rules] = rule_set
+
+        return rule_set
+
+    def get_rule_names(self) -> set[str]:
+        rules = [*self._file_rules, *self._line_rules]
+        for ast_rules in self._ast_rules.values():
+            rules.extend(ast_rules)
+        for pack in self._lazy_packs.values():
+            rules.extend(pack.rules)
+
+        return {rule.name for rule in rules}
+
+    def find_violation_class(self, name: str) -> type[Violation] | None:
+        """Violation class by name, lazy packs are imported to find it"""
+        violation = get_violation_class(name)
+        if violation is not None:
+            return violation
+
+        # Packs, whose rules are run only by workers, are not imported yet
+        for pack in list(self._lazy_packs.values()):
+            if name in pack.violations:
+                try:
+                    self.load_pack(pack.name)
+                except ImportError:
+                    logger.warning("Rule pack %s can not be loaded", pack.name)
+                    continue
+
+                violation = get_violation_class(name)
+                if violation is not None:
+                    return violation
+
+        return None
+
+    def add_lazy_pack(self, pack: RulePackInfo) -> None:
+        """Add a rule pack, which is imported when needed"""
+        with self._packs_lock:
+            if pack.name not in self._loaded_packs:
+                self._lazy_packs = {**self._lazy_packs, pack.name: pack}
+                self._rule_sets = {}
+
+    def load_pack(self, name: str) -> None:
+        """Import a lazy rule pack and add its rules"""
+        with self._packs_lock:
+            pack = self._lazy_packs.get(name)
+            if pack is None:
+                return
+
+            for kind, rule in pack.load():
+                if kind == "file":
+                    self.add_file_rule(rule)
+                elif kind == "line":
+                    self.add_line_rule(rule)
+                else:
+                    for ast_type in rule.args:
+                        self.add_ast_rule(ast_type, rule)
+
+            self._lazy_packs = {
+                n: p for n, p in self._lazy_packs.items() if n != name
+            }
+            self._loaded_packs.add(name)
+
     def add_file_rule(self, rule: Rule) -> None:
-        self._file_rules.append(rule)
+        with self._lock:
+            self._file_rules = [*self._file_rules, rule]
+            self._rule_sets = {}
 
     def add_ast_rule(self, ast_type: Type[ast.AST], rule: Rule) -> None:
-        self._ast_rules[ast_type].append(rule)
+        with self._lock:
+            self._ast_rules[ast_type] = [*self._ast_rules[ast_type], rule]
+            self._rule_sets = {}
+
+    def add_fixer(self, violation: type[Violation], rule: Rule) -> None:
+        """Add a rule, which returns `TextEdit`s to fix the violation"""
+        with self._lock:
+            self._fixers = {**self._fixers, violation: rule}
+
+    def add_stream_rule(self, rule: Rule) -> None:
+        """Add a version of the file rule named `rule.args[0]` for
+        `scan_stream`, which takes lines of the file
+        """
+        name = rule.args[0]
+        if name not in {r.name for r in self._file_rules}:
+            raise ValueError(f"Rule {name} not exist!")
+
+        with self._lock:
+            self._stream_rules = {**self._stream_rules, name: rule}
 
     def add_line_rule(self, rule: Rule) -> None:
-        self._line_rules.append(rule)
+        with self._lock:
+            self._line_rules = [*self._line_rules, rule]
+            self._rule_sets = {}
@@ -0,0 +1,390 @@
+"""Language server, which lints open documents over stdio
+
+Documents are kept in memory with the tree of their last scan, so every
+edit re-checks only the changed statements. Scans run in one background
+thread: changes are debounced and a scan of an outdated version is
+cancelled.
+"""
+
+import ast
+import json
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from src.config import Config
+from src.core import DeadlineExceeded, Scaner
+from src.models import ScanTimeout, Violation, ViolationType
+from src.utils.text_utils import LineIndex
+
+logger = logging.getLogger(__name__)
+
+# Seconds without changes before a document is checked
+DEBOUNCE = 0.3
+
+SEVERITIES = {
+    ViolationType.ERROR: 1,
+    ViolationType.WARNING: 2,
+    ViolationType.NOT_RECOMMENDER: 3,
+}
+
+# Full documents are sent on every change
+TEXT_DOCUMENT_SYNC_FULL = 1
+
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+@dataclass
+class Document:
+    uri: str
+    text: str
+    version: int = 0
+    tree: ast.Module | None = None
+
+
+class _Cancel(threading.Event):
+    """Set to cancel a scan, it is also set when `expires` is over"""
+
+    expires: float | None = None
+
+    def is_set(self) -> bool:
+        if self.expires is not None and time.monotonic() > self.expires:
+            return True
+        return super().is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return super().is_set()
+
+
+@dataclass
+class _Scan:
+    uri: str
+    version: int
+    cancel: _Cancel = field(default_factory=_Cancel)
+
+
+def uri_to_path(uri: str) -> str:
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return uri
+    return url2pathname(unquote(parsed.path))
+
+
+def read_message(reader: BinaryIO) -> dict[str, Any] | None:
+    """Read one JSON-RPC message, None at the end of input"""
+    length = None
+    while True:
+        header = reader.readline()
+        if not header:
+            return None
+
+        header = header.strip()
+        if not header:
+            break
+
+        name, _, value = header.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+
+    if length is None:
+        raise ValueError("Message without Content-Length")
+
+    return json.loads(reader.read(length))
+
+
+def write_message(writer: BinaryIO, message: dict[str, Any]) -> None:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    writer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    writer.flush()
+
+
+def to_diagnostic(v: Violation, index: LineIndex) -> dict[str, Any]:
+    """Diagnostic of the violation, columns are in UTF-16 code units"""
+    lines_count = len(index.starts)
+    line = min(max(v.line, 1), lines_count)
+    start = {"line": line - 1, "character": v.column or 0}
+    end_line, end_column = line, len(index.line_text(line))
+    if v.end_line is not None and v.end_column is not None:
+        end_line, end_column = min(v.end_line, lines_count), v.end_column
+
+    start["character"] = index.utf16_column(line, start["character"])
+    end = {
+        "line": end_line - 1,
+        "character": index.utf16_column(end_line, end_column),
+    }
+
+    return {
+        "range": {"start": start, "end": end},
+        "severity": SEVERITIES[v.type],
+        "code": v.__class__.__name__,
+        "source": "little-lint",
+        "message": v.text,
+    }
+
+
+class LanguageServer:
+    def __init__(
+        self,
+        scanner: Scaner,
+        writer: BinaryIO,
+        config: Config | None = None,
+        debounce: float = DEBOUNCE,
+    ) -> None:
+        self._scanner = scanner
+        self._writer = writer
+        self._config = config or Config()
+        self._debounce = debounce
+
+        self.documents: dict[str, Document] = {}
+        self.shutdown_requested = False
+        self.running = True
+
+        # Uri -> time, when the document must be checked
+        self._pending: dict[str, float] = {}
+        self._current: _Scan | None = None
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+
+        self._worker = threading.Thread(
+            target=self._work, name="little-lint-scans", daemon=True
+        )
+        self._worker.start()
+
+    def serve(self, reader: BinaryIO) -> None:
+        try:
+            while self.running:
+                message = read_message(reader)
+                if message is None:
+                    break
+                self.handle(message)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        with self._condition:
+            self.running = False
+            if self._current is not None:
+                self._current.cancel.set()
+            self._condition.notify()
+
+        self._worker.join()
+
+    def handle(self, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+
+        handler = getattr(self, "_" + (method or "").replace("/", "_"), None)
+        if "id" not in message:
+            # Unknown notifications are ignored
+            if handler is not None:
+                handler(params)
+            return
+
+        if handler is None:
+            self._send(
+                {
+                    "id": message["id"],
+                    "error": {
+                        "code": METHOD_NOT_FOUND,
+                        "message": f"Method {method} not exist!",
+                    },
+                }
+            )
+            return
+
+        try:
+            result = handler(params)
+        except Exception as e:
+            logger.exception("Failed to handle %s", method)
+            self._send(
+                {
+                    "id": message["id"],
+                    "error": {"code": INTERNAL_ERROR, "message": str(e)},
+                }
+            )
+            return
+
+        self._send({"id": message["id"], "result": result})
+
+    def _initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_FULL,
+                    "save": True,
+                },
+            },
+            "serverInfo": {"name": "little-lint"},
+        }
+
+    def _shutdown(self, params: dict[str, Any]) -> None:
+        self.shutdown_requested = True
+
+    def _exit(self, params: dict[str, Any]) -> None:
+        self.running = False
+
+    def _textDocument_didOpen(self, params: dict[str, Any]) -> None:
+        item = params["textDocument"]
+        with self._condition:
+            self.documents[item["uri"]] = Document(
+                item["uri"], item["text"], item.get("version", 0)
+            )
+        self._schedule(item["uri"], 0)
+
+    def _textDocument_didChange(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None or not params["contentChanges"]:
+            return
+
+        # Only full sync is announced, the last change is the document
+        with self._condition:
+            document.text = params["contentChanges"][-1]["text"]
+            document.version = params["textDocument"].get("version", 0)
+        self._schedule(uri, self._debounce)
+
+    def _textDocument_didSave(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        if uri in self.documents:
+            self._schedule(uri, 0)
+
+    def _textDocument_didClose(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        with self._condition:
+            self.documents.pop(uri, None)
+            self._pending.pop(uri, None)
+            if self._current is not None and self._current.uri == uri:
+                self._current.cancel.set()
+
+        self._publish(uri, None, [])
+
+    def _schedule(self, uri: str, delay: float) -> None:
+        with self._condition:
+            self._pending[uri] = time.monotonic() + delay
+
+            # A newer version makes the running scan useless
+            if self._current is not None and self._current.uri == uri:
+                self._current.cancel.set()
+
+            self._condition.notify()
+
+    def _next_scan(self) -> tuple[_Scan, str, Any] | None:
+        """Wait for the next due document, None when stopped"""
+        with self._condition:
+            while self.running:
+                now = time.monotonic()
+                due = [(t, uri) for uri, t in self._pending.items()]
+                if due:
+                    due_time, uri = min(due)
+                    if due_time <= now:
+                        del self._pending[uri]
+                        document = self.documents[uri]
+                        self._current = _Scan(uri, document.version)
+                        return self._current, document.text, document.tree
+
+                    self._condition.wait(due_time - now)
+                else:
+                    self._condition.wait()
+
+        return None
+
+    def _work(self) -> None:
+        while True:
+            task = self._next_scan()
+            if task is None:
+                return
+
+            scan, text, tree = task
+            try:
+                self._check(scan, text, tree)
+            except Exception:
+                logger.exception("Failed to check %s", scan.uri)
+            finally:
+                with self._condition:
+                    self._current = None
+
+    def _check(
+        self, scan: _Scan, text: str, tree: ast.Module | None
+    ) -> None:
+        plan = self._config.plan_for(uri_to_path(scan.uri))
+        limits = plan.limits
+        if limits is not None and limits.max_seconds is not None:
+            scan.cancel.expires = time.monotonic() + limits.max_seconds
+
+        try:
+            if limits is not None and limits.is_oversized(text):
+                # Only cheap rules are run, or none, so it is not cancelled
+                violations = self._scanner.scan(
+                    text,
+                    limits=limits,
+                    disabled_rules=plan.disabled_rules,
+                )
+                tree = None
+            else:
+                violations, tree = self._scanner.scan_incremental(
+                    text, tree, plan.disabled_rules, scan.cancel
+                )
+        except DeadlineExceeded:
+            if scan.cancel.cancelled:
+                # The tree may be half updated, the next scan parses again
+                with self._condition:
+                    document = self.documents.get(scan.uri)
+                    if document is not None:
+                        document.tree = None
+                return
+
+            # Over the time limit, the next scan parses again too
+            violations, tree = [ScanTimeout(1)], None
+
+        with self._condition:
+            document = self.documents.get(scan.uri)
+            if document is None:
+                return
+
+            # The tree keeps its source, so it is a valid base for any
+            # newer version
+            document.tree = tree
+            if document.version != scan.version:
+                return
+
+        violations = [v for v in violations if type(v) not in plan.exclude]
+        index = LineIndex(text)
+        self._publish(
+            scan.uri,
+            scan.version,
+            [to_diagnostic(v, index) for v in violations],
+        )
+
+    def _publish(
+        self, uri: str, version: int | None, diagnostics: list[dict]
+    ) -> None:
+        params: dict[str, Any] = {"uri": uri, "diagnostics": diagnostics}
+        if version is not None:
+            params["version"] = version
+
+        self._send(
+            {"method": "textDocument/publishDiagnostics", "params": params}
+        )
+
+    def _send(self, message: dict[str, Any]) -> None:
+        with self._write_lock:
+            write_message(self._writer, {"jsonrpc": "2.0", **message})
+
+
+def serve(config: Config | None = None) -> int:
+    """Serve stdin and stdout, return the exit code"""
+    from src.rules import scanner
+
+    server = LanguageServer(scanner, sys.stdout.buffer, config)
+    server.serve(sys.stdin.buffer)
+
+    # Exit without shutdown request is an error by the protocol
+    return 0 if server.shutdown_requested else 1
@@ -1,4 +1,8 @@
+import ast
+from collections import Counter
+from dataclasses import dataclass, field
 from enum import unique, Enum
+from pathlib import Path
 
 from src.constants import MAX_LINE_LENGTH
 
@@ -9,19 +13,113 @@ class ViolationType(Enum):
     WARNING = 2
     NOT_RECOMMENDER = 3
 
+    def is_at_least(self, severity: "ViolationType") -> bool:
+        # The most severe type has the lowest value
+        return self.value <= severity.value
+
 
 class Violation:
     text: str = ""
     line: int
-    type: ViolationType
-
-    def __init__(self, line: int) -> None:
+    # Classes of rule packs may leave the default
+    type: ViolationType = ViolationType.WARNING
+
+    def __init__(
+        self,
+        line: int,
+        column: int | None = None,
+        end_line: int | None = None,
+        end_column: int | None = None,
+    ) -> None:
         self.line = line
+        # 0-based columns in characters, only when the rule knows them
+        self.column = column
+        self.end_line = end_line
+        self.end_column = end_column
+
+    @classmethod
+    def at(cls, node: ast.AST) -> "Violation":
+        """Violation at the range of `node`
+
+        Columns of AST nodes are in UTF-8 bytes, the scanner converts
+        them to characters.
+        """
+        return cls(
+            node.lineno, node.col_offset, node.end_lineno, node.end_col_offset
+        )
 
     def __repr__(self):
         return f"{self.__class__.__name__} violation in line {self.line}"
 
 
+@dataclass
+class FileTimings:
+    """Seconds spent on every phase of a file scan"""
+
+    read: float = 0.0
+    # Tokens are only read for suppression comments
+    tokenize: float = 0.0
+    parse: float = 0.0
+    file_rules: float = 0.0
+    line_rules: float = 0.0
+    ast_rules: float = 0.0
+    # Peak of memory allocated by the scan, in bytes
+    peak_memory: int = 0
+
+    @property
+    def total(self) -> float:
+        return (
+            self.read
+            + self.tokenize
+            + self.parse
+            + self.file_rules
+            + self.line_rules
+            + self.ast_rules
+        )
+
+
+@dataclass
+class FileResult:
+    path: Path | str
+    violations: list[Violation]
+
+    # Seconds spent on the file, when it was scanned and not copied
+    elapsed: float = 0.0
+    # Violations fixed in the file
+    fixed: int = 0
+    # Only when asked for
+    timings: FileTimings | None = None
+    # Texts of lines with violations, when asked for
+    line_texts: dict[int, str] | None = None
+
+
+@dataclass
+class ScanSummary:
+    """Counts of a run, which do not keep the violations themselves"""
+
+    files: int = 0
+    files_with_violations: int = 0
+    # Files with the same content as an already scanned file
+    dedup_hits: int = 0
+    fixed: int = 0
+    # Violations found in the baseline, which are not counted
+    baselined: int = 0
+    by_type: Counter[ViolationType] = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_type.values())
+
+    def add(self, result: FileResult) -> None:
+        self.files += 1
+        self.fixed += result.fixed
+        if result.violations:
+            self.files_with_violations += 1
+
+        for v in result.violations:
+            self.by_type[v.type] += 1
+
+
 class MaxLineLength(Violation):
     text = f"Max length should be {MAX_LINE_LENGTH}"
     type = ViolationType.WARNING
@@ -107,3 +205,47 @@ class TopLevelFuncAndClassDefNotSurrounded(Violation):
         "Surround top-level function"
         " and class definitions with two blank lines."
     )
+
+
+class FileTooLarge(Violation):
+    type = ViolationType.WARNING
+    text = "File exceeds the size limit, it was not fully checked."
+
+
+class ScanTimeout(Violation):
+    type = ViolationType.WARNING
+    text = (
+        "File check exceeded the time limit,"
+        " the remaining rules were skipped."
+    )
+
+
+class InvalidSyntax(Violation):
+    type = ViolationType.ERROR
+    text = "File can not be parsed, syntax rules were not checked."
+
+
+class InvalidArchive(Violation):
+    type = ViolationType.ERROR
+    text = "Archive can not be read, its files were not all checked."
+
+
+class ScanFailed(Violation):
+    type = ViolationType.ERROR
+    text = "File can not be checked because of an internal error."
+
+
+class WorkerCrashed(Violation):
+    type = ViolationType.ERROR
+    text = "Worker process crashed while checking the file."
+
+
+def get_violation_class(name: str) -> type[Violation] | None:
+    classes = Violation.__subclasses__()
+    while classes:
+        cls = classes.pop()
+        if cls.__name__ == name:
+            return cls
+        classes.extend(cls.__subclasses__())
+
+    return None
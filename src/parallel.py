@@ -0,0 +1,222 @@
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Literal, TypeAlias, TypeVar
+
+from src.utils.memory_utils import SpillBuffer
+
+ExecutorKind: TypeAlias = Literal["auto", "serial", "thread", "process"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# How many tasks per worker may be submitted ahead of the consumer
+TASKS_PER_WORKER = 4
+
+# How many pool crashes an item may be involved in
+MAX_ATTEMPTS = 3
+
+
+def gil_enabled() -> bool:
+    """Return False only on a free-threaded build running without the GIL"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is None:
+        return True
+    return is_gil_enabled()
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def resolve_kind(kind: ExecutorKind, jobs: int) -> ExecutorKind:
+    if jobs <= 1:
+        return "serial"
+
+    if kind == "auto":
+        # Threads share one warm scanner and skip pickling,
+        # but they only run in parallel without the GIL
+        return "process" if gil_enabled() else "thread"
+
+    return kind
+
+
+def make_executor(
+    kind: ExecutorKind,
+    jobs: int,
+    initializer: Callable[[], None] | None = None,
+) -> Executor:
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=jobs)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=jobs, initializer=initializer)
+
+    raise ValueError(f"Executor {kind} not exist!")
+
+
+def imap(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int | None = None,
+    kind: ExecutorKind = "auto",
+    window: int | None = None,
+    buffer: SpillBuffer[R] | None = None,
+    on_crash: Callable[[T], R] | None = None,
+    initializer: Callable[[], None] | None = None,
+    ordered: bool = True,
+) -> Iterator[R]:
+    """Lazy map of `func` over `items`, possibly in parallel
+
+    Items are pulled from `items` only when there is room for them, so
+    generators are consumed as they are produced. At most `window` items
+    are in progress or finished out of order, the latter are kept in
+    `buffer` if it is given.
+
+    If a worker process dies, the pool is restarted and its unfinished
+    items are submitted again. An item, which was in progress during
+    `MAX_ATTEMPTS` crashes, is mapped with `on_crash` (or the error is
+    raised, if it is None). `initializer` is run in every new worker
+    process. Unless `ordered`, results are yielded as soon as they are
+    ready, so one slow item does not hold back the others.
+    """
+    if jobs is None or jobs <= 0:
+        jobs = default_jobs()
+
+    kind = resolve_kind(kind, jobs)
+
+    if kind == "serial":
+        for item in items:
+            yield func(item)
+        return
+
+    if window is None:
+        window = jobs * TASKS_PER_WORKER
+
+    try:
+        yield from _ordered_map(
+            lambda: make_executor(kind, jobs, initializer),
+            func,
+            items,
+            max(window, jobs),
+            # Nothing waits for its turn without order
+            buffer if ordered else None,
+            on_crash,
+            ordered,
+        )
+    finally:
+        if buffer is not None:
+            buffer.close()
+
+
+def _ordered_map(
+    make_pool: Callable[[], Executor],
+    func: Callable[[T], R],
+    items: Iterable[T],
+    window: int,
+    buffer: SpillBuffer[R] | None = None,
+    on_crash: Callable[[T], R] | None = None,
+    ordered: bool = True,
+) -> Iterator[R]:
+    items_iter = iter(items)
+    exhausted = False
+
+    # Future -> (index, item, crashes)
+    in_flight: dict[Future, tuple[int, T, int]] = {}
+    # Items, which were in progress during a crash, are run one by one,
+    # so only the item, which crashes the pool, is blamed
+    suspects: deque[tuple[int, T, int]] = deque()
+    done: dict[int, R] | SpillBuffer[R] = {} if buffer is None else buffer
+
+    submitted = 0
+    head = 0
+
+    def retry(index: int, item: T, crashes: int) -> None:
+        if crashes + 1 < MAX_ATTEMPTS:
+            suspects.append((index, item, crashes + 1))
+        elif on_crash is not None:
+            done[index] = on_crash(item)
+        else:
+            raise BrokenExecutor(f"Worker crashed on {item!r}")
+
+    def restart() -> None:
+        # Unfinished tasks of a broken pool fail too, run them again
+        nonlocal executor
+        executor.shutdown(wait=True)
+        executor = make_pool()
+        for future, (index, item, crashes) in list(in_flight.items()):
+            del in_flight[future]
+
+            if future.done() and future.exception() is None:
+                done[index] = future.result()
+            else:
+                retry(index, item, crashes)
+
+    def submit(index: int, item: T, crashes: int) -> None:
+        try:
+            future = executor.submit(func, item)
+        except BrokenExecutor:
+            # The pool broke after the last wait, the item is counted
+            # as a suspect too, so a pool, which always breaks, stops
+            restart()
+            retry(index, item, crashes)
+        else:
+            in_flight[future] = (index, item, crashes)
+
+    executor = make_pool()
+    try:
+        while True:
+            if suspects and not in_flight:
+                submit(*suspects.popleft())
+
+            # Keep every worker busy without reading all items ahead
+            while (
+                not suspects
+                and not exhausted
+                and len(in_flight) + len(done) < window
+            ):
+                try:
+                    item = next(items_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                submit(submitted, item, 0)
+                submitted += 1
+
+            if not ordered:
+                while done:
+                    yield done.pop(next(iter(done)))
+
+            while head in done:
+                yield done.pop(head)
+                head += 1
+
+            if not in_flight:
+                if exhausted and not suspects:
+                    return
+                continue
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            crashed = False
+            for future in finished:
+                index, item, crashes = in_flight.pop(future)
+                try:
+                    done[index] = future.result()
+                except BrokenExecutor:
+                    crashed = True
+                    in_flight[future] = (index, item, crashes)
+
+            if crashed:
+                restart()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
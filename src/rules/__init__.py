@@ -1,7 +1,9 @@
 from src.core import Scaner
 from src.rules.ast_rules import ast_rules
 from src.rules.file_rules import file_rules
+from src.rules.fix_rules import fix_rules
 from src.rules.line_rules import line_rules
+from src.rules.stream_rules import stream_rules
 
 
 scanner = Scaner()
@@ -12,7 +14,13 @@ for rule in file_rules.get_all_rules():
 for rule in line_rules.get_all_rules():
     scanner.add_line_rule(rule)
 
+for rule in stream_rules.get_all_rules():
+    scanner.add_stream_rule(rule)
+
 for rule in ast_rules.get_all_rules():
     for ast_type in rule.args:
 
         scanner.add_ast_rule(ast_type, rule)
+
+for rule in fix_rules.get_all_rules():
+    scanner.add_fixer(rule.args[0], rule)
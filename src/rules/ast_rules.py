@@ -1,4 +1,5 @@
 import ast
+import functools
 import importlib.util
 import sys
 from enum import Enum, unique
@@ -37,6 +38,12 @@ def get_import_type(imp: ast.Import | ast.ImportFrom) -> ImportType:
     if import_name is None:
         return ImportType.PROJECT
 
+    return get_module_type(import_name)
+
+
+# Shared by every file and thread of a run, lru_cache is thread-safe
+@functools.lru_cache(maxsize=None)
+def get_module_type(import_name: str) -> ImportType:
     stdlib_names = sys.stdlib_module_names
     if import_name in stdlib_names:
         return ImportType.STDLIB
@@ -62,16 +69,13 @@ def get_import_type(imp: ast.Import | ast.ImportFrom) -> ImportType:
 
 
 @ast_rules.rule(ast.Module)
-def right_order(node: ast.Module) -> list[Violation]:
+def right_order(
+    node: ast.Module, source: str, index: ast_utils.NodeIndex
+) -> list[Violation]:
     imports_violation = []
 
-    all_imports = []
-
-    for n in node.body:
-        if isinstance(n, (ast.Import, ast.ImportFrom)):
-            all_imports.append(n)
-
-    all_imports = sorted(all_imports, key=lambda i: i.lineno)
+    # Already sorted by line
+    all_imports = index.of_type(ast.Import, ast.ImportFrom, depth=1)
 
     # Sort imports
     last_import_type: ImportType = ImportType.NOT_FOUND
@@ -79,11 +83,11 @@ def right_order(node: ast.Module) -> list[Violation]:
         import_type = get_import_type(imp)
 
         if import_type == ImportType.NOT_FOUND:
-            imports_violation.append(ModuleNotFound(imp.lineno))
+            imports_violation.append(ModuleNotFound.at(imp))
             continue
 
         if last_import_type.value > import_type.value:
-            imports_violation.append(InvalidImportsOrder(imp.lineno))
+            imports_violation.append(InvalidImportsOrder.at(imp))
 
         last_import_type = import_type
     return imports_violation
@@ -92,42 +96,60 @@ def right_order(node: ast.Module) -> list[Violation]:
 @ast_rules.rule(ast.Import)
 def import_on_one_line(node: ast.Import) -> Violation | None:
     if len(node.names) > 1:
-        return ManyImportOnOneLine(node.lineno)
+        return ManyImportOnOneLine.at(node)
 
 
-@ast_rules.rule(ast.Import, ast.ImportFrom)
+# Module rule, because the result depends on all top-level statements
+@ast_rules.rule(ast.Module)
 def import_not_at_top_of_file(
-    node: ast.Import | ast.ImportFrom,
-) -> Violation | None:
-    # Get root
-    root = node
-    while hasattr(root, "parent"):
-        root = root.parent
-
+    node: ast.Module, source: str, index: ast_utils.NodeIndex
+) -> list[Violation]:
     # ToDo: support docstrings
 
-    import_lineno = node.lineno
-    for n in root.body:
+    code_start = None
+    for n in node.body:
         if not isinstance(n, (ast.Import, ast.ImportFrom)):
-            if n.lineno < import_lineno:
-                return ImportsNotAtTop(import_lineno)
+            code_start = (n.lineno, n.col_offset)
+            break
+
+    if code_start is None:
+        return []
+
+    # Imports nested in functions and classes are reported too
+    return [
+        ImportsNotAtTop.at(n)
+        for n in index.of_type(ast.Import, ast.ImportFrom)
+        if (n.lineno, n.col_offset) > code_start
+    ]
 
 
 @ast_rules.rule(ast.ImportFrom)
 def relative_import_from(node: ast.ImportFrom) -> Violation | None:
     if node.level > 0:
-        return RelativeImports(node.lineno)
+        return RelativeImports.at(node)
 
 
-@ast_rules.rule(ast.Module, ignore_comments_and_decorators=True)
+@ast_rules.rule(ast.Module)
 def top_level_must_be_surrounded(
-    module: ast.FunctionDef, source: str
+    module: ast.Module, source: str
 ) -> list[Violation] | None:
 
     violations = []
+    lines = source.split("\n")
+
+    def blank_lines_between(upper: ast.AST, lower: ast.AST) -> int:
+        """Count lines between two statements, comments are ignored"""
+        upper_end = ast_utils.get_block_end_lineno(upper)
+        lower_start = ast_utils.get_block_start_lineno(lower)
+
+        return sum(
+            1
+            for line in lines[upper_end : lower_start - 1]
+            if not line.lstrip().startswith("#")
+        )
 
     nodes_must_be_surrounded: list[int] = []
-    for index, child in enumerate(ast.iter_child_nodes(module)):
+    for index, child in enumerate(module.body):
         if isinstance(child, (ast.FunctionDef, ast.ClassDef)):
             nodes_must_be_surrounded.append(index)
 
@@ -140,9 +162,8 @@ def top_level_must_be_surrounded(
 
         # If node at middle
         if (
-            node.lineno
-            - ast_utils.get_block_end_lineno(module.body[node_index - 1])
-            != constants.TOP_LEVEL_DEFS_TAB + 1
+            blank_lines_between(module.body[node_index - 1], node)
+            != constants.TOP_LEVEL_DEFS_TAB
         ):
             violations.append(
                 TopLevelFuncAndClassDefNotSurrounded(node.lineno)
@@ -153,16 +174,15 @@ def top_level_must_be_surrounded(
         if node_index == len(module.body) - 1:
             continue
 
-        node_end_lineno = ast_utils.get_block_end_lineno(node)
-        next_node_lineno = module.body[node_index + 1].lineno
+        next_node = module.body[node_index + 1]
 
         if (
-            module.body[node_index + 1] not in nodes_must_be_surrounded
-            and next_node_lineno - node_end_lineno
-            != constants.TOP_LEVEL_DEFS_TAB + 1
+            node_index + 1 not in nodes_must_be_surrounded
+            and blank_lines_between(node, next_node)
+            != constants.TOP_LEVEL_DEFS_TAB
         ):
             violations.append(
-                TopLevelFuncAndClassDefNotSurrounded(next_node_lineno)
+                TopLevelFuncAndClassDefNotSurrounded(next_node.lineno)
             )
 
     return violations
@@ -1,6 +1,7 @@
 import re
 import tokenize
 from io import BytesIO
+from collections.abc import Iterable
 from re import fullmatch
 
 import io
@@ -9,48 +10,49 @@ import tokenize
 from src import constants
 from src.models import *
 from src.rules.rules_container import RulesContainer
-from src.types import FileRule
+from src.types import Deadline, FileRule, check_deadline
+from src.utils.line_metrics import LineMetrics
 
 file_rules = RulesContainer()
 
 
 @file_rules.rule
-def check_max_line_length(code: str) -> list[Violation]:
+def check_max_line_length(
+    code: str, metrics: LineMetrics | None = None
+) -> list[Violation]:
     result: list[Violation] = []
+    if metrics is None:
+        metrics = LineMetrics(code)
 
-    code = code.replace("\t", "    ")
-    lines = code.split("\n")
-
-    for number, l in enumerate(lines):
-        if l.startswith("#"):
-            if len(l) <= 72:
+    for number in metrics.longer_than(constants.MAX_LINE_LENGTH):
+        if metrics.line(number).startswith("#"):
+            if metrics.lengths[number - 1] <= 72:
                 continue
-        if len(l) > constants.MAX_LINE_LENGTH:
-            result.append(MaxLineLength(number + 1))
+        result.append(MaxLineLength(number))
 
     return result
 
 
 @file_rules.rule
-def check_tabs(code: str) -> list[Violation]:
-    result: list[Violation] = []
-
-    lines = code.split("\n")
+def check_tabs(
+    code: str, metrics: LineMetrics | None = None
+) -> list[Violation]:
+    if metrics is None:
+        metrics = LineMetrics(code)
 
-    for number, l in enumerate(lines):
-        if l.startswith("\t"):
-            result.append(UsingTabsToTabulation(number + 1))
-    return result
+    return [UsingTabsToTabulation(n) for n in metrics.starting_with_tab()]
 
 
 @file_rules.rule
-def blank_line_at_end(code: str) -> Violation | None:
-    last_line = code.split("\n")[-1]
-    if re.findall(r"\S", last_line):
-        return NoBlankLineAtEnd(len(code.split("\n")))
+def blank_line_at_end(
+    code: str, metrics: LineMetrics | None = None
+) -> Violation | None:
+    # Only the last line is checked, so the metrics are not needed
+    last_line = code[code.rfind("\n") + 1 :]
+    if last_line.strip():
+        return NoBlankLineAtEnd(code.count("\n") + 1)
 
 
-@file_rules.rule
 def get_leading_spaces_count(source: str) -> int:
     count = 0
     for char in source:
@@ -62,23 +64,44 @@ def get_leading_spaces_count(source: str) -> int:
 
 
 @file_rules.rule
-def use_4_spaces_for_level(code: str) -> list[Violation] | None | Violation:
+def use_4_spaces_for_level(
+    code: str,
+    metrics: LineMetrics | None = None,
+    deadline: Deadline | None = None,
+) -> list[Violation] | None | Violation:
     """Checks, is every line if file use 4 spaces
     per indentation level
     """
-    violations = []
+    if metrics is None:
+        metrics = LineMetrics(code)
+
     # ToDo: exclude docstrings and comments
     code = code.replace("\t", "    ")
 
-    previous_tabs_count = 0
+    return check_indentation(
+        zip(code.split("\n"), metrics.leading_spaces), deadline
+    )
+
+
+def check_indentation(
+    lines: Iterable[tuple[str, int]], deadline: Deadline | None = None
+) -> list[Violation]:
+    """Check `(line, leading spaces)` of lines with tabs replaced
+
+    `DeadlineExceeded` is raised, when the `deadline` is over, even in
+    the middle of a huge line.
+    """
+    violations = []
+
     open_bracket_count = 0
     open_bracket_level = []
     open_docstring = False
 
-    for number, line in enumerate(code.split("\n")):
+    for number, (line, leading_spaces_count) in enumerate(lines):
+        if number % 1024 == 0:
+            check_deadline(deadline)
         number += 1
 
-        leading_spaces_count = get_leading_spaces_count(line)
         if open_bracket_count > 0:
             if not line:
                 pass
@@ -97,6 +120,8 @@ def use_4_spaces_for_level(code: str) -> list[Violation] | None | Violation:
             open_docstring = not open_string
 
         for cn, c in enumerate(line):
+            if cn and cn % 65536 == 0:
+                check_deadline(deadline)
             if c in ("'", '"'):
                 open_string = not open_string
 
@@ -105,7 +130,8 @@ def use_4_spaces_for_level(code: str) -> list[Violation] | None | Violation:
             if c == "(":
                 open_bracket_count += 1
                 open_bracket_level.append(leading_spaces_count)
-            if c == ")":
+            # An unbalanced bracket is reported as invalid syntax
+            if c == ")" and open_bracket_level:
                 open_bracket_count -= 1
                 del open_bracket_level[-1]
         if count_before < open_bracket_count:
@@ -118,14 +144,20 @@ def use_4_spaces_for_level(code: str) -> list[Violation] | None | Violation:
     return violations
 
 
-
 @file_rules.rule
 def comments_must_start_with_space(code: str) -> Violation | None:
     code_io = io.BytesIO(code.encode("utf-8"))
 
-    for token in tokenize.tokenize(code_io.readline):
-        if token.type == tokenize.COMMENT and re.match(r"^#\w", token.string):
-            return CommentsMustStartWithSpace(token.start[0])
+    try:
+        for token in tokenize.tokenize(code_io.readline):
+            if token.type == tokenize.COMMENT and re.match(
+                r"^#\w", token.string
+            ):
+                return CommentsMustStartWithSpace(*token.start, *token.end)
+    except (tokenize.TokenError, SyntaxError):
+        # Invalid code is reported by the scanner
+        return None
+
 
 # @file_rules.rule
 def top_level_must_be_surrounded(code: str) -> list[Violation] | None:
@@ -0,0 +1,155 @@
+import ast
+import re
+import tokenize
+
+from src.models import *
+from src.rules.ast_rules import ImportType, get_import_type
+from src.rules.rules_container import RulesContainer
+from src.types import TextEdit
+from src.utils.text_utils import SourceText
+
+fix_rules = RulesContainer()
+
+
+@fix_rules.rule(UsingTabsToTabulation)
+def replace_tabs(v: Violation, source: SourceText) -> TextEdit | None:
+    line = source.lines[v.line - 1]
+    tabs = _count_tabs(line)
+    if not tabs:
+        return None
+
+    start = source.offset(v.line)
+    return TextEdit(start, start + tabs, "    " * tabs)
+
+
+def _count_tabs(line: str) -> int:
+    return len(line) - len(line.lstrip("\t"))
+
+
+@fix_rules.rule(NoBlankLineAtEnd)
+def add_blank_line(v: Violation, source: SourceText) -> TextEdit:
+    return TextEdit(len(source.code), len(source.code), "\n")
+
+
+@fix_rules.rule(CommentsMustStartWithSpace)
+def add_space_to_comments(v: Violation, source: SourceText) -> list[TextEdit]:
+    # Only the first comment is reported, but all of them are fixed
+    edits = []
+    for token in source.tokens:
+        if token.type == tokenize.COMMENT and re.match(r"^#\w", token.string):
+            offset = source.offset(*token.start) + 1
+            edits.append(TextEdit(offset, offset, " "))
+    return edits
+
+
+@fix_rules.rule(ManyImportOnOneLine)
+def split_imports(v: Violation, source: SourceText) -> TextEdit | None:
+    if source.tree is None:
+        return None
+
+    for node in source.tree.index.of_type(ast.Import):
+        if node.lineno == v.line and len(node.names) > 1:
+            break
+    else:
+        return None
+
+    # The indent as it is after the fix of tabs in the same line
+    line = source.lines[node.lineno - 1]
+    tabs = _count_tabs(line)
+    indent = "    " * tabs + line[tabs : len(line) - len(line.lstrip())]
+    imports = [f"import {ast.unparse(alias)}" for alias in node.names]
+
+    return TextEdit(
+        source.node_offset(node.lineno, node.col_offset),
+        source.node_offset(node.end_lineno, node.end_col_offset),
+        f"\n{indent}".join(imports),
+    )
+
+
+@fix_rules.rule(InvalidImportsOrder)
+def sort_imports(v: Violation, source: SourceText) -> TextEdit | None:
+    """Sort the group of top-level imports with the violation
+
+    Imports are grouped by their type with blank lines, `import a, b`
+    is split, as the fix of `ManyImportOnOneLine` overlaps this one.
+    Groups with comments or with several statements on a line are not
+    changed.
+    """
+    if source.tree is None:
+        return None
+
+    group = _get_imports_group(source.tree, v.line)
+    if group is None:
+        return None
+
+    first, last = group[0].lineno, group[-1].end_lineno
+    covered = {
+        n for node in group for n in range(node.lineno, node.end_lineno + 1)
+    }
+    for number in range(first, last + 1):
+        if number not in covered and source.lines[number - 1].strip():
+            return None
+    if len(covered) != sum(n.end_lineno - n.lineno + 1 for n in group):
+        return None
+
+    # (type, source lines) of every import
+    imports: list[tuple[ImportType, list[str]]] = []
+    for node in group:
+        if isinstance(node, ast.Import) and len(node.names) > 1:
+            for alias in node.names:
+                imports.append(
+                    (
+                        get_import_type(ast.Import(names=[alias])),
+                        [f"import {ast.unparse(alias)}"],
+                    )
+                )
+        else:
+            imports.append(
+                (
+                    get_import_type(node),
+                    source.lines[node.lineno - 1 : node.end_lineno],
+                )
+            )
+
+    # Imports not found keep the place after the previous import
+    keys = []
+    last_type = ImportType.NOT_FOUND
+    for import_type, _ in imports:
+        if import_type != ImportType.NOT_FOUND:
+            last_type = import_type
+        keys.append(last_type.value)
+
+    lines: list[str] = []
+    last_key = None
+    for key, (_, import_lines) in sorted(
+        zip(keys, imports), key=lambda pair: pair[0]
+    ):
+        if last_key is not None and key != last_key:
+            lines.append("")
+        lines.extend(import_lines)
+        last_key = key
+
+    return TextEdit(
+        source.offset(first),
+        source.offset(last, len(source.lines[last - 1])),
+        "\n".join(lines),
+    )
+
+
+def _get_imports_group(
+    tree: ast.Module, line: int
+) -> list[ast.Import | ast.ImportFrom] | None:
+    """Consecutive top-level imports with the one at `line`"""
+    group: list[ast.Import | ast.ImportFrom] = []
+    found = False
+
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            group.append(node)
+            found = found or node.lineno == line
+        elif found:
+            break
+        else:
+            group = []
+
+    return group if found else None
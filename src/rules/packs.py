@@ -0,0 +1,176 @@
+"""Third-party rule packs, registered with entry points
+
+    [project.entry-points."little_lint.rules"]
+    my-pack = "my_pack.rules"
+
+A pack module defines `file_rules`, `line_rules` and `ast_rules`
+containers, like the modules of `src.rules`. Rules of a pack are found
+in its source without importing it, the module is imported only when
+one of the rules is enabled.
+"""
+
+import ast
+import importlib
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Literal
+
+from src.rules.rules_container import Rule, RulesContainer
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "little_lint.rules"
+
+RuleKind = Literal["file", "line", "ast"]
+CONTAINERS: dict[str, RuleKind] = {
+    "file_rules": "file",
+    "line_rules": "line",
+    "ast_rules": "ast",
+}
+
+
+@dataclass(frozen=True)
+class RuleInfo:
+    name: str
+    kind: RuleKind
+    # Node types of AST rules, as they are written in the decorator
+    node_types: tuple[str, ...] = ()
+    # Names of violation classes created by the rule
+    violations: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class RulePackInfo:
+    name: str
+    module: str
+    rules: tuple[RuleInfo, ...]
+
+    @property
+    def violations(self) -> frozenset[str]:
+        return frozenset(v for rule in self.rules for v in rule.violations)
+
+    def load(self) -> list[tuple[RuleKind, Rule]]:
+        """Import the pack and return its rules"""
+        module = importlib.import_module(self.module)
+
+        rules = []
+        for attribute, kind in CONTAINERS.items():
+            container = getattr(module, attribute, None)
+            if isinstance(container, RulesContainer):
+                rules.extend(
+                    (kind, rule) for rule in container.get_all_rules()
+                )
+        return rules
+
+
+def discover_packs(names: Iterable[str] | None = None) -> list[RulePackInfo]:
+    """Read rule packs with `names` (or all of them) without importing"""
+    names = None if names is None else set(names)
+
+    packs = []
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        if names is not None and entry_point.name not in names:
+            continue
+
+        module = entry_point.module
+        source = _find_source(entry_point.dist, module)
+        if source is None:
+            # The only way to know the rules is to import the module
+            logger.warning("Source of rule pack %s not found", module)
+            rules = _describe_loaded(entry_point.name, module)
+        else:
+            rules = describe_rules(source.read_text(encoding="utf-8"))
+
+        packs.append(RulePackInfo(entry_point.name, module, rules))
+
+    if names is not None:
+        for name in names - {pack.name for pack in packs}:
+            raise ValueError(f"Rule pack {name} not exist!")
+
+    return packs
+
+
+def describe_rules(source: str) -> tuple[RuleInfo, ...]:
+    """Rules registered in the source of a pack module"""
+    tree = ast.parse(source)
+
+    rules = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+
+        for decorator in node.decorator_list:
+            call = decorator if isinstance(decorator, ast.Call) else None
+            target = decorator.func if call is not None else decorator
+
+            if (
+                isinstance(target, ast.Attribute)
+                and target.attr == "rule"
+                and isinstance(target.value, ast.Name)
+                and target.value.id in CONTAINERS
+            ):
+                node_types = ()
+                if call is not None:
+                    node_types = tuple(ast.unparse(arg) for arg in call.args)
+
+                rules.append(
+                    RuleInfo(
+                        node.name,
+                        CONTAINERS[target.value.id],
+                        node_types,
+                        _get_created_classes(node),
+                    )
+                )
+
+    return tuple(rules)
+
+
+def _get_created_classes(function: ast.FunctionDef) -> frozenset[str]:
+    """Capitalized names, which are called, like `NoPrint(...)`, or
+    whose methods are called, like `NoPrint.at(node)`
+    """
+    names = set()
+    for node in ast.walk(function):
+        if not isinstance(node, ast.Call):
+            continue
+
+        target = node.func
+        if isinstance(target, ast.Attribute):
+            target = target.value
+        if isinstance(target, ast.Name) and target.id[:1].isupper():
+            names.add(target.id)
+
+    return frozenset(names)
+
+
+def _find_source(
+    dist: metadata.Distribution | None, module: str
+) -> Path | None:
+    if dist is None or dist.files is None:
+        return None
+
+    module_path = module.replace(".", "/")
+    candidates = {f"{module_path}.py", f"{module_path}/__init__.py"}
+    for file in dist.files:
+        if file.as_posix() in candidates:
+            path = Path(dist.locate_file(file))
+            if path.is_file():
+                return path
+
+    return None
+
+
+def _describe_loaded(name: str, module: str) -> tuple[RuleInfo, ...]:
+    rules = RulePackInfo(name, module, ()).load()
+    return tuple(
+        RuleInfo(
+            rule.name,
+            kind,
+            tuple(t.__name__ for t in rule.args or ()),
+            rule.violations,
+        )
+        for kind, rule in rules
+    )
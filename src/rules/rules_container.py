@@ -1,10 +1,12 @@
 import functools
+import inspect
 from collections.abc import FunctionType
 from dataclasses import dataclass
 from typing import Any, Mapping, overload
 
 from black.trans import Callable
 
+from src.models import get_violation_class
 from src.types import AstRule, FileRule, LineRule
 
 
@@ -15,6 +17,26 @@ class Rule:
     args: tuple[Any, ...] | None = None
     kwargs: Mapping[Any, Any] | None = None
 
+    @property
+    def name(self) -> str:
+        return self.checker.__name__
+
+    @functools.cached_property
+    def violations(self) -> frozenset[str]:
+        """Names of violations created in the code of the checker"""
+        names = set()
+        codes = [getattr(self.checker, "__code__", None)]
+        while codes:
+            code = codes.pop()
+            if code is None:
+                continue
+            names.update(
+                name for name in code.co_names if get_violation_class(name)
+            )
+            codes.extend(c for c in code.co_consts if inspect.iscode(c))
+
+        return frozenset(names)
+
 
 class RulesContainer:
     def __init__(self):
@@ -0,0 +1,77 @@
+"""Versions of file rules for files, which are read line by line
+
+Every rule is registered for the file rule with the given name. It takes
+lines of the file without line ends and keeps at most one of them.
+"""
+
+import re
+import tokenize
+from collections.abc import Iterable
+
+from src import constants
+from src.models import *
+from src.rules.file_rules import check_indentation, get_leading_spaces_count
+from src.rules.rules_container import RulesContainer
+from src.types import Deadline
+
+stream_rules = RulesContainer()
+
+
+@stream_rules.rule("check_max_line_length")
+def check_max_line_length(lines: Iterable[str]) -> list[Violation]:
+    result: list[Violation] = []
+
+    for number, line in enumerate(lines):
+        length = len(line) + 3 * line.count("\t")
+        if line.startswith("#") and length <= 72:
+            continue
+        if length > constants.MAX_LINE_LENGTH:
+            result.append(MaxLineLength(number + 1))
+
+    return result
+
+
+@stream_rules.rule("check_tabs")
+def check_tabs(lines: Iterable[str]) -> list[Violation]:
+    return [
+        UsingTabsToTabulation(number + 1)
+        for number, line in enumerate(lines)
+        if line.startswith("\t")
+    ]
+
+
+@stream_rules.rule("blank_line_at_end")
+def blank_line_at_end(lines: Iterable[str]) -> Violation | None:
+    count = 0
+    last_line = ""
+    for count, last_line in enumerate(lines, 1):
+        pass
+
+    if re.findall(r"\S", last_line):
+        return NoBlankLineAtEnd(count)
+
+
+@stream_rules.rule("use_4_spaces_for_level")
+def use_4_spaces_for_level(
+    lines: Iterable[str], deadline: Deadline | None = None
+) -> list[Violation]:
+    expanded = (line.replace("\t", "    ") for line in lines)
+    return check_indentation(
+        ((line, get_leading_spaces_count(line)) for line in expanded),
+        deadline,
+    )
+
+
+@stream_rules.rule("comments_must_start_with_space")
+def comments_must_start_with_space(lines: Iterable[str]) -> Violation | None:
+    readline = (line + "\n" for line in lines).__next__
+
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type == tokenize.COMMENT and re.match(
+                r"^#\w", token.string
+            ):
+                return CommentsMustStartWithSpace(*token.start, *token.end)
+    except (tokenize.TokenError, SyntaxError):
+        # Invalid code is reported by the scanner
+        return None
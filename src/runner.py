@@ -0,0 +1,300 @@
+import hashlib
+import os
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from src import constants, parallel, scheduler
+from src.archives import ARCHIVE_ERRORS, is_archive, iter_members
+from src.models import FileResult, ScanSummary
+from src.parallel import ExecutorKind
+from src.rules import scanner
+from src.sharding import Shard
+from src.types import STREAM_CHUNK_SIZE, RulePlan, ScanLimits
+
+
+def iter_python_files(
+    paths: Iterable[Path],
+    excluded: tuple[str, ...] = constants.EXCLUDED_FOLDERS,
+    with_archives: bool = True,
+) -> Iterator[Path]:
+    """Yield python files under `paths`
+
+    With `with_archives` archives given in `paths` are yielded too,
+    archives found in folders are not.
+    """
+    for path in paths:
+        if path.name in excluded:
+            continue
+
+        if os.path.isdir(path):
+            children = sorted(path.iterdir())
+            yield from iter_python_files(children, excluded, False)
+
+        elif path.suffix == ".py" or (with_archives and is_archive(path)):
+            yield path
+
+
+def read_file_list(stream: BinaryIO) -> Iterator[str]:
+    """Yield paths of a NUL or newline separated list as they arrive
+
+    Paths are separated by NUL, if there is a NUL in the first chunk
+    with a separator, and by newlines otherwise.
+    """
+    read = getattr(stream, "read1", stream.read)
+    separator = None
+    pending = b""
+
+    while chunk := read(STREAM_CHUNK_SIZE):
+        pending += chunk
+        if separator is None:
+            if b"\0" in pending:
+                separator = b"\0"
+            elif b"\n" in pending:
+                separator = b"\n"
+            else:
+                continue
+
+        *names, pending = pending.split(separator)
+        for name in names:
+            yield from _decode_name(name, separator)
+
+    yield from _decode_name(pending, separator)
+
+
+def _decode_name(name: bytes, separator: bytes | None) -> Iterator[str]:
+    if separator != b"\0":
+        name = name.rstrip(b"\r")
+    if name:
+        yield os.fsdecode(name)
+
+
+def scan_paths(
+    paths: Iterable[Path],
+    jobs: int = 1,
+    executor: ExecutorKind = "auto",
+    *,
+    excluded: tuple[str, ...] = constants.EXCLUDED_FOLDERS,
+    dedup: bool = True,
+    summary: ScanSummary | None = None,
+    stats: Path | None = None,
+    shard: Shard | None = None,
+    **options: Any,
+) -> Iterator[FileResult]:
+    """Scan every python file under `paths`, yielding results
+
+    With `dedup` every distinct content is scanned once, results of its
+    other copies are yielded after it. With `max_buffered` of the
+    memory-bounded mode results are not kept for copies found later,
+    such copies are scanned again. With `stats` files are scheduled
+    by their scan time in previous runs, which is kept in that file,
+    and results are yielded as they are ready. With `shard` only files
+    of the shard are scanned. Python files of archives in `paths` are
+    scanned one archive at a time. Other `options` are passed to
+    `Scaner.scan_many`.
+    """
+    files: Iterable[Path] = iter_python_files(paths, excluded)
+    if shard is not None:
+        files = shard.select(files)
+
+    if stats is not None:
+        history = scheduler.CostHistory.load(stats)
+        sizes = {path: _get_size(path) for path in files}
+        costs = history.expected_costs(sizes)
+        files = scheduler.order_by_cost(costs)
+
+    content_keys: dict[Path | str, Hashable] = {}
+    copies: defaultdict[Hashable, list[Path | str]] = defaultdict(list)
+    seen_keys: set[Hashable] = set()
+    results: dict[Hashable, FileResult] = {}
+    keep_results = options.get("max_buffered") is None
+
+    if dedup:
+        items = _unique_sources(
+            files,
+            options.get("plan_for"),
+            options.get("limits"),
+            content_keys,
+            copies,
+            seen_keys,
+            excluded,
+        )
+    else:
+        # Files are read by workers
+        items = _sources(files, excluded)
+
+    if stats is not None:
+        items = scheduler.iter_batches(
+            items, costs, jobs if jobs > 0 else parallel.default_jobs()
+        )
+        options["batched"] = True
+
+    for result in scanner.scan_many(
+        items, jobs=jobs, executor=executor, summary=summary, **options
+    ):
+        if stats is not None and result.path in sizes:
+            # Files of archives are not kept
+            history.record(result.path, sizes[result.path], result.elapsed)
+
+        if not dedup:
+            yield result
+            continue
+
+        key = content_keys.pop(result.path)
+        results[key] = result
+        yield result
+
+        # Copies can be found before or after the scan of their original
+        yield from _copy_results(copies, results, summary)
+        if not keep_results:
+            # Copies found later are new files again
+            del results[key]
+            seen_keys.discard(key)
+
+    # The last copies are found when the scan is over
+    yield from _copy_results(copies, results, summary)
+
+    if stats is not None:
+        history.save(stats)
+
+
+def _get_size(path: Path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _copy_results(
+    copies: defaultdict[Hashable, list[Path | str]],
+    results: dict[Hashable, FileResult],
+    summary: ScanSummary | None,
+) -> Iterator[FileResult]:
+    for key in [key for key in copies if key in results]:
+        for path in copies.pop(key):
+            original = results[key]
+            copy_result = FileResult(
+                path, original.violations, line_texts=original.line_texts
+            )
+            if summary is not None:
+                summary.add(copy_result)
+                summary.dedup_hits += 1
+            yield copy_result
+
+
+def _sources(
+    files: Iterable[Path], excluded: tuple[str, ...]
+) -> Iterator[tuple[Path | str, bytes | Path]]:
+    for path in files:
+        if not is_archive(path):
+            yield path, path
+            continue
+
+        for name, data in _archive_members(path, excluded):
+            yield name, path if data is None else data
+
+
+def _archive_members(
+    archive: Path, excluded: tuple[str, ...]
+) -> Iterator[tuple[Path | str, bytes | None]]:
+    """Yield `(path, content)` of python files of the archive
+
+    The archive itself is yielded without content, when it can not be
+    read, to let the scanner report it.
+    """
+    try:
+        yield from iter_members(archive, excluded)
+    except ARCHIVE_ERRORS:
+        yield archive, None
+
+
+def _unique_sources(
+    files: Iterable[Path],
+    plan_for: Callable[[Path | str], RulePlan] | None,
+    limits: ScanLimits | None,
+    content_keys: dict[Path | str, Hashable],
+    copies: defaultdict[Hashable, list[Path | str]],
+    seen_keys: set[Hashable],
+    excluded: tuple[str, ...] = constants.EXCLUDED_FOLDERS,
+) -> Iterator[tuple[Path | str, bytes | Path]]:
+    """Yield sources of files with content, which is not in `seen_keys`
+
+    Key of every yielded path is put to `content_keys` and `seen_keys`,
+    other paths are put to `copies` by key of their content. Files with
+    the same content but different rule plans are different.
+    """
+    inode_keys: dict[Hashable, Hashable] = {}
+
+    def is_new(path: Path | str, key: Hashable) -> bool:
+        if key in seen_keys:
+            copies[key].append(path)
+            return False
+
+        seen_keys.add(key)
+        content_keys[path] = key
+        return True
+
+    for path in files:
+        if is_archive(path):
+            for name, data in _archive_members(path, excluded):
+                if data is None:
+                    content_keys[name] = (name, "unreadable")
+                    yield name, path
+                    continue
+
+                plan = plan_for(name) if plan_for is not None else None
+                key = (hashlib.blake2b(data, digest_size=16).digest(), plan)
+                if is_new(name, key):
+                    yield name, data
+            continue
+
+        plan = plan_for(path) if plan_for is not None else None
+        file_limits = limits
+        if plan is not None and plan.limits is not None:
+            file_limits = plan.limits
+
+        stat = os.stat(path)
+        inode = (stat.st_dev, stat.st_ino, plan)
+
+        # Hardlinks are not read again
+        if inode_keys.get(inode) in seen_keys:
+            copies[inode_keys[inode]].append(path)
+            continue
+
+        if (
+            file_limits is not None
+            and file_limits.oversize == "skip"
+            and file_limits.max_bytes is not None
+            and stat.st_size > file_limits.max_bytes
+        ):
+            # Let the scanner skip it without reading
+            content_keys[path] = (path, "skipped")
+            yield path, path
+            continue
+
+        if (
+            file_limits is not None
+            and file_limits.stream_bytes is not None
+            and stat.st_size > file_limits.stream_bytes
+        ):
+            # Huge files are read by the scanner line by line
+            content_keys[path] = (path, "streamed")
+            yield path, path
+            continue
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            # Let the scanner report it
+            content_keys[path] = (path, "unreadable")
+            yield path, path
+            continue
+
+        key = (hashlib.blake2b(data, digest_size=16).digest(), plan)
+        inode_keys[inode] = key
+
+        if is_new(path, key):
+            # Decoded by the scanner, which reports invalid files
+            yield path, data
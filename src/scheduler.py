@@ -0,0 +1,126 @@
+"""Order of files in parallel runs by their expected scan cost
+
+Scan time of every file is kept in a stats file between runs. Files are
+scanned from the most expensive one, so the longest file does not start
+last, in batches which get smaller to the end of the run. Workers take
+the next batch when they are free, so no worker waits for another.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = ".little-lint-stats.json"
+
+# A batch takes at most this part of the cost left per worker
+BATCH_SHARE = 4
+MAX_BATCH_SIZE = 64
+
+# Used to compare files without history, until there is some
+DEFAULT_SECONDS_PER_BYTE = 1e-6
+
+T = TypeVar("T", bound=tuple)
+
+
+class CostHistory:
+    """Size and scan time of files in previous runs"""
+
+    def __init__(
+        self, entries: dict[str, tuple[int, float]] | None = None
+    ) -> None:
+        # Path -> (size, seconds)
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "CostHistory":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            entries = {
+                name: (int(size), float(seconds))
+                for name, (size, seconds) in data["files"].items()
+            }
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Stats file %s is invalid, it is ignored", path)
+            return cls()
+
+        return cls(entries)
+
+    def save(self, path: Path) -> None:
+        # A run killed while writing must not leave a broken file
+        fd, temp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"files": self.entries}, f)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def record(self, path: Path | str, size: int, seconds: float) -> None:
+        self.entries[str(path)] = (size, seconds)
+
+    def seconds_per_byte(self) -> float:
+        size = sum(size for size, _ in self.entries.values())
+        seconds = sum(seconds for _, seconds in self.entries.values())
+        if not size or not seconds:
+            return DEFAULT_SECONDS_PER_BYTE
+        return seconds / size
+
+    def expected_costs(self, sizes: dict[Path, int]) -> dict[Path, float]:
+        """Expected seconds of every file, from its size without history"""
+        seconds_per_byte = self.seconds_per_byte()
+
+        costs = {}
+        for path, size in sizes.items():
+            entry = self.entries.get(str(path))
+            if entry is not None and entry[0] == size:
+                costs[path] = entry[1]
+            else:
+                costs[path] = size * seconds_per_byte
+
+        return costs
+
+
+def order_by_cost(costs: dict[Path, float]) -> list[Path]:
+    """Most expensive files first, ties in the order of paths"""
+    return sorted(costs, key=lambda path: (-costs[path], path))
+
+
+def iter_batches(
+    items: Iterable[T], costs: dict[Path, float], jobs: int
+) -> Iterator[list[T]]:
+    """Group `(path, ...)` items in batches of decreasing cost
+
+    Every batch costs about the cost left, divided between workers and
+    `BATCH_SHARE`, so expensive files go alone and the last small ones
+    are batched to save the dispatch time.
+    """
+    left = sum(costs.values())
+
+    batch: list[T] = []
+    batch_cost = 0.0
+    for item in items:
+        cost = costs.get(item[0], 0.0)
+        limit = left / (jobs * BATCH_SHARE)
+        left -= cost
+
+        batch.append(item)
+        batch_cost += cost
+        if batch_cost >= limit or len(batch) >= MAX_BATCH_SIZE:
+            yield batch
+            batch = []
+            batch_cost = 0.0
+
+    if batch:
+        yield batch
@@ -0,0 +1,197 @@
+"""Split of files between CI runners and merge of their results
+
+Every runner lints a shard with `--shard i/n` and writes a partial
+result file, `little-lint merge` reads all of them and reports like a
+single run. A file goes to the shard by a stable hash of its path
+relative to the project root, so the split does not depend on the
+checkout folder. With `by_size` files are assigned to the lightest
+shard in the order of size, which needs the whole list of files.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.models import (
+    FileResult,
+    ScanSummary,
+    Violation,
+    ViolationType,
+    get_violation_class,
+)
+
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Shard:
+    # 1-based
+    index: int
+    count: int
+    root: Path | None = None
+    by_size: bool = False
+
+    @classmethod
+    def parse(cls, value: str, **kwargs: Any) -> "Shard":
+        try:
+            index, count = map(int, value.split("/"))
+        except ValueError:
+            raise ValueError(f"Shard {value} is not like 3/8!") from None
+
+        if not 1 <= index <= count:
+            raise ValueError(f"Shard {value} not exist!")
+
+        return cls(index, count, **kwargs)
+
+    def key(self, path: Path) -> str:
+        if self.root is not None:
+            try:
+                return path.relative_to(self.root).as_posix()
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def shard_of(self, path: Path) -> int:
+        digest = hashlib.blake2b(self.key(path).encode(), digest_size=8)
+        return int.from_bytes(digest.digest(), "big") % self.count + 1
+
+    def select(self, files: Iterable[Path]) -> Iterator[Path]:
+        """Files of this shard, in the order of `files`"""
+        if not self.by_size:
+            return (
+                path for path in files if self.shard_of(path) == self.index
+            )
+
+        files = list(files)
+        return iter(self._select_by_size(files))
+
+    def _select_by_size(self, files: list[Path]) -> list[Path]:
+        sizes = {path: _get_size(path) for path in files}
+
+        # (total size, shard) of every shard, the lightest one first
+        shards = [(0, shard) for shard in range(1, self.count + 1)]
+        selected = set()
+        for path in sorted(files, key=lambda p: (-sizes[p], self.key(p))):
+            total, shard = heapq.heappop(shards)
+            if shard == self.index:
+                selected.add(path)
+            heapq.heappush(shards, (total + sizes[path], shard))
+
+        return [path for path in files if path in selected]
+
+
+def _get_size(path: Path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def write_partial(
+    path: Path,
+    shard: Shard,
+    results: Iterable[FileResult],
+    summary: ScanSummary,
+) -> None:
+    """Write results of a shard, only files with violations are kept"""
+    files = [
+        {
+            "path": shard.key(Path(result.path)),
+            "violations": [_dump_violation(v) for v in result.violations],
+        }
+        for result in results
+        if result.violations
+    ]
+    data = {
+        "version": FORMAT_VERSION,
+        "shard": [shard.index, shard.count],
+        "files": summary.files,
+        "fixed": summary.fixed,
+        "dedup_hits": summary.dedup_hits,
+        "baselined": summary.baselined,
+        "results": files,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def merge_partials(
+    paths: Iterable[Path], summary: ScanSummary
+) -> list[FileResult]:
+    """Results of all shards by path, the shards must be complete"""
+    count = None
+    seen: set[int] = set()
+    results = []
+
+    for path in paths:
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Result file {path} has unknown version!")
+
+        index, shard_count = data["shard"]
+        if count is None:
+            count = shard_count
+        elif shard_count != count:
+            raise ValueError(f"Result file {path} is from another split!")
+        if index in seen:
+            raise ValueError(f"Shard {index}/{count} is given twice!")
+        seen.add(index)
+
+        summary.files += data["files"]
+        summary.fixed += data["fixed"]
+        summary.dedup_hits += data["dedup_hits"]
+        summary.baselined += data["baselined"]
+        for file in data["results"]:
+            result = FileResult(
+                file["path"],
+                [_load_violation(v) for v in file["violations"]],
+            )
+            summary.files_with_violations += 1
+            summary.by_type.update(v.type for v in result.violations)
+            results.append(result)
+
+    if count is None:
+        raise ValueError("No result files to merge!")
+    for index in range(1, count + 1):
+        if index not in seen:
+            raise ValueError(f"Shard {index}/{count} is missing!")
+
+    results.sort(key=lambda result: result.path)
+    return results
+
+
+POSITION_KEYS = ("column", "end_line", "end_column")
+
+
+def _dump_violation(v: Violation) -> dict[str, Any]:
+    data = {
+        "name": type(v).__name__,
+        "line": v.line,
+        "text": v.text,
+        "type": v.type.name,
+    }
+    # Positions are kept only when known
+    for key in POSITION_KEYS:
+        if getattr(v, key) is not None:
+            data[key] = getattr(v, key)
+    return data
+
+
+def _load_violation(data: dict[str, Any]) -> Violation:
+    cls = get_violation_class(data["name"])
+    position = [data["line"], *(data.get(key) for key in POSITION_KEYS)]
+    v = Violation(*position) if cls is None else cls(*position)
+
+    # Texts may depend on the config of the run
+    if v.text != data["text"]:
+        v.text = data["text"]
+    if cls is None:
+        v.type = ViolationType[data["type"]]
+    return v
@@ -0,0 +1,65 @@
+"""Report of scan phase times, collected with `--timings`"""
+
+import csv
+import dataclasses
+import heapq
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+from src.models import FileResult, FileTimings
+
+PHASES = tuple(
+    f.name for f in dataclasses.fields(FileTimings) if f.name != "peak_memory"
+)
+
+
+def collect(
+    results: Iterable[FileResult], rows: list[tuple[str, FileTimings]]
+) -> Iterable[FileResult]:
+    """Pass `results` through, putting their timings to `rows`"""
+    for result in results:
+        if result.timings is not None:
+            rows.append((str(result.path), result.timings))
+        yield result
+
+
+def slowest(
+    rows: Iterable[tuple[str, FileTimings]], count: int
+) -> list[tuple[str, FileTimings]]:
+    return heapq.nlargest(count, rows, key=lambda row: row[1].total)
+
+
+def format_table(rows: list[tuple[str, FileTimings]]) -> str:
+    """Rows with times of phases in milliseconds"""
+    header = [f"{name:>10}" for name in (*PHASES, "total", "peak KB")]
+    lines = ["  ".join([*header, "file"])]
+
+    for path, timings in rows:
+        cells = [
+            f"{getattr(timings, phase) * 1000:>10.2f}" for phase in PHASES
+        ]
+        cells.append(f"{timings.total * 1000:>10.2f}")
+        cells.append(f"{timings.peak_memory / 1024:>10.1f}")
+        cells.append(path)
+        lines.append("  ".join(cells))
+
+    return "\n".join(lines)
+
+
+def dump(rows: list[tuple[str, FileTimings]], path: Path) -> None:
+    """Write all rows to a JSON file or, by default, to a CSV one"""
+    records = [
+        {"path": file, **dataclasses.asdict(timings), "total": timings.total}
+        for file, timings in rows
+    ]
+
+    if path.suffix == ".json":
+        with open(path, "w") as f:
+            json.dump(records, f, indent=1)
+        return
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, ["path", *PHASES, "total", "peak_memory"])
+        writer.writeheader()
+        writer.writerows(records)
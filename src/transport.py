@@ -0,0 +1,215 @@
+"""Compact binary form of results, which are sent by worker processes
+
+A batch of results is packed into one buffer: a table of violation
+classes, a table of files and then one fixed-size record of (file id,
+class id, line, column, end line, end column) per violation. Only the
+parent process builds `Violation` objects back from the records.
+"""
+
+import struct
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from src.models import (
+    FileResult,
+    FileTimings,
+    Violation,
+    ViolationType,
+    get_violation_class,
+)
+
+# Files, violations, classes
+HEADER = struct.Struct("<III")
+# Class type, length of its name and of its text
+CLASS = struct.Struct("<BII")
+# Path is a `Path`, elapsed, fixed, has timings, count of line texts
+# or `NONE`, length of the path
+FILE = struct.Struct("<?dI?iI")
+TIMINGS = struct.Struct("<6dQ")
+# Line and length of its text
+LINE_TEXT = struct.Struct("<II")
+# File id, class id, line, column, end line, end column
+VIOLATION = struct.Struct("<IHiiii")
+
+# Unknown positions
+NONE = -1
+
+TIMING_FIELDS = (
+    "read",
+    "tokenize",
+    "parse",
+    "file_rules",
+    "line_rules",
+    "ast_rules",
+    "peak_memory",
+)
+
+
+def pack_results(results: Iterable[FileResult]) -> bytes:
+    class_ids: dict[tuple[type[Violation], str], int] = {}
+    classes: list[bytes] = []
+    files: list[bytes] = []
+    records: list[bytes] = []
+
+    files_count = 0
+    for file_id, result in enumerate(results):
+        files_count += 1
+        path = str(result.path).encode("utf-8", "surrogateescape")
+        files.append(
+            FILE.pack(
+                isinstance(result.path, Path),
+                result.elapsed,
+                result.fixed,
+                result.timings is not None,
+                NONE if result.line_texts is None else len(result.line_texts),
+                len(path),
+            )
+        )
+        files.append(path)
+        if result.timings is not None:
+            files.append(
+                TIMINGS.pack(
+                    *(getattr(result.timings, f) for f in TIMING_FIELDS)
+                )
+            )
+        for line, text in (result.line_texts or {}).items():
+            data = text.encode("utf-8", "surrogateescape")
+            files.append(LINE_TEXT.pack(line, len(data)))
+            files.append(data)
+
+        for v in result.violations:
+            # Texts may be changed for the instance
+            key = (type(v), v.text)
+            class_id = class_ids.get(key)
+            if class_id is None:
+                class_id = class_ids[key] = len(class_ids)
+                name = type(v).__name__.encode()
+                text = v.text.encode()
+                classes.append(CLASS.pack(v.type.value, len(name), len(text)))
+                classes.append(name + text)
+
+            records.append(
+                VIOLATION.pack(
+                    file_id,
+                    class_id,
+                    v.line,
+                    *(
+                        NONE if value is None else value
+                        for value in (v.column, v.end_line, v.end_column)
+                    ),
+                )
+            )
+
+    header = HEADER.pack(files_count, len(records), len(class_ids))
+    return b"".join((header, *classes, *files, *records))
+
+
+def violation_count(data: bytes) -> int:
+    """Number of violations of packed results, without unpacking"""
+    return HEADER.unpack_from(data)[1]
+
+
+def unpack_results(
+    data: bytes,
+    find_class: Callable[[str], type[Violation] | None] = get_violation_class,
+) -> list[FileResult]:
+    """Build results back, classes are found by name with `find_class`
+
+    A class, which is not found, is replaced by a class with the same
+    name, type and text, so violations are still told apart by name.
+    """
+    files_count, violations_count, classes_count = HEADER.unpack_from(data)
+    offset = HEADER.size
+
+    classes = []
+    for _ in range(classes_count):
+        type_value, name_length, text_length = CLASS.unpack_from(data, offset)
+        offset += CLASS.size
+        name = data[offset : offset + name_length].decode()
+        offset += name_length
+        text = data[offset : offset + text_length].decode()
+        offset += text_length
+        classes.append((name, ViolationType(type_value), text))
+
+    results = []
+    for _ in range(files_count):
+        is_path, elapsed, fixed, has_timings, texts_count, path_length = (
+            FILE.unpack_from(data, offset)
+        )
+        offset += FILE.size
+        path: Path | str = data[offset : offset + path_length].decode(
+            "utf-8", "surrogateescape"
+        )
+        offset += path_length
+        if is_path:
+            path = Path(path)
+
+        timings = None
+        if has_timings:
+            timings = FileTimings(*TIMINGS.unpack_from(data, offset))
+            offset += TIMINGS.size
+
+        line_texts = None
+        if texts_count != NONE:
+            line_texts = {}
+            for _ in range(texts_count):
+                line, length = LINE_TEXT.unpack_from(data, offset)
+                offset += LINE_TEXT.size
+                line_texts[line] = data[offset : offset + length].decode(
+                    "utf-8", "surrogateescape"
+                )
+                offset += length
+
+        results.append(
+            FileResult(path, [], elapsed, fixed, timings, line_texts)
+        )
+
+    factories = [_violation_factory(*c, find_class) for c in classes]
+    end = offset + violations_count * VIOLATION.size
+    for file_id, class_id, line, *position in VIOLATION.iter_unpack(
+        data[offset:end]
+    ):
+        results[file_id].violations.append(
+            factories[class_id](
+                line, *(None if value == NONE else value for value in position)
+            )
+        )
+
+    return results
+
+
+def _violation_factory(
+    name: str,
+    violation_type: ViolationType,
+    text: str,
+    find_class: Callable[[str], type[Violation] | None],
+) -> Callable[..., Violation]:
+    cls = find_class(name)
+    if cls is None:
+        cls = _get_unknown_class(name, violation_type, text)
+    if cls.text == text:
+        return cls
+
+    def create(*position: int | None) -> Violation:
+        v = cls(*position)
+        v.text = text
+        return v
+
+    return create
+
+
+# Classes made for unknown names, one per name and type
+_unknown_classes: dict[tuple[str, ViolationType], type[Violation]] = {}
+
+
+def _get_unknown_class(
+    name: str, violation_type: ViolationType, text: str
+) -> type[Violation]:
+    cls = _unknown_classes.get((name, violation_type))
+    if cls is None:
+        cls = _unknown_classes[name, violation_type] = type(
+            name,
+            (Violation,),
+            {"__module__": __name__, "type": violation_type, "text": text},
+        )
+    return cls
@@ -1,6 +1,8 @@
 import ast
+import threading
+import time
 from dataclasses import dataclass
-from typing import TypeAlias, Callable
+from typing import Any, BinaryIO, Literal, TypeAlias, Callable
 
 from src.models import Violation
 
@@ -8,6 +10,26 @@ FileRule: TypeAlias = Callable[[str], list[Violation] | None]
 LineRule: TypeAlias = Callable[[str], Violation | None]
 AstRule: TypeAlias = Callable[[ast.AST], list[Violation] | None]
 
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Time of `time.monotonic()` or an event, which is set to stop the scan
+Deadline: TypeAlias = float | threading.Event
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def check_deadline(deadline: Deadline | None) -> None:
+    if deadline is None:
+        return
+
+    if isinstance(deadline, threading.Event):
+        if deadline.is_set():
+            raise DeadlineExceeded
+    elif time.monotonic() > deadline:
+        raise DeadlineExceeded
+
 
 @dataclass
 class AstChecker:
@@ -16,6 +38,75 @@ class AstChecker:
     ignore_comments: bool = False
 
 
+@dataclass(frozen=True)
+class TextEdit:
+    """Replacement of `code[start:end]` with `text`"""
+
+    start: int
+    end: int
+    text: str = ""
+
+
+@dataclass(frozen=True)
+class ScanLimits:
+    max_bytes: int | None = None
+    max_lines: int | None = None
+    max_seconds: float | None = None
+
+    # What to do with a file over `max_bytes` or `max_lines`:
+    # "lines" runs only the cheap line rules, "skip" checks nothing
+    oversize: Literal["lines", "skip"] = "lines"
+
+    # Files over this size are read line by line for file and line rules
+    stream_bytes: int | None = None
+
+    def is_oversized(self, code: str) -> bool:
+        if self.max_lines is not None:
+            if code.count("\n") + 1 > self.max_lines:
+                return True
+
+        if self.max_bytes is not None:
+            size = len(code) if code.isascii() else len(code.encode())
+            if size > self.max_bytes:
+                return True
+
+        return False
+
+    def is_oversized_file(self, file: BinaryIO) -> bool:
+        """Same as `is_oversized`, reading the file in chunks"""
+        size = lines = 0
+        while chunk := file.read(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+        file.seek(0)
+
+        if self.max_lines is not None and lines + 1 > self.max_lines:
+            return True
+        return self.max_bytes is not None and size > self.max_bytes
+
+
+@dataclass(frozen=True)
+class RulePlan:
+    """What is checked in some files, compiled by `src.config`"""
+
+    disabled_rules: frozenset[str] = frozenset()
+    exclude: tuple[type[Violation], ...] = ()
+    limits: ScanLimits | None = None
+
+    def apply(self, scan_kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Return arguments of `Scaner.scan` updated with the plan"""
+        exclude = scan_kwargs.get("exclude") or ()
+        if not isinstance(exclude, tuple):
+            exclude = (exclude,)
+
+        return {
+            **scan_kwargs,
+            "exclude": exclude + self.exclude,
+            "limits": self.limits or scan_kwargs.get("limits"),
+            "disabled_rules": self.disabled_rules,
+        }
+
+
 AnyAstType: TypeAlias = (
     type[ast.AST]
     | type[ast.mod]
@@ -1,9 +1,226 @@
 import ast
+import functools
+import heapq
 import re
+import types
+import typing
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
 from fileinput import lineno
 
 
+class NodeIndex:
+    """Nodes of a tree grouped by type, filled during the scanner's walk
+
+    Every indexed node also has `parent` and `depth` attributes
+    (module has depth 0). If the walk skipped some subtrees, only nodes
+    of `complete` types are indexed, others are found under `roots` on
+    the first request.
+    """
+
+    def __init__(
+        self, complete: frozenset[type[ast.AST]] | None = None
+    ) -> None:
+        self._nodes: defaultdict[type[ast.AST], list[ast.AST]] = defaultdict(
+            list
+        )
+        self.complete = complete
+        self.roots: list[ast.AST] = []
+
+    def add(self, node: ast.AST) -> None:
+        self._nodes[node.__class__].append(node)
+
+    def extend(self, other: "NodeIndex") -> None:
+        for node_type, nodes in other._nodes.items():
+            self._nodes[node_type].extend(nodes)
+
+        if other.complete is not None:
+            if self.complete is None:
+                self.complete = other.complete
+            else:
+                self.complete &= other.complete
+        self.roots.extend(other.roots)
+
+    def release(self) -> None:
+        """Remove parent links of indexed nodes and forget them"""
+        for nodes in self._nodes.values():
+            for node in nodes:
+                vars(node).pop("parent", None)
+
+        self._nodes.clear()
+
+    def of_type(
+        self, *node_types: type[ast.AST], depth: int | None = None
+    ) -> list[ast.AST]:
+        """Return nodes of `node_types` (or their subclasses) in source
+        order, only at `depth` if it is specified
+        """
+        if self.complete is not None:
+            missing = {
+                node_type
+                for node_type in get_node_classes()
+                if issubclass(node_type, node_types)
+                and node_type not in self.complete
+            }
+            if missing:
+                self._add_skipped(frozenset(missing))
+
+        groups = [
+            nodes
+            for node_type, nodes in self._nodes.items()
+            if issubclass(node_type, node_types)
+        ]
+
+        if len(groups) == 1:
+            nodes = groups[0]
+        else:
+            nodes = heapq.merge(*groups, key=_node_position)
+
+        if depth is None:
+            return list(nodes)
+
+        return [n for n in nodes if n.depth == depth]
+
+    def _add_skipped(self, node_types: frozenset[type[ast.AST]]) -> None:
+        """Index nodes of types, which the walk did not look for"""
+        indexed = {
+            id(node)
+            for node_type in node_types
+            for node in self._nodes.get(node_type, ())
+        }
+
+        for root in self.roots:
+            stack = [(root, getattr(root, "parent", None), root.depth)]
+            while stack:
+                node, parent, depth = stack.pop()
+                if node.__class__ in node_types and id(node) not in indexed:
+                    if parent is not None:
+                        node.parent = parent
+                    node.depth = depth
+                    self.add(node)
+
+                children = list(ast.iter_child_nodes(node))
+                stack.extend(
+                    (child, node, depth + 1) for child in reversed(children)
+                )
+
+        for nodes in self._nodes.values():
+            nodes.sort(key=_node_position)
+
+        self.complete |= node_types
+
+
+@dataclass(frozen=True)
+class WalkPlan:
+    """Which nodes a walk must visit to find all nodes of some types"""
+
+    # Targets and types of nodes, which can contain them
+    visit: frozenset[type[ast.AST]]
+    # Fields of every visited type, which can contain visited nodes
+    fields: dict[type[ast.AST], tuple[str, ...]]
+
+    def children(self, node: ast.AST) -> Iterable[ast.AST]:
+        fields = self.fields.get(node.__class__)
+        if fields is None:
+            # Unknown node types are walked fully
+            fields = node._fields
+
+        for name in fields:
+            value = getattr(node, name, None)
+            if isinstance(value, list):
+                for item in value:
+                    if item.__class__ in self.visit:
+                        yield item
+            elif value.__class__ in self.visit:
+                yield value
+
+
+@functools.cache
+def get_node_classes() -> frozenset[type[ast.AST]]:
+    classes = set()
+    stack = [ast.AST]
+    while stack:
+        node_class = stack.pop()
+        classes.add(node_class)
+        stack.extend(node_class.__subclasses__())
+    return frozenset(classes)
+
+
+def _get_field_classes(annotation: object) -> set[type[ast.AST]]:
+    """AST classes, which may be in a field with the annotation"""
+    if isinstance(annotation, (types.GenericAlias, types.UnionType)) or (
+        typing.get_origin(annotation) is typing.Union
+    ):
+        return {
+            node_class
+            for arg in typing.get_args(annotation)
+            for node_class in _get_field_classes(arg)
+        }
+
+    if isinstance(annotation, type) and issubclass(annotation, ast.AST):
+        return {c for c in get_node_classes() if issubclass(c, annotation)}
+
+    return set()
+
+
+@functools.cache
+def get_walk_plan(
+    targets: frozenset[type[ast.AST]],
+) -> WalkPlan | None:
+    """Plan of a walk, which skips subtrees without `targets`
+
+    Node types are read from `_field_types` of the AST classes, None is
+    returned, when they are not available (before Python 3.13).
+    """
+    if not hasattr(ast.Module, "_field_types"):
+        return None
+
+    classes = get_node_classes()
+    field_classes = {
+        node_class: {
+            name: _get_field_classes(annotation)
+            for name, annotation in getattr(
+                node_class, "_field_types", {}
+            ).items()
+        }
+        for node_class in classes
+    }
+
+    visit = {c for c in classes if issubclass(c, tuple(targets))}
+    changed = True
+    while changed:
+        changed = False
+        for node_class, fields in field_classes.items():
+            if node_class in visit:
+                continue
+            if any(not field.isdisjoint(visit) for field in fields.values()):
+                visit.add(node_class)
+                changed = True
+
+    return WalkPlan(
+        frozenset(visit),
+        {
+            node_class: tuple(
+                name
+                for name in node_class._fields
+                if not fields.get(name, set()).isdisjoint(visit)
+            )
+            for node_class, fields in field_classes.items()
+            if node_class in visit
+        },
+    )
+
+
+def _node_position(node: ast.AST) -> tuple[int, int]:
+    return getattr(node, "lineno", 0), getattr(node, "col_offset", 0)
+
+
 def get_block_end_lineno(block_root: ast.AST) -> int:
+    # Statements already know the last line of their block
+    if getattr(block_root, "end_lineno", None) is not None:
+        return block_root.end_lineno
+
     max_line_end = 0
 
     for node in ast.walk(block_root):
@@ -24,6 +241,13 @@ def get_block_end_lineno(block_root: ast.AST) -> int:
     return max_line_end
 
 
+def get_block_start_lineno(block_root: ast.AST) -> int:
+    """Return first line of node, including its decorators"""
+    decorators = getattr(block_root, "decorator_list", ())
+
+    return min((block_root.lineno, *(d.lineno for d in decorators)))
+
+
 def remove_comments_from_ast(source: str) -> ast.AST:
     """Return ast without taking into account comments"""
     new_text = ""
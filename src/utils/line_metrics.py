@@ -0,0 +1,142 @@
+"""Lengths and indentation of all lines of a file, computed in bulk
+
+NumPy is used over the bytes of ASCII files, when it is installed,
+other files are measured with `str` methods mapped over all lines.
+Both give the same numbers, tabs are counted as 4 spaces like rules do.
+"""
+
+import bisect
+import functools
+import itertools
+import re
+
+try:
+    import numpy
+except ImportError:  # An optional dependency
+    numpy = None
+
+TAB_SIZE = 4
+
+# Smaller files are measured faster without NumPy
+NUMPY_MIN_SIZE = 4096
+
+_LEADING = re.compile(r"[ \t]*")
+_TAB_AT_START = re.compile(r"^\t", re.MULTILINE)
+
+
+class LineMetrics:
+    def __init__(self, code: str, use_numpy: bool | None = None) -> None:
+        self.code = code
+        if use_numpy is None:
+            use_numpy = len(code) >= NUMPY_MIN_SIZE
+        self._array = None
+        if use_numpy and numpy is not None and code.isascii():
+            self._array = numpy.frombuffer(code.encode(), dtype=numpy.uint8)
+
+    @functools.cached_property
+    def lines(self) -> list[str]:
+        return self.code.split("\n")
+
+    @property
+    def count(self) -> int:
+        return self.code.count("\n") + 1
+
+    @functools.cached_property
+    def starts(self) -> list[int]:
+        """Offset of every line"""
+        if self._array is not None:
+            return self._np_starts.tolist()
+
+        return list(
+            itertools.accumulate(
+                (len(line) + 1 for line in self.lines[:-1]), initial=0
+            )
+        )
+
+    @functools.cached_property
+    def lengths(self) -> list[int]:
+        """Length of every line with tabs counted as 4 spaces"""
+        if self._array is not None:
+            return self._np_lengths.tolist()
+
+        lengths = list(map(len, self.lines))
+        if "\t" in self.code:
+            tabs = map(str.count, self.lines, itertools.repeat("\t"))
+            lengths = [n + (TAB_SIZE - 1) * t for n, t in zip(lengths, tabs)]
+        return lengths
+
+    @functools.cached_property
+    def leading_spaces(self) -> list[int]:
+        """Indentation of every line with tabs counted as 4 spaces"""
+        if self._array is not None:
+            return self._np_leading_spaces().tolist()
+
+        if "\t" not in self.code:
+            return [len(line) - len(line.lstrip(" ")) for line in self.lines]
+
+        leading = []
+        for line in self.lines:
+            indent = _LEADING.match(line).group()
+            leading.append(len(indent) + (TAB_SIZE - 1) * indent.count("\t"))
+        return leading
+
+    def longer_than(self, limit: int) -> list[int]:
+        """Numbers of lines longer than `limit`, 1-based"""
+        if self._array is not None:
+            return (numpy.flatnonzero(self._np_lengths > limit) + 1).tolist()
+
+        return [
+            n + 1 for n, length in enumerate(self.lengths) if length > limit
+        ]
+
+    def starting_with_tab(self) -> list[int]:
+        """Numbers of lines starting with a tab, 1-based"""
+        if "\t" not in self.code:
+            return []
+
+        if self._array is not None:
+            starts = self._np_starts
+            starts = starts[starts < len(self._array)]
+            tabs = starts[self._array[starts] == ord("\t")]
+            return (numpy.searchsorted(self._np_starts, tabs) + 1).tolist()
+
+        return [
+            bisect.bisect_right(self.starts, match.start())
+            for match in _TAB_AT_START.finditer(self.code)
+        ]
+
+    def line(self, number: int) -> str:
+        return self.lines[number - 1]
+
+    @functools.cached_property
+    def _np_starts(self):
+        newlines = numpy.flatnonzero(self._array == ord("\n"))
+        return numpy.concatenate(([0], newlines + 1))
+
+    @functools.cached_property
+    def _np_lengths(self):
+        starts = self._np_starts
+        ends = numpy.append(starts[1:] - 1, len(self._array))
+
+        lengths = ends - starts
+        tabs = self._array == ord("\t")
+        if tabs.any():
+            tab_counts = numpy.concatenate(([0], numpy.cumsum(tabs)))
+            lengths += (TAB_SIZE - 1) * (tab_counts[ends] - tab_counts[starts])
+        return lengths
+
+    def _np_leading_spaces(self):
+        array = self._array
+        starts = self._np_starts
+
+        # Width of every char and the end of indentation of every line
+        tabs = array == ord("\t")
+        widths = numpy.concatenate(
+            ([0], numpy.cumsum(numpy.where(tabs, TAB_SIZE, 1)))
+        )
+        stops = numpy.append(
+            numpy.flatnonzero((array != ord(" ")) & ~tabs), len(array)
+        )
+        ends = stops[numpy.searchsorted(stops, starts)]
+
+        return widths[ends] - widths[starts]
@@ -0,0 +1,90 @@
+import pickle
+import sys
+import tempfile
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+T = TypeVar("T")
+
+
+class SpillBuffer(Generic[T]):
+    """Mapping of buffered items, which keeps at most `max_size` of them
+    (measured with `size`) in memory and spills others to a temporary file
+    """
+
+    def __init__(
+        self, max_size: int, size: Callable[[T], int] = lambda item: 1
+    ) -> None:
+        self._max_size = max_size
+        self._size = size
+
+        self._memory: dict[int, tuple[T, int]] = {}
+        self._memory_size = 0
+
+        # Key -> (offset, length) in the file
+        self._spilled: dict[int, tuple[int, int]] = {}
+        self._file = None
+
+        self.spilled_count = 0
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._memory or key in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._spilled)
+
+    def __setitem__(self, key: int, item: T) -> None:
+        item_size = self._size(item)
+
+        if self._memory_size + item_size <= self._max_size:
+            self._memory[key] = (item, item_size)
+            self._memory_size += item_size
+            return
+
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        offset = self._file.seek(0, 2)
+        self._file.write(data)
+
+        self._spilled[key] = (offset, len(data))
+        self.spilled_count += 1
+
+    def pop(self, key: int) -> T:
+        if key in self._memory:
+            item, item_size = self._memory.pop(key)
+            self._memory_size -= item_size
+            return item
+
+        offset, length = self._spilled.pop(key)
+        self._file.seek(offset)
+        return pickle.loads(self._file.read(length))
+
+    def close(self) -> None:
+        self._memory.clear()
+        self._spilled.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def peak_rss_mb() -> tuple[float, float] | None:
+    """Peak resident set size of this process and of its finished
+    child processes in megabytes, None if it can not be measured
+    """
+    if resource is None:
+        return None
+
+    # Linux reports kilobytes, macOS reports bytes
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return own / unit, children / unit
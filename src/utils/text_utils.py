@@ -0,0 +1,164 @@
+import ast
+import bisect
+import functools
+import io
+import tokenize
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from src.models import Violation
+from src.types import TextEdit
+
+
+class LineIndex:
+    """Offsets of line starts, to map offsets of code to positions
+
+    Lines are 1-based and columns are 0-based, in characters. The index
+    is built once, on the first use.
+    """
+
+    def __init__(self, code: str) -> None:
+        self.code = code
+
+    @functools.cached_property
+    def starts(self) -> list[int]:
+        starts = [0]
+        find = self.code.find
+        position = find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = find("\n", position + 1)
+        return starts
+
+    @functools.cached_property
+    def is_ascii(self) -> bool:
+        return self.code.isascii()
+
+    def offset(self, line: int, column: int = 0) -> int:
+        return self.starts[line - 1] + column
+
+    def line_of(self, offset: int) -> int:
+        return bisect.bisect_right(self.starts, offset)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        line = self.line_of(offset)
+        return line, offset - self.starts[line - 1]
+
+    def line_text(self, line: int) -> str:
+        """Text of the line without its line end"""
+        start = self.starts[line - 1]
+        end = self.code.find("\n", start)
+        return self.code[start:] if end == -1 else self.code[start:end]
+
+    def char_column(self, line: int, column: int) -> int:
+        """Column in characters of an AST `column` in UTF-8 bytes"""
+        if self.is_ascii:
+            return column
+        text = self.line_text(line)
+        if text.isascii():
+            return column
+        return len(text.encode()[:column].decode(errors="ignore"))
+
+    def utf16_column(self, line: int, column: int) -> int:
+        """Column in UTF-16 code units, as editors count them, of a
+        `column` in characters
+        """
+        if self.is_ascii:
+            return column
+        text = self.line_text(line)[:column]
+        if text.isascii():
+            return column
+        return len(text.encode("utf-16-le")) // 2
+
+    def to_char_columns(self, violations: Iterable[Violation]) -> None:
+        """Convert columns of violations from AST positions in place"""
+        if self.is_ascii:
+            return
+
+        for v in violations:
+            if v.column is not None:
+                v.column = self.char_column(v.line, v.column)
+            if v.end_line is not None and v.end_column is not None:
+                v.end_column = self.char_column(v.end_line, v.end_column)
+
+
+class SourceText:
+    """Code of a file with positions and tokens, computed once if needed"""
+
+    def __init__(self, code: str, tree: ast.Module | None = None) -> None:
+        self.code = code
+        self.tree = tree
+        self.index = LineIndex(code)
+
+    @functools.cached_property
+    def lines(self) -> list[str]:
+        return self.code.split("\n")
+
+    @property
+    def line_starts(self) -> list[int]:
+        return self.index.starts
+
+    @functools.cached_property
+    def tokens(self) -> list[tokenize.TokenInfo]:
+        tokens = []
+        try:
+            readline = io.StringIO(self.code).readline
+            for token in tokenize.generate_tokens(readline):
+                tokens.append(token)
+        except (tokenize.TokenError, SyntaxError):
+            # Tokens before the error are still valid
+            pass
+        return tokens
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """Offset of 1-based `line` and `column` in characters"""
+        return self.index.offset(line, column)
+
+    def node_offset(self, line: int, column: int) -> int:
+        """Offset of AST position, where `column` is in UTF-8 bytes"""
+        return self.offset(line, self.index.char_column(line, column))
+
+    def line_of(self, offset: int) -> int:
+        return self.index.line_of(offset)
+
+
+def read_source(data: bytes) -> str:
+    """Decode file content the same way as `open(path, "r")`"""
+    with io.TextIOWrapper(io.BytesIO(data)) as f:
+        return f.read()
+
+
+def iter_lines(file: TextIO) -> Iterator[str]:
+    """Lines of `file` without line ends, like `code.split("\\n")`"""
+    line = ""
+    for line in file:
+        yield line[:-1] if line.endswith("\n") else line
+
+    if not line or line.endswith("\n"):
+        yield ""
+
+
+def apply_edits(
+    code: str, edits: Iterable[TextEdit]
+) -> tuple[str, list[TextEdit]]:
+    """Apply edits in one pass over `code`, return it and applied edits
+
+    Edits are applied by their offsets, an edit overlapping an already
+    applied one is skipped, equal edits are applied once.
+    """
+    applied: list[TextEdit] = []
+    parts: list[str] = []
+    position = 0
+
+    # Of edits from the same offset the longest one wins
+    for edit in sorted(set(edits), key=lambda e: (e.start, -e.end, e.text)):
+        if edit.start < position:
+            continue
+
+        parts.append(code[position : edit.start])
+        parts.append(edit.text)
+        position = edit.end
+        applied.append(edit)
+
+    parts.append(code[position:])
+    return "".join(parts), applied
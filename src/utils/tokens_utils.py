@@ -0,0 +1,204 @@
+import io
+import re
+import tokenize
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from src.models import Violation
+
+# Name, which matches every rule and violation
+ALL = "*"
+
+NOQA = re.compile(r"#\s*noqa\b(?::\s*(?P<names>[\w\s,]+))?", re.IGNORECASE)
+DIRECTIVE = re.compile(
+    r"#\s*little-lint:\s*(?P<action>disable-file|disable|enable)"
+    r"(?:\s*=\s*(?P<names>[\w\s,]+))?"
+)
+
+# Tokens, which do not start a logical line
+NOT_CODE = frozenset(
+    (
+        tokenize.COMMENT,
+        tokenize.NL,
+        tokenize.NEWLINE,
+        tokenize.INDENT,
+        tokenize.DEDENT,
+        tokenize.ENCODING,
+        tokenize.ENDMARKER,
+    )
+)
+
+
+@dataclass
+class SuppressionIndex:
+    """Names of rules and violations suppressed in lines of a file
+
+    `# noqa` and `# little-lint: disable=Name` after code suppress names
+    in that line. `# little-lint: disable=Name` on its own line suppresses
+    them until `# little-lint: enable=Name` or the end of the block, and
+    `# little-lint: disable-file=Name` in the whole file. Without names
+    everything is suppressed.
+    """
+
+    file: frozenset[str] = frozenset()
+    lines: dict[int, frozenset[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.file or self.lines)
+
+    def is_suppressed(self, line: int, name: str) -> bool:
+        if name in self.file or ALL in self.file:
+            return True
+
+        names = self.lines.get(line)
+        return names is not None and (name in names or ALL in names)
+
+    def drop(self, violations: list[Violation]) -> list[Violation]:
+        if not self:
+            return violations
+
+        return [
+            v
+            for v in violations
+            if not self.is_suppressed(v.line, v.__class__.__name__)
+        ]
+
+
+def covers(
+    names: frozenset[str], rule_name: str, violations: frozenset[str]
+) -> bool:
+    """Whether a rule is suppressed with `names`, so it need not be run"""
+    return (
+        ALL in names
+        or rule_name in names
+        or bool(violations) and violations <= names
+    )
+
+
+def build_suppression_index(
+    code: str, rule_violations: Mapping[str, frozenset[str]] = {}
+) -> SuppressionIndex:
+    """Collect suppression comments of `code` in one pass over its tokens
+
+    Rule names are expanded with names of their violations from
+    `rule_violations`, so violations are looked up only by their names.
+    """
+    # Most files have no suppressions and are not tokenized
+    if not _has_comments(code):
+        return SuppressionIndex()
+
+    return _index_tokens(io.StringIO(code).readline, rule_violations)
+
+
+def read_suppression_index(
+    file: TextIO, rule_violations: Mapping[str, frozenset[str]] = {}
+) -> SuppressionIndex:
+    """Same as `build_suppression_index`, reading `file` line by line"""
+    if not any(_has_comments(line) for line in file):
+        return SuppressionIndex()
+
+    file.seek(0)
+    return _index_tokens(file.readline, rule_violations)
+
+
+def _has_comments(text: str) -> bool:
+    return "noqa" in text.lower() or "little-lint" in text
+
+
+def _index_tokens(
+    readline: Callable[[], str],
+    rule_violations: Mapping[str, frozenset[str]],
+) -> SuppressionIndex:
+    index = SuppressionIndex()
+    read_lines = 0
+
+    def counting_readline() -> str:
+        nonlocal read_lines
+        line = readline()
+        if line:
+            read_lines += 1
+        return line
+
+    def expand(names: str | None) -> frozenset[str]:
+        if not names or not names.strip():
+            return frozenset((ALL,))
+
+        result = set()
+        for name in names.replace(",", " ").split():
+            result.add(name)
+            result.update(rule_violations.get(name, ()))
+        return frozenset(result)
+
+    lines: dict[int, set[str]] = {}
+    file_names: set[str] = set()
+    # (first line, column of the comment, names)
+    blocks: list[tuple[int, int, frozenset[str]]] = []
+
+    def close(block: tuple[int, int, frozenset[str]], end: int) -> None:
+        start, _, names = block
+        for line in range(start, end):
+            lines.setdefault(line, set()).update(names)
+
+    last_line = 0
+    logical_line_start = True
+    try:
+        for token in tokenize.generate_tokens(counting_readline):
+            last_line = token.end[0]
+
+            if token.type not in NOT_CODE and logical_line_start:
+                # Own-line disables end with their block
+                row, col = token.start
+                for block in [b for b in blocks if col < b[1]]:
+                    blocks.remove(block)
+                    close(block, row)
+            if token.type not in (tokenize.COMMENT, tokenize.NL):
+                logical_line_start = token.type in NOT_CODE
+
+            if token.type != tokenize.COMMENT:
+                continue
+
+            row, col = token.start
+            own_line = not token.line[:col].strip()
+
+            noqa = NOQA.search(token.string)
+            if noqa is not None:
+                lines.setdefault(row, set()).update(
+                    expand(noqa.group("names"))
+                )
+
+            directive = DIRECTIVE.search(token.string)
+            if directive is None:
+                continue
+
+            action = directive.group("action")
+            names = expand(directive.group("names"))
+            if action == "disable-file":
+                file_names.update(names)
+            elif action == "disable" and own_line:
+                blocks.append((row, col, names))
+            elif action == "disable":
+                lines.setdefault(row, set()).update(names)
+            else:
+                for block in [b for b in blocks if b[2] & names]:
+                    blocks.remove(block)
+                    close(block, row)
+                    if block[2] - names:
+                        blocks.append((row, block[1], block[2] - names))
+    except (tokenize.TokenError, SyntaxError):
+        # Invalid code keeps suppressions found before the error
+        while counting_readline():
+            pass
+        last_line = read_lines + 1
+
+    for block in blocks:
+        close(block, last_line + 1)
+
+    index.file = frozenset(file_names)
+    # Lines with the same names share one set
+    shared: dict[frozenset[str], frozenset[str]] = {}
+    for line, names in lines.items():
+        frozen = frozenset(names)
+        index.lines[line] = shared.setdefault(frozen, frozen)
+
+    return index
@@ -74,3 +74,19 @@ def test_incorrect_imports(code: str):
     )
 
     assert len(import_on_one_line) == 1
+
+
+@pytest.mark.parametrize(
+    ("code", "lines"),
+    (
+        ("import os\nx = 1\nimport sys\n", [3]),
+        ("def f():\n    s = 1; import os\n", [2]),
+        ("import os\n\n\nclass A:\n    from sys import path\n", [5]),
+        ("import os\ndef f():\n    import sys\n", [3]),
+        ("import os\nimport sys\n", []),
+    ),
+)
+def test_imports_not_at_top(code: str, lines: list[int]):
+    violations = scanner.scan(code, include_only=ImportsNotAtTop)
+
+    assert [v.line for v in violations] == lines
@@ -0,0 +1,90 @@
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.models import InvalidArchive
+from src.cli import main
+from src.runner import scan_paths
+
+FILES = {
+    "pkg/__init__.py": "import os, sys\n",
+    "pkg/copy.py": "import os, sys\n",
+    "pkg/data.txt": "import os, sys\n",
+    "pkg/__pycache__/cached.py": "import os, sys\n",
+    "pkg/ok.py": "x = 1\n",
+}
+
+
+def make_wheel(path: Path) -> Path:
+    with zipfile.ZipFile(path, "w") as f:
+        for name, content in FILES.items():
+            f.writestr(name, content)
+    return path
+
+
+def make_sdist(path: Path) -> Path:
+    with tarfile.open(path, "w:gz") as f:
+        for name, content in FILES.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            f.addfile(info, io.BytesIO(data))
+    return path
+
+
+def scan(paths: list[Path], **kwargs) -> dict[str, list[str]]:
+    return {
+        str(result.path): [type(v).__name__ for v in result.violations]
+        for result in scan_paths(paths, **kwargs)
+    }
+
+
+@pytest.mark.parametrize("make", [make_wheel, make_sdist])
+@pytest.mark.parametrize("dedup", [True, False])
+def test_members_are_scanned(make, dedup: bool, tmp_path: Path) -> None:
+    name = "pkg-1.0-py3-none-any.whl" if make is make_wheel else "pkg.tar.gz"
+    archive = make(tmp_path / name)
+
+    assert scan([archive], dedup=dedup) == {
+        f"{archive}!pkg/__init__.py": ["ManyImportOnOneLine"],
+        f"{archive}!pkg/copy.py": ["ManyImportOnOneLine"],
+        f"{archive}!pkg/ok.py": [],
+    }
+    # Nothing is extracted
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+
+
+def test_archives_in_folders_are_not_scanned(tmp_path: Path) -> None:
+    make_wheel(tmp_path / "pkg.whl")
+    (tmp_path / "a.py").write_text("x = 1\n")
+
+    assert scan([tmp_path]) == {str(tmp_path / "a.py"): []}
+
+
+def test_broken_archive(tmp_path: Path) -> None:
+    archive = tmp_path / "broken.zip"
+    archive.write_bytes(b"not a zip")
+
+    for dedup in (True, False):
+        assert scan([archive], dedup=dedup) == {
+            str(archive): [InvalidArchive.__name__]
+        }
+
+
+def test_archives_are_not_fixed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    archive = make_wheel(tmp_path / "pkg.whl")
+    content = archive.read_bytes()
+    (tmp_path / "list").write_text("pkg.whl\n")
+
+    for argv in (["pkg.whl"], ["--files-from", "list"]):
+        with pytest.raises(SystemExit) as exit_info:
+            main([*argv, "--fix"])
+        assert exit_info.value.code == 1
+    assert archive.read_bytes() == content
@@ -0,0 +1,137 @@
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.cli import main
+from src.baseline import Baseline, BaselineWriter, fingerprints
+from src.models import ScanSummary
+from src.runner import scan_paths
+
+OLD = "import os, sys\nimport os, sys\n#Comment\n"
+
+
+def scan(root: Path, summary: ScanSummary | None = None):
+    return list(scan_paths([root], dedup=False, summary=summary))
+
+
+def write_baseline(root: Path, path: Path) -> int:
+    with BaselineWriter(path, root) as writer:
+        for _ in writer.write(scan(root)):
+            pass
+    return writer.written
+
+
+def test_only_new_violations(tmp_path: Path) -> None:
+    (tmp_path / "a.py").write_text(OLD)
+    assert write_baseline(tmp_path, tmp_path / "baseline") == 3
+
+    # Lines are shifted, and one more copy of the import is added
+    (tmp_path / "a.py").write_text("\n\n" + OLD + "import os, sys\n")
+
+    summary = ScanSummary()
+    baseline = Baseline.load(tmp_path / "baseline")
+    (result,) = baseline.filter(scan(tmp_path, summary), tmp_path, summary)
+
+    assert [(type(v).__name__, v.line) for v in result.violations] == [
+        ("ManyImportOnOneLine", 6)
+    ]
+    assert summary.total == 1
+    assert summary.baselined == 3
+    assert summary.files_with_violations == 1
+
+
+def test_fingerprints_are_stable(tmp_path: Path) -> None:
+    (tmp_path / "a.py").write_text("import os,   sys\n")
+    (result,) = scan(tmp_path)
+    first = fingerprints(result, tmp_path)
+
+    (tmp_path / "a.py").write_text("\nimport os, sys  \n")
+    (result,) = scan(tmp_path)
+    assert fingerprints(result, tmp_path) == first
+
+    # The path is a part of the fingerprint
+    (tmp_path / "a.py").rename(tmp_path / "b.py")
+    (result,) = scan(tmp_path)
+    assert fingerprints(result, tmp_path) != first
+
+
+def test_fixed_file_is_not_counted(tmp_path: Path) -> None:
+    (tmp_path / "a.py").write_text("import os, sys\n")
+    (tmp_path / "b.py").write_text("x = 1\n")
+    write_baseline(tmp_path, tmp_path / "baseline")
+
+    summary = ScanSummary()
+    baseline = Baseline.load(tmp_path / "baseline")
+    results = list(baseline.filter(scan(tmp_path, summary), tmp_path, summary))
+
+    assert [r.violations for r in results] == [[], []]
+    assert summary.total == summary.files_with_violations == 0
+    assert summary.files == 2
+
+
+def test_failed_update_keeps_baseline(tmp_path: Path) -> None:
+    (tmp_path / "a.py").write_text(OLD)
+    write_baseline(tmp_path, tmp_path / "baseline")
+    content = (tmp_path / "baseline").read_text()
+
+    with pytest.raises(KeyboardInterrupt):
+        with BaselineWriter(tmp_path / "baseline", tmp_path) as writer:
+            for _ in writer.write(scan(tmp_path)):
+                raise KeyboardInterrupt
+
+    assert (tmp_path / "baseline").read_text() == content
+    assert {p.name for p in tmp_path.iterdir()} == {"a.py", "baseline"}
+
+
+def test_missing_baseline_is_empty(tmp_path: Path) -> None:
+    assert len(Baseline.load(tmp_path / "baseline")) == 0
+
+
+def test_scanned_lines_are_fingerprinted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("import os, sys\n")
+    main(["a.py", "--baseline", "baseline", "--update-baseline"])
+
+    # The unsaved buffer, not the file on the disk, is matched
+    buffer = io.BytesIO(b"import re\nimport os, sys\n")
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(buffer))
+    main(["--stdin-filename", "a.py", "--baseline", "baseline"])
+
+
+def test_archive_members_are_fingerprinted(tmp_path: Path) -> None:
+    def member_prints(code: str) -> list[str]:
+        with zipfile.ZipFile(tmp_path / "a.whl", "w") as f:
+            f.writestr("a.py", code)
+        (result,) = scan_paths([tmp_path / "a.whl"], line_texts=True)
+        return fingerprints(result, tmp_path)
+
+    first = member_prints("import os, sys\n")
+    assert member_prints("\nimport os, sys\n") == first
+    assert member_prints("import re, sys\n") != first
+
+
+def test_copies_are_not_hidden(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("import os, sys\n")
+    main(["a.py", "--baseline", "baseline", "--update-baseline"])
+
+    # The copy is not in the baseline, though it is scanned only once
+    (tmp_path / "b.py").write_text("import os, sys\n")
+    capsys.readouterr()
+    with pytest.raises(SystemExit) as exit_info:
+        main(["a.py", "b.py", "--baseline", "baseline"])
+
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert "b.py" in output and "a.py" not in output
+    assert "1 files were identical" in output
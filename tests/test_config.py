@@ -0,0 +1,114 @@
+import ast
+import functools
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src import constants
+from src.config import Config, load_config
+from src.models import CommentsMustStartWithSpace, FileTooLarge
+from src.runner import scan_paths
+
+PYPROJECT = """
+[tool.little-lint]
+max-line-length = 20
+disable = ["CommentsMustStartWithSpace"]
+max-lines = 100
+
+[tool.little-lint.per-path."tests/"]
+disable = ["right_order"]
+max-lines = 1
+
+[tool.little-lint.per-path."*/migrations/"]
+disable = ["right_order"]
+enable = ["CommentsMustStartWithSpace"]
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT)
+    for folder in ("src", "tests", "app/migrations"):
+        (tmp_path / folder).mkdir(parents=True)
+        (tmp_path / folder / "a.py").write_text("import os\n#Comment\n")
+
+    return tmp_path
+
+
+def test_plans(project: Path) -> None:
+    config = load_config(project / "pyproject.toml")
+
+    src_plan = config.plan_for(project / "src" / "a.py")
+    assert src_plan.disabled_rules == frozenset()
+    assert src_plan.exclude == (CommentsMustStartWithSpace,)
+    assert src_plan.limits.max_lines == 100
+
+    tests_plan = config.plan_for(project / "tests" / "a.py")
+    assert tests_plan.disabled_rules == {"right_order"}
+    assert tests_plan.limits.max_lines == 1
+
+    migrations_plan = config.plan_for(project / "app/migrations/a.py")
+    assert migrations_plan.disabled_rules == {"right_order"}
+    assert migrations_plan.exclude == ()
+
+    # Plans are compiled once per directory
+    assert config.plan_for(project / "src" / "b.py") is src_plan
+
+
+def test_disabled_rule_is_not_invoked(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = load_config(project / "pyproject.toml")
+    right_order = next(
+        rule
+        for rule in scanner.get_rule_set().get_ast_rules(ast.Module)
+        if rule.name == "right_order"
+    )
+
+    calls = []
+
+    @functools.wraps(right_order.checker)
+    def checker(*args):
+        calls.append(args)
+        return checker.__wrapped__(*args)
+
+    monkeypatch.setattr(right_order, "checker", checker)
+
+    results = {
+        r.path.parent.name: r.violations
+        for r in scan_paths(
+            [project], plan_for=config.plan_for, dedup=False
+        )
+    }
+
+    assert len(calls) == 1
+    assert [type(v) for v in results["tests"]] == [FileTooLarge]
+    assert CommentsMustStartWithSpace in map(type, results["migrations"])
+    assert CommentsMustStartWithSpace not in map(type, results["src"])
+
+
+def test_max_line_length(project: Path) -> None:
+    config = load_config(project / "pyproject.toml")
+    try:
+        config.apply()
+        assert constants.MAX_LINE_LENGTH == 20
+    finally:
+        Config().apply()
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    (
+        ("[tool.little-lint]\nfoo = 1\n", "Option foo not exist!"),
+        (
+            '[tool.little-lint]\ndisable = ["foo"]\n',
+            "Rule or violation foo not exist!",
+        ),
+    ),
+)
+def test_invalid_config(tmp_path: Path, text: str, error: str) -> None:
+    (tmp_path / "pyproject.toml").write_text(text)
+
+    with pytest.raises(ValueError, match=error):
+        load_config(tmp_path / "pyproject.toml")
@@ -0,0 +1,76 @@
+import gc
+import os
+import weakref
+from pathlib import Path
+
+import pytest
+
+from src.models import ScanSummary
+from src.runner import scan_paths
+
+WRONG_FILE = "import sys, os\n#Comment\n"
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "a.py").write_text(WRONG_FILE)
+    (tmp_path / "b.py").write_text("x = 1\n")
+    (tmp_path / "c.py").write_text(WRONG_FILE)
+    os.link(tmp_path / "b.py", tmp_path / "d.py")
+    (tmp_path / "e.py").write_text(WRONG_FILE + "\n")
+
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", (1, 3))
+def test_dedup(project: Path, jobs: int) -> None:
+    summary = ScanSummary()
+    results = {
+        r.path.name: repr(r.violations)
+        for r in scan_paths([project], jobs, "thread", summary=summary)
+    }
+    expected = {
+        r.path.name: repr(r.violations)
+        for r in scan_paths([project], dedup=False)
+    }
+
+    assert results == expected
+    assert summary.files == 5
+    assert summary.dedup_hits == 2
+    assert summary.files_with_violations == 3
+
+
+def test_undecodable_file(project: Path) -> None:
+    (project / "bad.py").write_bytes(b"x = '\xff'\n")
+
+    results = {
+        r.path.name: [type(v).__name__ for v in r.violations]
+        for r in scan_paths([project])
+    }
+    assert results["bad.py"] == ["ScanFailed"]
+    assert results["a.py"] == results["c.py"] != []
+
+
+def test_results_are_not_kept_in_memory_bounded_mode(project: Path) -> None:
+    summary = ScanSummary()
+    results = scan_paths([project], summary=summary, max_buffered=10)
+
+    first = next(results)
+    assert first.violations
+    first_ref = weakref.ref(first)
+    del first
+
+    paths = {}
+    for result in results:
+        paths[result.path.name] = repr(result.violations)
+        del result
+        gc.collect()
+        assert first_ref() is None
+
+    expected = {
+        r.path.name: repr(r.violations)
+        for r in scan_paths([project], dedup=False)
+    }
+    del expected["a.py"]
+    assert paths == expected
+    assert summary.files == 5
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.cli import main
+from src.models import Not4SpaceForIndentationLevel, ViolationType
+
+# A warning of a file rule, an error of an AST rule and a line rule
+CODE = "import os, sys\nx = (\na +\n1)\n" + "y = 1" + " " * 80 + "\n"
+
+
+def names(violations) -> set[str]:
+    return {type(v).__name__ for v in violations}
+
+
+def scan(code: str, **kwargs):
+    # Excluded violations do not stop the scan
+    return scanner.scan(code, exclude=Not4SpaceForIndentationLevel, **kwargs)
+
+
+def test_next_phases_are_skipped() -> None:
+    everything = names(scan(CODE))
+    assert {
+        "MaxLineLength",
+        "ManyImportOnOneLine",
+        "LineBreakAfterBinOp",
+    } <= everything
+
+    found = names(scan(CODE, fail_fast=ViolationType.WARNING))
+    assert "MaxLineLength" in found
+    assert "ManyImportOnOneLine" not in found
+
+    found = names(scan(CODE, fail_fast=ViolationType.ERROR))
+    assert "ManyImportOnOneLine" in found
+    assert "LineBreakAfterBinOp" not in found
+
+
+def test_suppressed_violations_do_not_stop() -> None:
+    code = CODE.replace("y = 1 ", "y = 1  # noqa")
+    found = names(scan(code, fail_fast=ViolationType.WARNING))
+
+    # The AST phase is run and stops the scan
+    assert "MaxLineLength" not in found
+    assert "ManyImportOnOneLine" in found
+    assert "LineBreakAfterBinOp" not in found
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    for number in range(5):
+        (tmp_path / f"m{number}.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def test_exit_code(project: Path, capsys: pytest.CaptureFixture) -> None:
+    main([str(project)])
+
+    (project / "m3.py").write_text("import os, sys\n")
+    (project / "m4.py").write_text("import os, sys\n")
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(project), "--fail-fast", "error"])
+    assert exit_info.value.code == 1
+
+    output = capsys.readouterr().out
+    assert "m3.py" in output
+    assert "m4.py" not in output
+    assert "Stopped at the first failure" in output
+
+
+def test_exit_code_by_severity(project: Path) -> None:
+    (project / "m0.py").write_text("#Comment\n")
+
+    # Only a warning is found
+    main([str(project), "--fail-fast", "error"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(project)])
+    assert exit_info.value.code == 1
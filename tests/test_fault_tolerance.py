@@ -0,0 +1,124 @@
+import logging
+import os
+from concurrent.futures import BrokenExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src import parallel
+from src.models import (
+    CommentsMustStartWithSpace,
+    InvalidSyntax,
+    NoBlankLineAtEnd,
+    ScanFailed,
+)
+from src.rules import scanner
+
+INVALID_SYNTAX = """
+#Comment
+x = = 1
+y = 2"""
+
+UNTERMINATED_STRING = '''
+x = """
+'''
+
+
+def test_syntax_error() -> None:
+    violations = scanner.scan(INVALID_SYNTAX)
+
+    assert {type(v) for v in violations} == {
+        CommentsMustStartWithSpace,
+        InvalidSyntax,
+        NoBlankLineAtEnd,
+    }
+    assert [v.line for v in violations if isinstance(v, InvalidSyntax)] == [
+        3
+    ]
+
+
+def test_unbalanced_bracket(tmp_path: Path) -> None:
+    code = "x = 1)\n#Comment\n"
+    expected = [("CommentsMustStartWithSpace", 2), ("InvalidSyntax", 1)]
+
+    assert [(type(v).__name__, v.line) for v in scanner.scan(code)] == expected
+
+    # The streaming version shares the indentation check
+    (tmp_path / "a.py").write_text(code)
+    violations = scanner.scan_stream(tmp_path / "a.py")
+    assert sorted((type(v).__name__, v.line) for v in violations) == expected
+
+
+def test_tokenize_error() -> None:
+    violations = scanner.scan(UNTERMINATED_STRING)
+
+    assert [type(v) for v in violations] == [InvalidSyntax]
+
+
+def test_incremental_syntax_error() -> None:
+    violations, tree = scanner.scan_incremental("x = 1\n")
+
+    violations, new_tree = scanner.scan_incremental("x = (\n", tree)
+
+    assert new_tree is tree
+    assert InvalidSyntax in {type(v) for v in violations}
+
+
+def test_failed_file_does_not_stop_batch(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    missing = tmp_path / "missing.py"
+
+    results = list(
+        scanner.scan_many([(missing, missing), ("ok.py", "x = 1\n")])
+    )
+
+    # Only the error, without its traceback
+    (record,) = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.exc_info is None
+    assert "No such file" in record.getMessage()
+
+    assert [type(v) for v in results[0].violations] == [ScanFailed]
+    assert results[1].violations == []
+
+
+def crash_on_three(x: int) -> int:
+    if x == 3:
+        os._exit(1)
+    return x
+
+
+def test_crashed_worker_is_restarted() -> None:
+    results = list(
+        parallel.imap(
+            crash_on_three, range(10), 2, "process", on_crash=lambda x: -x
+        )
+    )
+
+    assert results == [0, 1, 2, -3, 4, 5, 6, 7, 8, 9]
+
+
+class BreakingPool(ThreadPoolExecutor):
+    """Pool, which breaks between two submits"""
+
+    def submit(self, *args, **kwargs):
+        if self.broken:
+            raise BrokenExecutor("The pool is broken")
+        return super().submit(*args, **kwargs)
+
+
+def test_pool_broken_before_submit(monkeypatch: pytest.MonkeyPatch) -> None:
+    pools: list[BreakingPool] = []
+
+    def make_executor(*args, **kwargs):
+        pools.append(BreakingPool(max_workers=2))
+        pools[-1].broken = len(pools) == 1
+        return pools[-1]
+
+    monkeypatch.setattr(parallel, "make_executor", make_executor)
+
+    results = list(parallel.imap(lambda x: x * 2, range(5), 2, "thread"))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert len(pools) == 2
@@ -0,0 +1,109 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.cli import main
+from src.runner import read_file_list
+
+
+class Pipe(io.RawIOBase):
+    """Stream, which gives data by small parts as a pipe does"""
+
+    def __init__(self, parts: list[bytes]) -> None:
+        self.parts = parts
+        self.reads = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read1(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self.parts.pop(0) if self.parts else b""
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b"a.py\nb c.py\r\n\nd.py", ["a.py", "b c.py", "d.py"]),
+        (b"a.py\0b\nc.py\0", ["a.py", "b\nc.py"]),
+        (b"", []),
+        (b"a.py", ["a.py"]),
+    ],
+)
+def test_separators(data: bytes, expected: list[str]) -> None:
+    assert list(read_file_list(io.BytesIO(data))) == expected
+
+
+def test_paths_are_streamed() -> None:
+    pipe = Pipe([b"a.", b"py\0b.py\0c", b".py"])
+    names = read_file_list(pipe)
+
+    assert next(names) == "a.py"
+    assert next(names) == "b.py"
+    assert pipe.reads == 2
+    assert list(names) == ["c.py"]
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("import os, sys\n")
+    (tmp_path / "b.py").write_text("#Comment\n")
+    (tmp_path / "c.txt").write_text("import os, sys\n")
+    return tmp_path
+
+
+def set_stdin(monkeypatch: pytest.MonkeyPatch, data: bytes) -> None:
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+
+def test_files_from_stdin(
+    project: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    set_stdin(monkeypatch, b"a.py\0c.txt\0deleted.py\0")
+    with pytest.raises(SystemExit):
+        main(["--files-from", "-"])
+
+    output = capsys.readouterr().out
+    assert "a.py" in output
+    assert "b.py" not in output
+    assert "c.txt" not in output
+    assert "File 'deleted.py' not exist!" in output
+    assert "Total 1 violations in 1 files" in output
+
+
+def test_files_from_file(project: Path, capsys: pytest.CaptureFixture) -> None:
+    (project / "list").write_text("b.py\n")
+    with pytest.raises(SystemExit):
+        main(["--files-from", "list"])
+
+    output = capsys.readouterr().out
+    assert "b.py" in output
+    assert "a.py" not in output
+
+
+def test_stdin_filename(
+    project: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    # Unsaved content of a.py
+    set_stdin(monkeypatch, b"import os\n#Comment\n")
+    with pytest.raises(SystemExit):
+        main(["--stdin-filename", "a.py"])
+
+    output = capsys.readouterr().out
+    assert "a.py" in output
+    assert "ManyImportOnOneLine" not in output
+    assert "CommentsMustStartWithSpace" in output
+
+
+def test_stdin_filename_without_files(project: Path) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--stdin-filename", "a.py", "b.py"])
+    assert exit_info.value.code == 1
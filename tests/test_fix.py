@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.models import (
+    InvalidImportsOrder,
+    ManyImportOnOneLine,
+    UsingTabsToTabulation,
+)
+from src.runner import scan_paths
+from src.types import TextEdit
+from src.utils.text_utils import apply_edits
+
+WRONG_FILE = "import sys, os\n#Comment\ndef foo():\n\treturn 1"
+FIXED_FILE = "import sys\nimport os\n# Comment\ndef foo():\n    return 1\n"
+
+
+def test_apply_edits() -> None:
+    code, applied = apply_edits(
+        "abcdef",
+        [
+            TextEdit(4, 5, "E"),
+            TextEdit(0, 0, ">"),
+            TextEdit(1, 3, "BC"),
+            # Overlaps the previous one
+            TextEdit(2, 4, "??"),
+            TextEdit(4, 5, "E"),
+        ],
+    )
+
+    assert code == ">aBCdEf"
+    assert len(applied) == 3
+
+
+def test_fix() -> None:
+    code, violations, fixed = scanner.fix(WRONG_FILE)
+
+    assert code == FIXED_FILE
+    assert fixed == 4
+    # Violations without fixes are left
+    assert [type(v).__name__ for v in violations] == [
+        "TopLevelFuncAndClassDefNotSurrounded"
+    ]
+
+
+def test_fix_nothing() -> None:
+    code = "x = 1\n"
+    assert scanner.fix(code) == (code, [], 0)
+
+
+def test_sort_imports() -> None:
+    code = "import pytest\nimport sys, os\nfrom src import models\n"
+
+    fixed_code, violations, fixed = scanner.fix(code)
+
+    assert fixed_code == (
+        "import sys\nimport os\n\nimport pytest\n\nfrom src import models\n"
+    )
+    assert fixed == 2
+    assert violations == []
+
+
+def test_imports_with_comments_are_not_sorted() -> None:
+    code = "import pytest\n# Comment\nimport sys\n"
+
+    fixed_code, violations, fixed = scanner.fix(code)
+
+    assert fixed_code == code
+    assert [type(v) for v in violations] == [InvalidImportsOrder]
+
+
+@pytest.mark.parametrize("newline", ("\n", "\r\n"))
+def test_fix_files(tmp_path: Path, newline: str) -> None:
+    path = tmp_path / "a.py"
+    path.write_bytes(WRONG_FILE.replace("\n", newline).encode())
+
+    (result,) = scan_paths([tmp_path], dedup=False, fix=True)
+
+    assert result.fixed == 4
+    assert path.read_bytes() == FIXED_FILE.replace("\n", newline).encode()
+    assert ManyImportOnOneLine not in map(type, result.violations)
+
+
+def test_split_imports_indented_with_tabs() -> None:
+    code = "if x:\n\timport os, sys\n\tpass\n"
+
+    fixed_code, _, fixed = scanner.fix(code)
+
+    assert fixed_code == "if x:\n    import os\n    import sys\n    pass\n"
+    assert fixed == 3
+
+
+def test_broken_fixes_are_not_applied(tmp_path: Path) -> None:
+    # Without the fix of tabs the split imports are indented with spaces
+    path = tmp_path / "a.py"
+    path.write_text("if x:\n\timport os, sys\n\tpass\n")
+
+    (result,) = scan_paths(
+        [tmp_path], dedup=False, fix=True, exclude=UsingTabsToTabulation
+    )
+
+    assert result.fixed == 0
+    assert path.read_text() == "if x:\n\timport os, sys\n\tpass\n"
+    assert ManyImportOnOneLine in map(type, result.violations)
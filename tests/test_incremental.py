@@ -0,0 +1,93 @@
+import ast
+
+import pytest
+
+from src.rules import scanner
+from src.core import parse_ast, reparse_ast
+
+SOURCE = """import os
+import sys, re
+
+
+def first():
+    return 1
+
+
+@decorator
+class Second:
+    x = 1
+
+
+value = first()
+"""
+
+EDITS = (
+    # Change inside function
+    ("return 1", "return 2 + 2"),
+    # New statements between definitions
+    ("\n\n@decorator", "\nimport json\nprint(json)\n\n@decorator"),
+    # Remove statement
+    ("import sys, re\n", ""),
+    # Append to the end
+    ("value = first()\n", "value = first()\nimport abc, ast\n"),
+    # Indented line continues the previous block
+    ("\n\n\n@decorator", "\n    print(2)\n\n\n@decorator"),
+    # Unclosed bracket swallows next statements
+    ("value = first()", "value = first("),
+    # Decorator added before the function
+    ("def first", "@decorator\ndef first"),
+)
+
+
+def apply(source: str, edit: tuple[str, str]) -> str:
+    assert edit[0] in source
+    return source.replace(edit[0], edit[1], 1)
+
+
+def dump(tree: ast.AST) -> str:
+    return ast.dump(tree, include_attributes=True)
+
+
+@pytest.mark.parametrize("edit", EDITS[:5] + EDITS[6:])
+def test_reparse_same_as_parse(edit: tuple[str, str]) -> None:
+    new_source = apply(SOURCE, edit)
+
+    tree = reparse_ast(new_source, parse_ast(SOURCE))
+
+    assert tree.changed is not None
+    assert dump(tree) == dump(ast.parse(new_source))
+
+
+def test_reparse_without_source() -> None:
+    tree = reparse_ast(SOURCE, ast.parse(SOURCE))
+
+    assert tree.changed is None
+    assert dump(tree) == dump(ast.parse(SOURCE))
+
+
+def test_reparse_keeps_not_changed_statements() -> None:
+    tree = parse_ast(SOURCE)
+    function, cls, assign = tree.body[2:]
+
+    tree = reparse_ast(apply(SOURCE, EDITS[1]), tree)
+
+    assert tree.body[2] is function
+    assert tree.body[-2:] == [cls, assign]
+
+
+def test_reparse_syntax_error() -> None:
+    with pytest.raises(SyntaxError):
+        reparse_ast(apply(SOURCE, EDITS[5]), parse_ast(SOURCE))
+
+
+def test_incremental_scan_same_as_scan() -> None:
+    source = SOURCE
+    violations, tree = scanner.scan_incremental(source)
+
+    for edit in EDITS[:4] + EDITS[6:]:
+        source = apply(source, edit)
+        violations, tree = scanner.scan_incremental(source, tree)
+
+        assert sorted(map(repr, violations)) == sorted(
+            map(repr, scanner.scan(source))
+        )
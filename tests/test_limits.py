@@ -0,0 +1,87 @@
+import itertools
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.models import FileTooLarge, ScanTimeout, LineBreakAfterBinOp
+from src.rules import scanner
+from src import types
+from src.core import Scaner
+from src.rules.file_rules import file_rules
+from src.rules.stream_rules import stream_rules
+from src.types import ScanLimits
+
+CODE = """
+import sys, os
+x = (1
+     + 2)
+"""
+
+
+def test_no_limits() -> None:
+    violations = scanner.scan(CODE, limits=ScanLimits())
+
+    assert not any(isinstance(v, FileTooLarge) for v in violations)
+
+
+def test_oversized_file_checked_with_line_rules() -> None:
+    # Not a valid python, but AST rules are not run
+    code = "x = (\nvalue +\n"
+    violations = scanner.scan(code, limits=ScanLimits(max_lines=2))
+
+    assert {type(v) for v in violations} == {
+        FileTooLarge,
+        LineBreakAfterBinOp,
+    }
+
+
+def test_oversized_file_skipped() -> None:
+    limits = ScanLimits(max_bytes=10, oversize="skip")
+    violations = scanner.scan(CODE, limits=limits)
+
+    assert [type(v) for v in violations] == [FileTooLarge]
+
+
+def test_timeout() -> None:
+    violations = scanner.scan(CODE, limits=ScanLimits(max_seconds=-1))
+
+    assert [type(v) for v in violations] == [ScanTimeout]
+
+
+def test_skipped_file_is_not_read(tmp_path: Path) -> None:
+    path = tmp_path / "big.py"
+    path.write_bytes(b"\xff" * 100)  # Not valid utf-8
+
+    limits = ScanLimits(max_bytes=50, oversize="skip")
+    result = scanner.scan_item((path, path), limits=limits)
+
+    assert [type(v) for v in result.violations] == [FileTooLarge]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_timeout_in_slow_file_rule(
+    stream: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Every check of the deadline takes a second
+    clock = itertools.count(time.monotonic())
+    monkeypatch.setattr(
+        types, "time", SimpleNamespace(monotonic=clock.__next__)
+    )
+
+    slow_scanner = Scaner()
+    for rule in file_rules.get_all_rules():
+        if rule.name == "use_4_spaces_for_level":
+            slow_scanner.add_file_rule(rule)
+    for rule in stream_rules.get_all_rules():
+        if rule.args == ("use_4_spaces_for_level",):
+            slow_scanner.add_stream_rule(rule)
+    path = tmp_path / "a.py"
+    path.write_text("x = (\n  1)\n" * 5000)
+
+    limits = ScanLimits(max_seconds=5, stream_bytes=1 if stream else None)
+    result = slow_scanner.scan_item((path, path), limits=limits)
+
+    # The rule is stopped before it returns any violation
+    assert [type(v) for v in result.violations] == [ScanTimeout]
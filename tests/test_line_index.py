@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.models import FileResult, ManyImportOnOneLine, ScanSummary
+from src.sharding import Shard, merge_partials, write_partial
+from src.utils.text_utils import LineIndex
+
+CODE = "a = 1\n\nb = 'é'\nc"
+
+
+@pytest.mark.parametrize("offset", range(len(CODE) + 1))
+def test_offsets_and_positions(offset: int) -> None:
+    index = LineIndex(CODE)
+    line, column = index.position(offset)
+
+    assert index.offset(line, column) == offset
+    assert (
+        CODE.split("\n")[line - 1][:column]
+        == CODE[index.offset(line) : offset]
+    )
+
+
+def test_line_text() -> None:
+    index = LineIndex(CODE)
+    assert [index.line_text(n) for n in range(1, 5)] == CODE.split("\n")
+    assert index.char_column(3, len("b = 'é'".encode())) == len("b = 'é'")
+
+
+def positions(code: str) -> list[tuple]:
+    return [
+        (v.line, v.column, v.end_line, v.end_column)
+        for v in scanner.scan(code, ManyImportOnOneLine)
+    ]
+
+
+def test_columns_of_ast_rules() -> None:
+    assert positions("if x:\n    import os, sys\n") == [(2, 4, 2, 18)]
+
+    # Columns are in characters, not in UTF-8 bytes
+    assert positions("x = 'ü'; import os, sys\n") == [(1, 9, 1, 23)]
+
+
+def test_incremental_scan_shifts_ranges() -> None:
+    code = "x = 1\nimport os, sys\n"
+    _, tree = scanner.scan_incremental(code)
+
+    violations, _ = scanner.scan_incremental("\n\n" + code, tree)
+    (v,) = [v for v in violations if isinstance(v, ManyImportOnOneLine)]
+    assert (v.line, v.column, v.end_line, v.end_column) == (4, 0, 4, 14)
+
+
+def test_positions_in_result_files(tmp_path: Path) -> None:
+    shard = Shard(1, 1)
+    violations = [ManyImportOnOneLine(1, 2, 3, 4), ManyImportOnOneLine(5)]
+    write_partial(
+        tmp_path / "1.json",
+        shard,
+        [FileResult("a.py", violations)],
+        ScanSummary(),
+    )
+
+    (result,) = merge_partials([tmp_path / "1.json"], ScanSummary())
+    assert [
+        (v.line, v.column, v.end_line, v.end_column) for v in result.violations
+    ] == [(1, 2, 3, 4), (5, None, None, None)]
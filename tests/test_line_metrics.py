@@ -0,0 +1,79 @@
+import pytest
+
+from src.rules import scanner
+from src.rules.file_rules import (
+    blank_line_at_end,
+    check_max_line_length,
+    check_tabs,
+    get_leading_spaces_count,
+)
+from src.utils.line_metrics import LineMetrics
+
+CODES = [
+    "",
+    "\n",
+    "x = 1",
+    "x = 1\n",
+    "def f():\n\treturn 1\n",
+    "if x:\n  \t  y = 2\n    \n" + "z" * 100 + "\n\t\t" + "a" * 70,
+    "# " + "c" * 75 + "\n" + "# " + "c" * 90 + "\nx = 'é'\t\n",
+    "\t\n \t\n\t \n",
+]
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def use_numpy(request: pytest.FixtureRequest) -> bool:
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_metrics(code: str, use_numpy: bool) -> None:
+    metrics = LineMetrics(code, use_numpy)
+    lines = code.split("\n")
+    expanded = code.replace("\t", "    ").split("\n")
+
+    assert metrics.count == len(lines)
+    assert metrics.starts == [0] + [
+        i + 1 for i, char in enumerate(code) if char == "\n"
+    ]
+    assert metrics.lengths == [len(line) for line in expanded]
+    assert metrics.leading_spaces == [
+        get_leading_spaces_count(line) for line in expanded
+    ]
+    assert metrics.longer_than(5) == [
+        n + 1 for n, line in enumerate(expanded) if len(line) > 5
+    ]
+    assert metrics.starting_with_tab() == [
+        n + 1 for n, line in enumerate(lines) if line.startswith("\t")
+    ]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_rules(code: str) -> None:
+    metrics = LineMetrics(code)
+
+    assert [v.line for v in check_max_line_length(code, metrics)] == [
+        n + 1
+        for n, line in enumerate(code.replace("\t", "    ").split("\n"))
+        if len(line) > 79 and not (line.startswith("#") and len(line) <= 72)
+    ]
+    assert [v.line for v in check_tabs(code)] == metrics.starting_with_tab()
+
+    violation = blank_line_at_end(code)
+    if code.split("\n")[-1].strip():
+        assert violation.line == code.count("\n") + 1
+    else:
+        assert violation is None
+
+
+def test_scanner_shares_metrics() -> None:
+    code = "\tx = 1\n" + "y" * 100
+    names = {type(v).__name__ for v in scanner.scan(code)}
+
+    assert {
+        "UsingTabsToTabulation",
+        "MaxLineLength",
+        "NoBlankLineAtEnd",
+    } <= names
@@ -0,0 +1,201 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from src.rules import scanner
+from src.config import Config
+from src.lsp import LanguageServer, read_message, write_message
+from src.types import ScanLimits
+
+URI = "file:///project/a.py"
+
+
+class Output(io.BytesIO):
+    """Writer, which lets tests wait for messages"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.written = threading.Condition()
+
+    def write(self, data: bytes) -> int:
+        with self.written:
+            return super().write(data)
+
+    def flush(self) -> None:
+        with self.written:
+            self.written.notify_all()
+
+    def messages(self) -> list[dict]:
+        reader = io.BytesIO(self.getvalue())
+        messages = []
+        while (message := read_message(reader)) is not None:
+            messages.append(message)
+        return messages
+
+    def wait_for(self, count: int, timeout: float = 5) -> list[dict]:
+        deadline = time.monotonic() + timeout
+        with self.written:
+            while len(diagnostics := self.diagnostics()) < count:
+                if not self.written.wait(deadline - time.monotonic()):
+                    break
+        return diagnostics
+
+    def diagnostics(self) -> list[dict]:
+        return [
+            m["params"]
+            for m in self.messages()
+            if m.get("method") == "textDocument/publishDiagnostics"
+        ]
+
+
+@pytest.fixture
+def output() -> Output:
+    return Output()
+
+
+@pytest.fixture
+def server(output: Output):
+    server = LanguageServer(scanner, output, debounce=0.05)
+    yield server
+    server.stop()
+
+
+def open_document(server: LanguageServer, text: str) -> None:
+    server.handle(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": URI, "version": 1, "text": text}
+            },
+        }
+    )
+
+
+def change_document(server: LanguageServer, version: int, text: str):
+    server.handle(
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": URI, "version": version},
+                "contentChanges": [{"text": text}],
+            },
+        }
+    )
+
+
+def test_initialize(server: LanguageServer, output: Output) -> None:
+    server.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+    server.handle({"jsonrpc": "2.0", "id": 2, "method": "foo"})
+
+    initialize, unknown = output.messages()
+    assert initialize["id"] == 1
+    assert initialize["result"]["capabilities"]["textDocumentSync"]
+    assert unknown["error"]["message"] == "Method foo not exist!"
+
+
+def test_diagnostics(server: LanguageServer, output: Output) -> None:
+    open_document(server, "import os, sys\n")
+
+    (published,) = output.wait_for(1)
+    assert published["version"] == 1
+    (diagnostic,) = published["diagnostics"]
+    assert diagnostic["code"] == "ManyImportOnOneLine"
+    assert diagnostic["range"]["start"] == {"line": 0, "character": 0}
+    assert diagnostic["range"]["end"] == {"line": 0, "character": 14}
+    assert diagnostic["severity"] == 1
+
+
+def test_changes_are_debounced(server: LanguageServer, output: Output):
+    open_document(server, "x = 1\n")
+    output.wait_for(1)
+
+    for version in range(2, 10):
+        change_document(server, version, "#Comment\n" * version)
+
+    published = output.wait_for(2)
+    time.sleep(0.2)
+
+    # Only the last version is published
+    assert output.diagnostics() == published
+    assert [p["version"] for p in published] == [1, 9]
+    assert published[1]["diagnostics"][0]["code"] == (
+        "CommentsMustStartWithSpace"
+    )
+
+
+def test_stale_scan_is_cancelled(
+    server: LanguageServer, output: Output, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    started = threading.Event()
+    scan_incremental = scanner.scan_incremental
+
+    def slow_scan(code, tree, disabled_rules, cancel):
+        if code.startswith("slow"):
+            started.set()
+            assert cancel.wait(5)
+        return scan_incremental(code, tree, disabled_rules, cancel)
+
+    monkeypatch.setattr(scanner, "scan_incremental", slow_scan)
+
+    open_document(server, "slow = 1\n")
+    assert started.wait(5)
+    change_document(server, 2, "import os, sys\n")
+
+    (published,) = output.wait_for(1)
+    assert published["version"] == 2
+
+
+def test_serve(output: Output) -> None:
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+    reader = io.BytesIO()
+    for message in messages:
+        write_message(reader, message)
+    reader.seek(0)
+
+    server = LanguageServer(scanner, output)
+    server.serve(reader)
+
+    assert server.shutdown_requested
+    assert [m["id"] for m in output.messages()] == [1, 2]
+    assert json.dumps(output.messages()[1]["result"]) == "null"
+
+
+def test_columns_are_in_utf16(server: LanguageServer, output: Output) -> None:
+    # The clef is one character, but two UTF-16 code units
+    open_document(server, "x = '\U0001d11e'; import os, sys\n")
+
+    (published,) = output.wait_for(1)
+    (diagnostic,) = [
+        d
+        for d in published["diagnostics"]
+        if d["code"] == "ManyImportOnOneLine"
+    ]
+    assert diagnostic["range"]["start"] == {"line": 0, "character": 10}
+    assert diagnostic["range"]["end"] == {"line": 0, "character": 24}
+
+
+@pytest.mark.parametrize(
+    "limits, code",
+    [
+        (ScanLimits(max_lines=1), "FileTooLarge"),
+        (ScanLimits(max_seconds=-1), "ScanTimeout"),
+    ],
+)
+def test_limits_of_config(output: Output, limits: ScanLimits, code: str):
+    server = LanguageServer(
+        scanner, output, Config(limits=limits), debounce=0.05
+    )
+    try:
+        open_document(server, "x = 1\ny = 2\n")
+        (published,) = output.wait_for(1)
+    finally:
+        server.stop()
+
+    assert [d["code"] for d in published["diagnostics"]] == [code]
@@ -0,0 +1,55 @@
+import time
+
+from src import parallel
+from src.rules import scanner
+from src.utils.memory_utils import SpillBuffer, peak_rss_mb
+
+
+def test_spill_buffer() -> None:
+    buffer = SpillBuffer(max_size=5, size=len)
+
+    buffer[0] = "abc"
+    buffer[1] = "abcdef"  # Over the limit
+    buffer[2] = "ab"
+
+    assert len(buffer) == 3
+    assert 1 in buffer
+    assert buffer.spilled_count == 1
+
+    assert buffer.pop(1) == "abcdef"
+    assert buffer.pop(0) == "abc"
+    assert buffer.pop(2) == "ab"
+    assert len(buffer) == 0
+
+    buffer.close()
+
+
+def slow_first(x: int) -> list[int]:
+    if x == 0:
+        time.sleep(0.2)
+    return [x] * 10
+
+
+def test_imap_spills_out_of_order_results() -> None:
+    buffer = SpillBuffer(max_size=10, size=len)
+
+    results = list(
+        parallel.imap(slow_first, range(8), 2, "thread", 8, buffer)
+    )
+
+    assert results == [[x] * 10 for x in range(8)]
+    assert buffer.spilled_count > 0
+
+
+def test_memory_bounded_scan_many() -> None:
+    sources = [(str(i), "import sys, os\n" * i) for i in range(10)]
+
+    results = scanner.scan_many(sources, jobs=2, max_buffered=3)
+
+    assert [len(r.violations) for r in results] == list(range(10))
+
+
+def test_peak_rss() -> None:
+    peak_rss = peak_rss_mb()
+
+    assert peak_rss is None or peak_rss[0] > 0
@@ -0,0 +1,98 @@
+import ast
+
+from src.rules import scanner
+from src.core import Scaner
+from src.models import Violation
+from src.rules.rules_container import Rule
+
+CODE = """
+import os
+
+
+def foo():
+    import sys
+
+    class Bar:
+        pass
+
+
+from pathlib import Path
+"""
+
+
+def test_index_of_type() -> None:
+    found = {}
+
+    def collect(node: ast.Module, source: str, index) -> None:
+        found["imports"] = index.of_type(ast.Import, ast.ImportFrom)
+        found["top_imports"] = index.of_type(
+            ast.Import, ast.ImportFrom, depth=1
+        )
+        found["definitions"] = index.of_type(ast.FunctionDef, ast.ClassDef)
+        found["statements"] = index.of_type(ast.stmt)
+        found["bar_parent"] = found["definitions"][1].parent
+
+    test_scanner = Scaner()
+    test_scanner.add_ast_rule(ast.Module, Rule(collect, (ast.Module,), {}))
+    test_scanner.scan(CODE)
+
+    assert [n.lineno for n in found["imports"]] == [2, 6, 12]
+    assert [n.lineno for n in found["top_imports"]] == [2, 12]
+    assert [n.lineno for n in found["definitions"]] == [5, 8]
+    assert len(found["statements"]) == 6
+
+    bar = found["definitions"][1]
+    assert bar.depth == 2
+    assert found["bar_parent"] is found["definitions"][0]
+
+    # Links are removed after the scan
+    assert not hasattr(bar, "parent")
+
+
+def test_rules_run_after_single_walk() -> None:
+    calls = []
+
+    def count(node: ast.AST) -> Violation | None:
+        calls.append(node)
+
+    test_scanner = Scaner()
+    test_scanner.add_ast_rule(ast.stmt, Rule(count, (ast.stmt,), {}))
+    test_scanner.scan(CODE)
+
+    # Rules of parent classes are applied, in source order
+    assert [n.lineno for n in calls] == [2, 5, 6, 8, 9, 12]
+
+
+def test_walk_skips_subtrees_without_rules() -> None:
+    code = "import os\n\n\ndef foo(x):\n    import sys\n    return len(x)\n"
+    tree = ast.parse(code)
+
+    rules = scanner.get_rule_set()
+    index, checks = scanner._walk(tree, rules)
+
+    assert [type(node) for node, _ in checks] == [
+        ast.Module,
+        ast.Import,
+        ast.Import,
+    ]
+    # Expressions can not contain imports
+    call = next(n for n in ast.walk(tree) if isinstance(n, ast.Call))
+    assert not hasattr(call, "depth")
+
+    # But they are found, when a rule asks for them
+    (found,) = index.of_type(ast.Call)
+    assert found is call
+    assert call.depth == 3
+    assert isinstance(call.parent, ast.Return)
+
+
+def test_rules_of_expressions_are_run() -> None:
+    def no_calls(node: ast.Call) -> Violation:
+        return Violation(node.lineno)
+
+    test_scanner = Scaner()
+    test_scanner.add_ast_rule(ast.Call, Rule(no_calls, (ast.Call,), {}))
+
+    violations = test_scanner.scan("def foo():\n    return [bar(1)]\n")
+
+    assert [v.line for v in violations] == [2]
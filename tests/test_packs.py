@@ -0,0 +1,197 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src import config as config_module
+from src.config import parse_config
+from src.core import Scaner
+from src.models import ScanSummary, ViolationType
+from src.rules.packs import (
+    RuleInfo,
+    RulePackInfo,
+    describe_rules,
+    discover_packs,
+)
+from src.transport import unpack_results
+
+PACK = """
+import ast
+
+from src.models import Violation, ViolationType
+from src.rules.rules_container import RulesContainer
+
+
+class NoPrint(Violation):
+    type = ViolationType.ERROR
+    text = "print is not allowed"
+
+
+class NoTodo(Violation):
+    text = "TODO is not allowed"
+
+
+ast_rules = RulesContainer()
+line_rules = RulesContainer()
+
+
+@ast_rules.rule(ast.Call)
+def no_print(node):
+    if isinstance(node.func, ast.Name) and node.func.id == "print":
+        return NoPrint.at(node)
+
+
+@line_rules.rule
+def no_todo(line, number):
+    if "TODO" in line:
+        return NoTodo(number)
+"""
+
+
+@pytest.fixture
+def pack(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Install a pack with the module `demo_pack_rules`"""
+    (tmp_path / "demo_pack_rules.py").write_text(PACK)
+
+    dist_info = tmp_path / "demo_pack-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Name: demo-pack\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text(
+        "[little_lint.rules]\ndemo = demo_pack_rules\n"
+    )
+    (dist_info / "RECORD").write_text(
+        "demo_pack_rules.py,,\ndemo_pack-1.0.dist-info/RECORD,,\n"
+    )
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "demo_pack_rules"
+    sys.modules.pop("demo_pack_rules", None)
+
+
+def test_metadata_without_import(pack: str) -> None:
+    (info,) = discover_packs(["demo"])
+
+    assert pack not in sys.modules
+    assert info.module == pack
+    assert info.rules == (
+        RuleInfo("no_print", "ast", ("ast.Call",), frozenset({"NoPrint"})),
+        RuleInfo("no_todo", "line", (), frozenset({"NoTodo"})),
+    )
+
+
+def test_unknown_pack(pack: str) -> None:
+    with pytest.raises(ValueError, match="Rule pack other not exist!"):
+        discover_packs(["other"])
+
+
+def test_pack_is_imported_when_enabled(pack: str) -> None:
+    (info,) = discover_packs(["demo"])
+    pack_scanner = Scaner()
+    pack_scanner.add_lazy_pack(info)
+
+    assert pack_scanner.get_rule_names() == {"no_print", "no_todo"}
+    assert (
+        pack_scanner.scan("x = 1\n", disabled_rules={"no_print", "no_todo"})
+        == []
+    )
+    assert pack not in sys.modules
+
+    violations = pack_scanner.scan(
+        "print(1)  # TODO\n", disabled_rules={"no_todo"}
+    )
+    assert pack in sys.modules
+    assert [type(v).__name__ for v in violations] == ["NoPrint"]
+
+    violations = pack_scanner.scan("print(1)  # TODO\n")
+    assert sorted(type(v).__name__ for v in violations) == [
+        "NoPrint",
+        "NoTodo",
+    ]
+
+
+def test_config(
+    pack: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config_module, "scanner", Scaner())
+
+    config = parse_config({"packs": ["demo"], "enable": ["no_todo"]}, tmp_path)
+    assert config.plan_for(tmp_path / "a.py").disabled_rules == {"no_print"}
+    config.apply()
+    assert pack not in sys.modules
+
+    with pytest.raises(ValueError, match="Rule or violation foo not exist!"):
+        parse_config({"packs": ["demo"], "disable": ["foo"]}, tmp_path)
+
+    # Violations of a pack are its classes, so the pack is imported
+    config = parse_config({"packs": ["demo"], "disable": ["NoTodo"]}, tmp_path)
+    plan = config.plan_for(tmp_path / "a.py")
+    assert [v.__name__ for v in plan.exclude] == ["NoTodo"]
+
+
+def test_summary(pack: str) -> None:
+    (info,) = discover_packs(["demo"])
+    pack_scanner = Scaner()
+    pack_scanner.add_lazy_pack(info)
+
+    summary = ScanSummary()
+    (result,) = pack_scanner.scan_many(
+        [("a.py", "print(1)  # TODO\n")], summary=summary
+    )
+
+    assert len(result.violations) == 2
+    # NoTodo has the default type
+    assert summary.by_type == {
+        ViolationType.ERROR: 1,
+        ViolationType.WARNING: 1,
+    }
+
+
+def test_classes_of_worker_results(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Not the demo pack, whose classes other tests leave loaded
+    source = PACK.replace("NoPrint", "NoWorkerPrint")
+    (tmp_path / "worker_pack_rules.py").write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    info = RulePackInfo("worker", "worker_pack_rules", describe_rules(source))
+
+    # Results of a worker, which imported the pack to run its rules
+    code = (
+        "import sys\n"
+        "import src.rules\n"
+        "from worker_pack_rules import NoWorkerPrint\n"
+        "from src.models import FileResult\n"
+        "from src.transport import pack_results\n"
+        "v = NoWorkerPrint(1, 0, 1, 8)\n"
+        "sys.stdout.buffer.write(pack_results([FileResult('a.py', [v])]))\n"
+    )
+    data = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        env={"PYTHONPATH": str(tmp_path)},
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    pack_scanner = Scaner()
+    pack_scanner.add_lazy_pack(info)
+    assert "worker_pack_rules" not in sys.modules
+
+    ((v,),) = [
+        r.violations
+        for r in unpack_results(data, pack_scanner.find_violation_class)
+    ]
+    assert type(v) is sys.modules["worker_pack_rules"].NoWorkerPrint
+    sys.modules.pop("worker_pack_rules")
+
+
+def test_classes_of_missing_packs() -> None:
+    rule = RuleInfo("no_exit", "line", (), frozenset({"NoExit"}))
+    pack_scanner = Scaner()
+    pack_scanner.add_lazy_pack(
+        RulePackInfo("gone", "gone_pack_rules", (rule,))
+    )
+
+    assert pack_scanner.find_violation_class("NoExit") is None
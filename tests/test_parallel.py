@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from src import parallel
+from src.runner import scan_paths
+
+WRONG_FILE = """
+import sys, os
+#Comment
+"""
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+@pytest.mark.parametrize("kind", ("serial", "thread", "process"))
+def test_imap_keeps_order(kind: parallel.ExecutorKind) -> None:
+    result = list(parallel.imap(square, range(50), 3, kind))
+
+    assert result == [x * x for x in range(50)]
+
+
+def test_imap_is_lazy() -> None:
+    consumed = []
+
+    def items():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    results = parallel.imap(square, items(), 2, "thread")
+    assert next(results) == 0
+    results.close()
+
+    assert len(consumed) < 1000
+
+
+def test_resolve_kind() -> None:
+    assert parallel.resolve_kind("thread", 1) == "serial"
+    assert parallel.resolve_kind("process", 4) == "process"
+
+    expected = "process" if parallel.gil_enabled() else "thread"
+    assert parallel.resolve_kind("auto", 4) == expected
+
+
+@pytest.mark.parametrize("kind", ("thread", "process"))
+def test_parallel_scan_same_as_serial(tmp_path: Path, kind) -> None:
+    for i in range(6):
+        (tmp_path / f"module_{i}.py").write_text(WRONG_FILE * (i + 1))
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "skipped.py").write_text(WRONG_FILE)
+
+    serial = [(r.path, repr(r.violations)) for r in scan_paths([tmp_path])]
+    parallel_results = [
+        (r.path, repr(r.violations))
+        for r in scan_paths([tmp_path], 3, kind)
+    ]
+
+    assert len(serial) == 6
+    assert serial == parallel_results
@@ -0,0 +1,63 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from src.core import Scaner
+from src.models import ManyImportOnOneLine, ScanSummary, ViolationType
+from src.rules import scanner
+from src.rules.ast_rules import import_on_one_line
+from src.rules.rules_container import Rule
+
+SOURCES = [
+    ("first.py", "import os\n"),
+    ("second.py", "import sys, os\n#Comment"),
+    ("third.py", "x = 1\n" * 10),
+]
+
+
+@pytest.mark.parametrize(
+    "jobs, executor", ((1, "auto"), (3, "thread"), (3, "process"))
+)
+def test_scan_many(jobs: int, executor) -> None:
+    summary = ScanSummary()
+
+    results = list(
+        scanner.scan_many(
+            SOURCES, jobs=jobs, executor=executor, summary=summary
+        )
+    )
+
+    assert [r.path for r in results] == [path for path, _ in SOURCES]
+    assert [repr(r.violations) for r in results] == [
+        repr(scanner.scan(source)) for _, source in SOURCES
+    ]
+
+    assert summary.files == 3
+    assert summary.files_with_violations == 1
+    assert summary.by_type == {
+        ViolationType.ERROR: 2,
+        ViolationType.WARNING: 1,
+    }
+    assert summary.total == 3
+
+
+def test_scan_many_reads_paths(tmp_path: Path) -> None:
+    path = tmp_path / "module.py"
+    path.write_text(SOURCES[1][1])
+
+    (result,) = scanner.scan_many([(path, path)], ManyImportOnOneLine)
+
+    assert result.path == path
+    assert [type(v) for v in result.violations] == [ManyImportOnOneLine]
+
+
+def test_custom_scanner_in_processes() -> None:
+    custom_scanner = Scaner()
+    custom_scanner.add_ast_rule(
+        ast.Import, Rule(import_on_one_line, (ast.Import,), {})
+    )
+
+    results = custom_scanner.scan_many(SOURCES, jobs=2, executor="process")
+
+    assert [len(r.violations) for r in results] == [0, 1, 0]
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src import scheduler
+from src.runner import scan_paths
+from src.scheduler import CostHistory
+
+
+def test_batches_get_smaller() -> None:
+    costs = {
+        Path(f"{i}.py"): float(cost)
+        for i, cost in enumerate([100, 50, *[1] * 100])
+    }
+    items = [(path, path) for path in scheduler.order_by_cost(costs)]
+
+    batches = list(scheduler.iter_batches(items, costs, jobs=2))
+
+    assert batches[0] == [items[0]]
+    assert batches[1] == [items[1]]
+    assert [item for batch in batches for item in batch] == items
+    assert len(batches[2]) > len(batches[-1])
+
+
+def test_history_falls_back_to_size(tmp_path: Path) -> None:
+    history = CostHistory({"a.py": (10, 5.0), "b.py": (100, 1.0)})
+
+    costs = history.expected_costs(
+        {Path("a.py"): 10, Path("b.py"): 200, Path("c.py"): 30}
+    )
+
+    assert costs[Path("a.py")] == 5.0
+    # Changed and new files are estimated by the size
+    assert costs[Path("b.py")] == pytest.approx(200 * 6 / 110)
+    assert costs[Path("c.py")] == pytest.approx(30 * 6 / 110)
+
+    history.save(tmp_path / "stats.json")
+    assert CostHistory.load(tmp_path / "stats.json").entries == {
+        "a.py": (10, 5.0),
+        "b.py": (100, 1.0),
+    }
+
+
+def test_invalid_stats_are_ignored(tmp_path: Path) -> None:
+    (tmp_path / "stats.json").write_text("{")
+
+    assert CostHistory.load(tmp_path / "stats.json").entries == {}
+    assert CostHistory.load(tmp_path / "missing.json").entries == {}
+
+
+@pytest.mark.parametrize("jobs", (1, 3))
+def test_scan_with_stats(tmp_path: Path, jobs: int) -> None:
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "big.py").write_text("x = 1\n" * 500)
+    for i in range(5):
+        (project / f"small_{i}.py").write_text(f"#Comment {i}\n")
+
+    stats = tmp_path / "stats.json"
+    first_run = list(scan_paths([project], jobs, "thread", stats=stats))
+
+    recorded = json.loads(stats.read_text())["files"]
+    assert set(recorded) == {str(r.path) for r in first_run}
+
+    # The history wins over the size
+    small = str(project / "small_3.py")
+    recorded[small][1] = 10.0
+    stats.write_text(json.dumps({"files": recorded}))
+
+    second_run = list(scan_paths([project], jobs, "thread", stats=stats))
+    assert sorted(r.path for r in first_run) == sorted(
+        r.path for r in second_run
+    )
+
+    if jobs == 1:
+        # Results of parallel runs are yielded as they are ready
+        assert first_run[0].path.name == "big.py"
+        assert second_run[0].path.name == "small_3.py"
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.cli import main
+from src.models import ScanSummary
+from src.runner import scan_paths
+from src.sharding import Shard, merge_partials, write_partial
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    for number in range(20):
+        folder = tmp_path / f"package{number % 3}"
+        folder.mkdir(exist_ok=True)
+        # Some files with violations, of different sizes
+        code = "import os, sys\n" if number % 4 == 0 else "x = 1\n"
+        (folder / f"m{number}.py").write_text(code + "\n" * number)
+
+    return tmp_path
+
+
+def all_files(project: Path) -> list[Path]:
+    return sorted(project.rglob("*.py"))
+
+
+@pytest.mark.parametrize("by_size", [False, True])
+def test_shards_split_files(project: Path, by_size: bool) -> None:
+    files = all_files(project)
+
+    shards = [
+        list(Shard(index, 3, project, by_size).select(files))
+        for index in range(1, 4)
+    ]
+
+    assert sorted(path for shard in shards for path in shard) == files
+    assert all(shards)
+
+    # The split does not depend on the folder of the checkout
+    moved = [Path("/elsewhere") / p.relative_to(project) for p in files]
+    first = Shard(1, 3, Path("/elsewhere"))
+    assert [p.name for p in first.select(moved)] == [
+        p.name for p in Shard(1, 3, project).select(files)
+    ]
+
+
+def test_shards_by_size_are_balanced(project: Path) -> None:
+    files = all_files(project)
+
+    sizes = [
+        sum(p.stat().st_size for p in Shard(i, 3, project, True).select(files))
+        for i in range(1, 4)
+    ]
+    assert max(sizes) - min(sizes) <= max(p.stat().st_size for p in files)
+
+
+def test_parse() -> None:
+    assert Shard.parse("3/8") == Shard(3, 8)
+
+    with pytest.raises(ValueError, match="Shard 9/8 not exist!"):
+        Shard.parse("9/8")
+    with pytest.raises(ValueError, match="is not like 3/8"):
+        Shard.parse("3")
+
+
+def test_merge(project: Path, tmp_path: Path) -> None:
+    expected = ScanSummary()
+    list(scan_paths([project], summary=expected))
+
+    partials = []
+    for index in range(1, 4):
+        shard = Shard(index, 3, project)
+        summary = ScanSummary()
+        results = list(scan_paths([project], summary=summary, shard=shard))
+
+        partials.append(tmp_path / f"{index}.json")
+        write_partial(partials[-1], shard, results, summary)
+
+    summary = ScanSummary()
+    results = merge_partials(partials, summary)
+
+    assert summary == expected
+    assert [r.path for r in results] == sorted(
+        f"package{n % 3}/m{n}.py" for n in range(0, 20, 4)
+    )
+    assert {type(v).__name__ for r in results for v in r.violations} == {
+        "ManyImportOnOneLine"
+    }
+
+    with pytest.raises(ValueError, match="Shard 2/3 is missing!"):
+        merge_partials([partials[0], partials[2]], ScanSummary())
+
+    with pytest.raises(SystemExit) as exit_info:
+        main(["merge", *map(str, partials)])
+    assert exit_info.value.code == 1
@@ -0,0 +1,65 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src.models import FileTooLarge
+from src.types import ScanLimits
+
+CODES = [
+    "",
+    "import os, sys\n",
+    "def f():\n\treturn 1\n\n\nx = f(  # noqa\n  1)\n",
+    "#Comment\n" + "y = 1  " + "# " + "c" * 90 + "\nz = 2",
+    "x = (\n    1 +\n)\n",
+    "# little-lint: disable-file=MaxLineLength\n" + "a" * 100 + "\n",
+    "if x:\n  y = 2\n",
+]
+
+
+def key(violations) -> list[tuple[str, int]]:
+    return sorted((type(v).__name__, v.line) for v in violations)
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_same_as_scan(code: str, tmp_path: Path) -> None:
+    path = tmp_path / "a.py"
+    path.write_text(code)
+
+    assert key(scanner.scan_stream(path)) == key(scanner.scan(code))
+
+    limits = ScanLimits(max_lines=1)
+    assert key(scanner.scan_stream(path, limits=limits)) == key(
+        scanner.scan(code, limits=limits)
+    )
+
+
+def test_scan_many_streams_huge_files(tmp_path: Path) -> None:
+    path = tmp_path / "a.py"
+    path.write_text("import os, sys\n\tx = 1\n")
+
+    (result,) = scanner.scan_many(
+        [(path, path)], limits=ScanLimits(stream_bytes=10)
+    )
+    assert key(result.violations) == key(scanner.scan(path.read_text()))
+
+
+def test_memory_is_bounded_by_line(tmp_path: Path) -> None:
+    path = tmp_path / "huge.py"
+    line = "x = [" + "1, " * 30 + "]\n"
+    with open(path, "w") as f:
+        for _ in range(50_000):
+            f.write(line)
+    size = path.stat().st_size
+
+    limits = ScanLimits(max_lines=1)
+    tracemalloc.start()
+    try:
+        violations = scanner.scan_stream(path, limits=limits)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert key(violations) == [("FileTooLarge", 1)]
+    assert peak < size / 10
@@ -0,0 +1,106 @@
+import functools
+
+import pytest
+
+from src.rules import scanner
+from src.models import (
+    CommentsMustStartWithSpace,
+    LineBreakAfterBinOp,
+    ManyImportOnOneLine,
+    Not4SpaceForIndentationLevel,
+)
+from src.utils.tokens_utils import ALL, build_suppression_index
+
+CODE = """import os, sys  # noqa
+import re, json  # noqa: CommentsMustStartWithSpace
+value = (
+a +
+1)
+
+
+def foo():
+    # little-lint: disable=break_line_after_bin_op
+    x = (
+a +
+1)
+    return x
+
+
+z = (
+a +
+1)
+"""
+
+
+def test_index() -> None:
+    index = build_suppression_index(
+        CODE, {"break_line_after_bin_op": frozenset({"LineBreakAfterBinOp"})}
+    )
+
+    assert index.lines[1] == {ALL}
+    assert index.lines[2] == {"CommentsMustStartWithSpace"}
+    assert 4 not in index.lines
+    assert index.is_suppressed(11, "LineBreakAfterBinOp")
+    # The block ends with the function
+    assert not index.is_suppressed(17, "LineBreakAfterBinOp")
+
+    # Lines of one block share names
+    assert index.lines[10] is index.lines[11]
+
+
+def test_scan() -> None:
+    violations = scanner.scan(CODE, exclude=Not4SpaceForIndentationLevel)
+
+    assert sorted((v.line, type(v)) for v in violations) == [
+        (2, ManyImportOnOneLine),
+        (4, LineBreakAfterBinOp),
+        (17, LineBreakAfterBinOp),
+    ]
+
+
+def test_enable() -> None:
+    code = (
+        "# little-lint: disable=LineBreakAfterBinOp\n"
+        "x = (\na +\n1)\n"
+        "# little-lint: enable=LineBreakAfterBinOp\n"
+        "y = (\na +\n1)\n"
+    )
+
+    violations = scanner.scan(code, include_only=LineBreakAfterBinOp)
+
+    assert [v.line for v in violations] == [7]
+
+
+@pytest.fixture
+def line_rule_calls(monkeypatch: pytest.MonkeyPatch) -> list:
+    rule = scanner.get_rule_set().line_rules[0]
+    calls = []
+
+    @functools.wraps(rule.checker)
+    def checker(*args):
+        calls.append(args)
+        return checker.__wrapped__(*args)
+
+    monkeypatch.setattr(rule, "checker", checker)
+    return calls
+
+
+def test_file_suppression_skips_rule(line_rule_calls: list) -> None:
+    code = "# little-lint: disable-file=LineBreakAfterBinOp\na +\n"
+
+    assert scanner.scan(code, include_only=LineBreakAfterBinOp) == []
+    assert line_rule_calls == []
+
+
+def test_suppressed_line_is_not_checked(line_rule_calls: list) -> None:
+    code = "a +  # noqa: break_line_after_bin_op\ny = 2\n"
+
+    assert scanner.scan(code, include_only=LineBreakAfterBinOp) == []
+    assert [number for _, number in line_rule_calls] == [2, 3]
+
+
+def test_everything_suppressed() -> None:
+    code = "# little-lint: disable-file\nimport os, sys\n#Comment"
+
+    assert scanner.scan(code) == []
+    assert CommentsMustStartWithSpace in map(type, scanner.scan(code[27:]))
@@ -0,0 +1,120 @@
+import csv
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.rules import scanner
+from src import parallel, timings
+from src.core import Scaner
+from src.models import FileTimings
+from src.rules.file_rules import check_tabs
+from src.rules.rules_container import Rule
+from src.types import ScanLimits
+
+CODE = "import os\n\n\ndef f(x):\n    return x + 1\n" * 50
+
+
+def test_phases_are_timed(tmp_path: Path) -> None:
+    path = tmp_path / "a.py"
+    path.write_text(CODE)
+
+    (result,) = scanner.scan_many([(path, path)], timings=True)
+
+    file_timings = result.timings
+    for phase in timings.PHASES:
+        assert getattr(file_timings, phase) > 0, phase
+    assert file_timings.peak_memory == 0
+    assert file_timings.total <= result.elapsed
+
+
+def test_memory_is_not_traced_in_timed_scans(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    traced_phases = []
+
+    def timed_scan(*args, **kwargs):
+        if kwargs.get("timings") is not None:
+            traced_phases.append(tracemalloc.is_tracing())
+        return scan(*args, **kwargs)
+
+    scan = scanner.scan
+    monkeypatch.setattr(scanner, "scan", timed_scan)
+
+    results = list(
+        scanner.scan_many(
+            [("a.py", CODE), ("b.py", CODE)], timings=True, memory=True
+        )
+    )
+
+    assert traced_phases == [False, False]
+    assert all(r.timings.peak_memory > 0 for r in results)
+    assert not tracemalloc.is_tracing()
+
+
+def test_oversized_file(tmp_path: Path) -> None:
+    (result,) = scanner.scan_many(
+        [("a.py", CODE)], limits=ScanLimits(max_lines=10), timings=True
+    )
+
+    assert result.timings.parse == result.timings.ast_rules == 0
+    assert result.timings.line_rules > 0
+
+
+def test_no_timings_by_default() -> None:
+    (result,) = scanner.scan_many([("a.py", CODE)])
+    assert result.timings is None
+
+
+def test_report(tmp_path: Path) -> None:
+    rows = [
+        ("fast.py", FileTimings(parse=0.001, peak_memory=2048)),
+        ("slow.py", FileTimings(parse=0.5, ast_rules=0.25)),
+        ("middle.py", FileTimings(line_rules=0.1)),
+    ]
+
+    slowest = timings.slowest(rows, 2)
+    assert [path for path, _ in slowest] == ["slow.py", "middle.py"]
+    table = timings.format_table(slowest).splitlines()
+    assert table[0].split() == [*timings.PHASES, "total", "peak", "KB", "file"]
+    assert table[1].split()[-3:] == ["750.00", "0.0", "slow.py"]
+
+    timings.dump(rows, tmp_path / "timings.json")
+    records = json.loads((tmp_path / "timings.json").read_text())
+    assert records[0] == {
+        "path": "fast.py",
+        "read": 0.0,
+        "tokenize": 0.0,
+        "parse": 0.001,
+        "file_rules": 0.0,
+        "line_rules": 0.0,
+        "ast_rules": 0.0,
+        "peak_memory": 2048,
+        "total": 0.001,
+    }
+
+    timings.dump(rows, tmp_path / "timings.csv")
+    with open(tmp_path / "timings.csv", newline="") as f:
+        records = list(csv.DictReader(f))
+    assert [r["path"] for r in records] == ["fast.py", "slow.py", "middle.py"]
+    assert float(records[1]["total"]) == 0.75
+
+
+def test_no_threads_with_timings(monkeypatch: pytest.MonkeyPatch) -> None:
+    def make_executor(*args, **kwargs):
+        raise AssertionError("Files are scanned in threads")
+
+    # Rules of a custom scanner can not be sent to processes
+    custom_scanner = Scaner()
+    custom_scanner.add_file_rule(Rule(check_tabs))
+    monkeypatch.setattr(parallel, "make_executor", make_executor)
+
+    results = custom_scanner.scan_many(
+        [("a.py", CODE), ("b.py", CODE)],
+        jobs=2,
+        executor="thread",
+        timings=True,
+        memory=True,
+    )
+    assert all(r.timings.peak_memory > 0 for r in results)
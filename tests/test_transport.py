@@ -0,0 +1,96 @@
+import pickle
+from pathlib import Path
+
+from src.rules import scanner
+from src.models import (
+    FileResult,
+    FileTimings,
+    ManyImportOnOneLine,
+    MaxLineLength,
+    Violation,
+    ViolationType,
+)
+from src.transport import pack_results, unpack_results, violation_count
+
+
+def dump(results: list[FileResult]) -> list[tuple]:
+    return [
+        (
+            type(result.path),
+            str(result.path),
+            result.elapsed,
+            result.fixed,
+            result.timings,
+            result.line_texts,
+            [
+                (
+                    type(v).__name__,
+                    v.type,
+                    v.text,
+                    v.line,
+                    v.column,
+                    v.end_line,
+                    v.end_column,
+                )
+                for v in result.violations
+            ],
+        )
+        for result in results
+    ]
+
+
+class PackViolation(Violation):
+    type = ViolationType.WARNING
+    text = "Violation of a rule pack"
+
+
+def test_round_trip() -> None:
+    changed = MaxLineLength(3)
+    changed.text = "Max length should be 100"
+    results = [
+        FileResult(
+            Path("a.py"),
+            [ManyImportOnOneLine(1, 0, 1, 14), changed, MaxLineLength(4)],
+            elapsed=0.5,
+            fixed=2,
+            line_texts={1: "import os, sys", 3: "x = 'ü'"},
+        ),
+        FileResult("a.whl!pkg/\udcff.py", []),
+        FileResult(
+            "b.py",
+            [PackViolation(2)],
+            timings=FileTimings(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 7),
+        ),
+    ]
+
+    data = pack_results(results)
+    assert violation_count(data) == 4
+    assert dump(unpack_results(data)) == dump(results)
+
+
+def test_smaller_than_pickle() -> None:
+    violations: list[Violation] = [
+        ManyImportOnOneLine(n, 0, n, 14) for n in range(1, 10_000)
+    ]
+    results = [FileResult(Path("a.py"), violations)]
+
+    assert len(pack_results(results)) < len(pickle.dumps(results))
+
+
+def test_unknown_class() -> None:
+    data = pack_results([FileResult("a.py", [PackViolation(2, 1)])])
+
+    # The class of a rule pack, which is not loaded in this process
+    ((v,),) = [r.violations for r in unpack_results(data, lambda name: None)]
+    assert type(v) is not PackViolation
+    assert (type(v).__name__, v.type, v.text, v.line, v.column) == (
+        "PackViolation",
+        PackViolation.type,
+        PackViolation.text,
+        2,
+        1,
+    )
+
+
+def test_empty() -> None:
+    assert unpack_results(pack_results([])) == []